@@ -0,0 +1,276 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import config
+from config import BASE_SAMPLES
+from serial_worker import AcquisitionPipeline
+
+# 공유 메모리 링 한 행: [raw × MAX_CH | filtered × MAX_CH | amp × MAX_CH | 샘플 시각]. 실제 채널 수는 헤더의 n_ch.
+# 선필터 출력이 없는 블록(fs 측정 중 등)의 filtered 칸은 NaN
+MAX_CH = 6
+ROW_WIDTH = 3 * MAX_CH + 1
+_RAW, _FILT, _AMP = 0, MAX_CH, 2 * MAX_CH
+# 헤더(int64): [누적 기록 행 수(발행), 감지된 채널 수(0 = 미감지), 선필터 출력 기록 여부, 기록 시작 표시]
+_HDR_COUNT, _HDR_N_CH, _HDR_FILT, _HDR_WSTART, _HDR_LEN = 0, 1, 2, 3, 4
+
+
+# 수신 프로세스 → 대시보드 프로세스 단방향 샘플 링 (multiprocessing.shared_memory 위)
+# seqlock 방식: 쓰는 쪽은 행을 건드리기 전에 기록 시작 표시(wstart = count + n)를 먼저 올리고,
+# 행을 쓴 뒤 count를 갱신(발행). 읽는 쪽은 count까지만 복사하고 복사 뒤 wstart를 다시 읽어
+# 그 사이(발행 전 배치 포함) 덮어썼을 수 있는 행(절대 위치 < wstart − capacity)은 버린다 (누락 수는 lost로 집계)
+class SharedSampleRing:
+
+    def __init__(self, shm, capacity):
+        self.shm = shm
+        self.capacity = int(capacity)
+        self.header = np.ndarray((_HDR_LEN,), dtype=np.int64, buffer=shm.buf)
+        self.rows = np.ndarray(
+            (self.capacity, ROW_WIDTH), dtype=np.float64, buffer=shm.buf, offset=_HDR_LEN * 8
+        )
+        self.read_pos = 0
+        self.lost = 0
+
+    @staticmethod
+    def nbytes(capacity):
+        return _HDR_LEN * 8 + capacity * ROW_WIDTH * 8
+
+    @classmethod
+    def create(cls, capacity):
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(capacity))
+        ring = cls(shm, capacity)
+        ring.header[:] = 0
+        return ring
+
+    # 다른 프로세스가 만든 링에 붙기. 정리(unlink)는 만든 쪽 책임
+    # (3.13 미만은 spawn 자식이 부모와 같은 resource_tracker를 쓰므로 중복 등록만 되고 해제는 부모가 함)
+    @classmethod
+    def attach(cls, name, capacity):
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, capacity)
+
+    @property
+    def n_ch(self):
+        return int(self.header[_HDR_N_CH])
+
+    def set_n_ch(self, n):
+        self.header[_HDR_N_CH] = n
+
+    # (수신 프로세스) raw·filtered(None 가능)·amp (n, n_ch)와 샘플별 시각 times (n,)를 행으로 기록
+    def write(self, samples, filtered, amp_block, times):
+        n, n_ch = samples.shape
+        L = self.capacity
+        if n > L:
+            samples, amp_block, times, n = samples[-L:], amp_block[-L:], times[-L:], L
+            filtered = None if filtered is None else filtered[-L:]
+        count = int(self.header[_HDR_COUNT])
+        self.header[_HDR_WSTART] = count + n  # 행을 덮어쓰기 전에 표시
+        idx = (count + np.arange(n)) % L
+        self.rows[idx, _RAW : _RAW + n_ch] = samples
+        if filtered is not None:
+            self.rows[idx, _FILT : _FILT + n_ch] = filtered
+            self.header[_HDR_FILT] = 1
+        else:
+            self.rows[idx, _FILT : _FILT + n_ch] = np.nan
+        self.rows[idx, _AMP : _AMP + n_ch] = amp_block
+        self.rows[idx, -1] = times
+        self.header[_HDR_COUNT] = count + n  # 발행은 행 기록 뒤
+
+    # (대시보드 쪽) 새 행 전부 복사해 (raw, filtered 또는 None, amp, ts) 반환. 새 행이 없으면 None.
+    # filtered는 가져온 행이 모두 실제 필터 출력일 때만 (하나라도 NaN이면 None)
+    def read_new(self):
+        count = int(self.header[_HDR_COUNT])
+        if count <= self.read_pos:
+            return None
+        if count - self.read_pos > self.capacity:
+            self.lost += count - self.read_pos - self.capacity
+            self.read_pos = count - self.capacity
+        start = self.read_pos
+        rows = self.rows[np.arange(start, count) % self.capacity]  # fancy index → 복사본
+
+        # 복사하는 동안 쓰는 쪽이 덮어쓰기 시작한(발행 전이라도) 앞부분은 버림
+        overwritten = min(int(self.header[_HDR_WSTART]) - self.capacity - start, len(rows))
+        if overwritten > 0:
+            self.lost += overwritten
+            rows = rows[overwritten:]
+        self.read_pos = count
+        if len(rows) == 0:
+            return None
+        n_ch = self.n_ch
+        filtered = rows[:, _FILT : _FILT + n_ch] if self.header[_HDR_FILT] else None
+        if filtered is not None and np.isnan(filtered[:, 0]).any():
+            filtered = None
+        return rows[:, _RAW : _RAW + n_ch], filtered, rows[:, _AMP : _AMP + n_ch], rows[:, -1]
+
+    def close(self, unlink=False):
+        # numpy 뷰를 먼저 놓아야 SharedMemory를 닫을 수 있음
+        self.header = None
+        self.rows = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# 수신 프로세스 진입점: AcquisitionPipeline으로 읽고 디코딩·진폭 계산 후 공유 링에 기록.
+# 제어 채널(conn): 부모 → ("stop",), 자식 → ("status", str) / ("error", str) / ("stats", dict)
+def acquisition_main(shm_name, capacity, conn, port, baud, protocol, n_samples, amp_hop):
+    ring = SharedSampleRing.attach(shm_name, capacity)
+    acq = AcquisitionPipeline(port, baud, protocol, n_samples, amp_hop)
+    try:
+        name = acq.open()
+    except Exception as e:
+        conn.send(("error", f"Failed to open serial: {e}"))
+        ring.close()
+        return
+    conn.send(("status", f"CONNECTED: {name}"))
+
+    try:
+        while acq.is_open():
+            if conn.poll() and conn.recv()[0] == "stop":
+                break
+            samples, filtered, amp_block, times, detected = acq.step()
+            if detected is not None:
+                ring.set_n_ch(detected)  # 감지된 채널 수는 샘플보다 먼저 헤더에 게시
+            if acq.stats_due():
+                conn.send(("stats", acq.take_stats()))
+            if len(samples) > 0:
+                ring.write(samples, filtered, amp_block, times)
+    except Exception as e:
+        conn.send(("error", f"Loop error: {e}"))
+    finally:
+        acq.close()
+        ring.close()
+
+
+# 수신·파싱·진폭 계산을 별도 프로세스에서 돌리고, 공유 메모리 링에서 샘플을 가져와
+# SerialWorker와 같은 시그널로 내보내는 QThread (config.ACQ_MODE = "process")
+class ProcessSerialWorker(QThread):
+    sig_sample = pyqtSignal(list, object, float)
+    sig_block = pyqtSignal(object, object, object, object)
+    sig_status = pyqtSignal(str)
+    sig_error = pyqtSignal(str)
+    sig_channel_detected = pyqtSignal(int)
+    sig_stats = pyqtSignal(dict)
+
+    def __init__(self):
+        super().__init__()
+        self._running = False
+        self._port = None
+        self._baud = 115200
+        self.protocol = config.SERIAL_PROTOCOL
+        self.n_samples = int(BASE_SAMPLES * config.N_MULT_DEFAULT)
+        self.amp_hop = config.AMP_HOP_SAMPLES
+        self.last_amp = np.zeros(config.N_CH)
+        self.block_mode = config.SERIAL_BLOCK_MODE
+        self.ring = None
+        self.last_stats = {}
+        self.capacity = config.ACQ_SHM_CAPACITY
+        self.poll_interval = config.SERIAL_LATENCY_BUDGET_MS / 1000.0
+        # stop 후 run이 끝날 때까지 GUI가 기다릴 시간: 폴링 한 번 + join·terminate 후 join + 여유
+        self.stop_timeout_ms = int((self.poll_interval + 2 * config.ACQ_STOP_JOIN_SEC) * 1000) + 500
+
+    def configure(self, port: str, baud: int, n_mult: int, protocol=None):
+        self._port = port
+        self._baud = baud
+        if protocol is not None:
+            self.protocol = protocol
+        self.update_params(n_mult)
+
+    def update_params(self, n_mult, hop=None):
+        self.n_samples = int(BASE_SAMPLES * n_mult)
+        if hop is not None:
+            self.amp_hop = hop
+
+    def stop(self):
+        self._running = False
+
+    def run(self):
+        if not self._port:
+            self.sig_error.emit("No port selected.")
+            return
+
+        ctx = mp.get_context("spawn")
+        shm_ring = SharedSampleRing.create(self.capacity)
+        conn, child_conn = ctx.Pipe()
+        proc = ctx.Process(
+            target=acquisition_main,
+            args=(shm_ring.shm.name, self.capacity, child_conn, self._port, self._baud,
+                  self.protocol, self.n_samples, self.amp_hop),
+            daemon=True,
+        )
+        try:
+            proc.start()
+        except Exception as e:
+            conn.close()
+            shm_ring.close(unlink=True)
+            self.sig_error.emit(f"Failed to start acquisition process: {e}")
+            return
+        finally:
+            child_conn.close()
+
+        self._running = True
+        session_n_ch = 0
+        try:
+            while self._running:
+                # 제어 채널: 이벤트가 오면 바로, 아니면 지연 예산마다 깨어나 링 확인
+                if conn.poll(self.poll_interval):
+                    kind, payload = conn.recv()
+                    if kind == "status":
+                        self.sig_status.emit(payload)
+                    elif kind == "stats":
+                        payload["shm_lost"] = shm_ring.lost
+                        self.last_stats = payload
+                        self.sig_stats.emit(payload)
+                    elif kind == "error":
+                        self.sig_error.emit(payload)
+                        break
+
+                # 채널 수는 헤더에서 확인 → 감지 전에 그 채널 수의 샘플을 처리하는 일이 없음
+                n_ch = shm_ring.n_ch
+                if n_ch and n_ch != session_n_ch:
+                    session_n_ch = n_ch
+                    self.last_amp = np.zeros(n_ch)
+                    if self.ring is not None:
+                        self.ring.reset(n_ch=n_ch)
+                    self.sig_channel_detected.emit(n_ch)
+
+                new = shm_ring.read_new()
+                if new is not None:
+                    self._ingest(*new)
+
+                if not proc.is_alive():
+                    new = shm_ring.read_new()
+                    if new is not None:
+                        self._ingest(*new)
+                    if self._running and not conn.poll():
+                        self.sig_error.emit("Acquisition process exited unexpectedly.")
+                    break
+        except (EOFError, OSError) as e:
+            if self._running: self.sig_error.emit(f"Acquisition process error: {e}")
+        finally:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            proc.join(config.ACQ_STOP_JOIN_SEC)
+            if proc.is_alive():
+                proc.terminate()
+                proc.join(config.ACQ_STOP_JOIN_SEC)
+            conn.close()
+            shm_ring.close(unlink=True)
+            self.sig_status.emit("DISCONNECTED")
+
+    def _ingest(self, samples, filtered, amp_block, ts):
+        self.last_amp = amp_block[-1]
+        if self.ring is not None:
+            self.ring.write(samples, filtered, ts)
+        if self.block_mode:
+            self.sig_block.emit(samples, filtered, amp_block, ts)
+        else:
+            for raw_vals, amp_vals, t in zip(samples, amp_block, ts):
+                self.sig_sample.emit(raw_vals.tolist(), amp_vals, float(t))
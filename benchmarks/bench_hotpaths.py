@@ -0,0 +1,423 @@
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import config
+from binary_frame import FrameDecoder, encode_frames
+from emg_amp import StreamingPeakToPeak
+from emg_scale import ChannelScaler, EMGScaleManager
+from logger import CSVLogger
+from prefilter import StreamingPrefilter
+from recording import BinaryLogger
+from ring_buffer import SampleRing
+from serial_worker import LineDecoder, compute_amp_from_samples, parse_line
+from spectrum import SpectrogramEngine, SpectrumEngine, apply_filters, design_filters
+from synth import EMGSynth, encode_ascii
+
+# 측정 행렬 (케이스마다 필요한 축만 씀)
+CHANNELS = (4, 6)
+RATES = (1000, 2000, 10000)
+N_MULTS = (1, 10, 100)
+BLOCK_ROWS = (10, 100, 1000, 2000)   # update_block 한 번에 넘기는 샘플 수 (read 크기 ~ 최대 속도 재생)
+FORMATS = ("ascii", "binary")         # 시리얼 스트림 형식
+
+_LINES_PER_CALL = 256   # 샘플 단위 케이스(parse_line·ChannelScaler·write_row)의 호출당 샘플 수
+_STREAM_READS = 64      # 디코더 케이스에 미리 만들어 두고 돌려 쓰는 read 수
+_SEED = 1234
+
+# 케이스 목록: (이름, 축, 준비 함수, 호출 빈도). 준비 함수는 params → (fn, 호출당 샘플 수[, 정리 함수]).
+# 호출 빈도는 실제 동작에서 초당 호출 수: "read"는 read 한 번(SERIAL_LATENCY_BUDGET_MS)마다,
+# "frame"은 렌더 프레임(FPS)마다, None이면 레이트와 무관 (load 계산 안 함)
+_CASES = []
+
+
+def case(name, *axes, per=None):
+    def deco(setup):
+        _CASES.append((name, axes, setup, per))
+        return setup
+    return deco
+
+
+# read 한 번 분량 샘플 수 (지연 예산 동안 들어오는 양)
+def _read_block(rate):
+    return max(1, int(rate * config.SERIAL_LATENCY_BUDGET_MS / 1000))
+
+
+def _signal(n_ch, rate, n):
+    return np.rint(EMGSynth(n_ch, rate, seed=_SEED).generate(n))
+
+
+# 한 바퀴 찬 링과 같은 (n_ch, L) 배열 (L = PLOT_SEC 분량)
+def _ring_plane(n_ch, rate):
+    return _signal(n_ch, rate, int(rate * config.PLOT_SEC)).T.copy()
+
+
+def _n_fft(rate):
+    n = max(8, int(rate * config.FFT_WINDOW_SEC))
+    return min(1 << int(np.ceil(np.log2(n))), int(rate * config.PLOT_SEC))
+
+
+@case("parse_line", "ch")
+def _parse_line(p):
+    lines = encode_ascii(_signal(p["ch"], 1000, _LINES_PER_CALL)).decode().splitlines()
+    return (lambda: [parse_line(s) for s in lines]), len(lines)
+
+
+# 줄 나누기 + 파싱: read 조각이 줄 중간에서 끊기도록 스트림을 같은 바이트 수로 자름
+# read 한 번 분량 디코딩. 같은 신호를 ASCII 줄(LineDecoder)과 이진 프레임(FrameDecoder)으로 인코딩해
+# 같은 개수로 나눈 조각을 돌려 넣음 → fmt끼리 바로 비교
+@case("stream_decode", "ch", "rate", "fmt", per="read")
+def _stream_decode(p):
+    block = _read_block(p["rate"])
+    x = _signal(p["ch"], p["rate"], block * _STREAM_READS)
+    if p["fmt"] == "ascii":
+        stream, dec = encode_ascii(x), LineDecoder()
+    else:
+        stream, dec = encode_frames(x, 0), FrameDecoder()
+    size = len(stream) // _STREAM_READS
+    pieces = itertools.cycle([stream[i * size : (i + 1) * size] for i in range(_STREAM_READS - 1)]
+                             + [stream[(_STREAM_READS - 1) * size :]])
+    return (lambda: dec.decode(next(pieces), p["ch"])), block
+
+
+# 이전 방식 진폭: 윈도우 deque에 샘플을 넣고 윈도우마다 전체 max−min
+@case("amp_legacy", "ch", "n_mult")
+def _amp_legacy(p):
+    window = config.BASE_SAMPLES * p["n_mult"]
+    rows = [list(r) for r in _signal(p["ch"], 1000, window)]
+    buf = deque(maxlen=window)
+
+    def fn():
+        for r in rows:
+            buf.append(r)
+        compute_amp_from_samples(buf)
+    return fn, window
+
+
+@case("amp_stream", "ch", "rate", "n_mult", per="read")
+def _amp_stream(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    est = StreamingPeakToPeak(p["ch"], config.BASE_SAMPLES * p["n_mult"], config.AMP_HOP_SAMPLES)
+    return (lambda: est.update(block)), len(block)
+
+
+# 매 샘플 발행 (AMP_HOP_SAMPLES = 1): 블록 prefix/suffix 경로
+@case("amp_stream_hop1", "ch", "rate", "n_mult", per="read")
+def _amp_stream_hop1(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    est = StreamingPeakToPeak(p["ch"], config.BASE_SAMPLES * p["n_mult"], 1)
+    return (lambda: est.update(block)), len(block)
+
+
+@case("scaler_update", "ch")
+def _scaler_update(p):
+    cols = _signal(p["ch"], 1000, _LINES_PER_CALL).T.tolist()
+    scalers = [ChannelScaler() for _ in cols]
+
+    def fn():
+        for sc, col in zip(scalers, cols):
+            for v in col:
+                sc.update(v)
+    return fn, _LINES_PER_CALL
+
+
+@case("scale_update_block", "ch", "rate", per="read")
+def _scale_update_block(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    mgr = EMGScaleManager(p["ch"])
+    return (lambda: mgr.update_block(block)), len(block)
+
+
+# 렌더 프레임 한 번: 전 채널 링 길이만큼 스케일 변환 (프레임 공유 스냅샷 사용)
+# 샘플 단위 경로(on_sample)가 쓰는 EMGScaleManager.scalers 직접 갱신
+@case("scaler_update_managed", "ch")
+def _scaler_update_managed(p):
+    cols = _signal(p["ch"], 1000, _LINES_PER_CALL).T.tolist()
+    mgr = EMGScaleManager(p["ch"])
+
+    def fn():
+        for sc, col in zip(mgr.scalers, cols):
+            for v in col:
+                sc.update(v)
+        mgr.snapshot()
+    return fn, _LINES_PER_CALL
+
+
+# 블록 크기별 update_block과 같은 블록을 샘플마다 ChannelScaler.update로 돌린 기준값 (scale_rows_per_sample)
+@case("scale_rows_update_block", "ch", "rows")
+def _scale_rows_update_block(p):
+    block = _signal(p["ch"], 1000, p["rows"])
+    mgr = EMGScaleManager(p["ch"])
+    return (lambda: mgr.update_block(block)), len(block)
+
+
+@case("scale_rows_per_sample", "ch", "rows")
+def _scale_rows_per_sample(p):
+    block = _signal(p["ch"], 1000, p["rows"])
+    mgr = EMGScaleManager(p["ch"])
+
+    def fn():
+        for sc, col in zip(mgr.scalers, block.T.tolist()):
+            for v in col:
+                sc.update(v)
+        mgr.snapshot()
+    return fn, len(block)
+
+
+@case("scaled_array", "ch", "rate", per="frame")
+def _scaled_array(p):
+    plane = _ring_plane(p["ch"], p["rate"])
+    mgr = EMGScaleManager(p["ch"])
+    mgr.update_block(plane.T)
+
+    def fn():
+        snap = mgr.snapshot()
+        for i in range(p["ch"]):
+            mgr.get_scaled_array(i, plane[i], snap)
+    return fn, plane.shape[1]
+
+
+# FFT 뷰의 프레임별 시간 영역 필터 (zero-phase, FFT_FILTER_OUT_RANGES)
+@case("fft_filter", "ch", "rate", per="frame")
+def _fft_filter(p):
+    x = _ring_plane(p["ch"], p["rate"])[:, : _n_fft(p["rate"])]
+    coeffs = design_filters(p["rate"], config.FFT_FILTER_OUT_RANGES)
+    return (lambda: apply_filters(x, coeffs)), x.shape[1]
+
+
+@case("prefilter", "ch", "rate", per="read")
+def _prefilter(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    pf = StreamingPrefilter(p["ch"], fs=p["rate"])
+    return (lambda: pf.process(block, 0.0)), len(block)
+
+
+# FFT 뷰 한 프레임 (결과 캐시를 피하도록 count를 매번 바꿈)
+@case("spectrum", "ch", "rate", per="frame")
+def _spectrum(p):
+    plane = _ring_plane(p["ch"], p["rate"])
+    eng = SpectrumEngine()
+    n_fft = _n_fft(p["rate"])
+    step = max(1, int(p["rate"] / config.FPS))
+    state = {"count": plane.shape[1]}
+
+    def fn():
+        state["count"] += step
+        ptr = state["count"] % plane.shape[1]
+        eng.compute(plane, ptr, True, state["count"], 0, p["rate"], n_fft, config.FFT_MAX_HZ)
+    return fn, n_fft
+
+
+# Spectrogram 한 프레임: 프레임 간격(1/FPS) 동안 들어온 샘플만큼 증분 STFT
+@case("spectrogram", "ch", "rate", per="frame")
+def _spectrogram(p):
+    plane = _ring_plane(p["ch"], p["rate"])
+    eng = SpectrogramEngine(config.SPEC_NFFT, config.SPEC_HOP, config.SPEC_COLUMNS)
+    step = max(1, int(p["rate"] / config.FPS))
+    state = {"count": plane.shape[1]}
+
+    def fn():
+        state["count"] += step
+        eng.update(plane, state["count"] % plane.shape[1], True, state["count"], p["rate"])
+    return fn, step
+
+
+@case("ring_write", "ch", "rate", per="read")
+def _ring_write(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    ring = SampleRing(p["ch"], int(p["rate"] * config.PLOT_SEC), with_filtered=True)
+    times = np.arange(len(block)) / p["rate"]
+    return (lambda: ring.write(block, block, times)), len(block)
+
+
+# 세션 로거의 GUI 스레드 쪽 비용 (디스크 기록은 BackgroundWriter 스레드)
+@case("csv_write_row", "ch")
+def _csv_write_row(p):
+    rows = _signal(p["ch"], 1000, _LINES_PER_CALL).tolist()
+    amp = [0.0] * p["ch"]
+    tmp = tempfile.mkdtemp(prefix="emgbench")
+    n_ch, config.N_CH = config.N_CH, p["ch"]  # 헤더 열 수 (첫 write_row에서 기록)
+    log = CSVLogger(tmp)
+
+    def fn():
+        for i, r in enumerate(rows):
+            log.write_row(r, amp, i)
+
+    def cleanup():
+        with contextlib.redirect_stdout(io.StringIO()):  # 로거의 "Saved:" 출력 숨김
+            log.close()
+        config.N_CH = n_ch
+        shutil.rmtree(tmp, ignore_errors=True)
+    return fn, len(rows), cleanup
+
+
+@case("binary_write_block", "ch", "rate", per="read")
+def _binary_write_block(p):
+    block = _signal(p["ch"], p["rate"], _read_block(p["rate"]))
+    amp = np.zeros_like(block)
+    tmp = tempfile.mkdtemp(prefix="emgbench")
+    log = BinaryLogger(tmp)
+    state = {"t": 0.0}
+    step_ms = 1000.0 / p["rate"]
+
+    def fn():
+        ts = state["t"] + step_ms * np.arange(len(block))
+        state["t"] = ts[-1] + step_ms
+        log.write_block(block, amp, ts)
+
+    def cleanup():
+        with contextlib.redirect_stdout(io.StringIO()):  # 로거의 "Saved:" 출력 숨김
+            log.close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    return fn, len(block), cleanup
+
+
+# fn 호출 시간 측정: 반복 한 번이 min_time/repeats 이상 되도록 루프 수를 맞춘 뒤 repeats번 → 호출당 초 (중앙값, 최소)
+def measure(fn, min_time=0.2, repeats=5):
+    def timed(loops):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        return time.perf_counter() - t0
+
+    fn()  # 워밍업 (캐시·필터 상태)
+    target = min_time / repeats
+    loops = 1
+    while True:
+        dt = timed(loops)
+        if dt >= target:
+            break
+        loops = min(loops * 10, max(loops * 2, int(loops * target / max(dt, 1e-9))))
+    runs = [dt / loops] + [timed(loops) / loops for _ in range(repeats - 1)]
+    return float(np.median(runs)), float(min(runs)), loops
+
+
+def _key(name, params):
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+# 케이스 × 행렬 전체 실행 → {키: 결과}. only가 있으면 키에 그 문자열이 든 것만
+def run_all(min_time=0.2, repeats=5, only=None, out=sys.stdout):
+    axes = {"ch": CHANNELS, "rate": RATES, "n_mult": N_MULTS, "rows": BLOCK_ROWS, "fmt": FORMATS}
+    results = {}
+    for name, case_axes, setup, per in _CASES:
+        for combo in itertools.product(*(axes[a] for a in case_axes)):
+            params = dict(zip(case_axes, combo))
+            key = _key(name, params)
+            if only and not any(s in key for s in only):
+                continue
+            fn, n, *rest = setup(params)
+            try:
+                median, best, loops = measure(fn, min_time, repeats)
+            finally:
+                for cleanup in rest:
+                    cleanup()
+            res = {
+                "case": name,
+                "params": params,
+                "samples_per_call": n,
+                "per_call_us": median * 1e6,
+                "min_per_call_us": best * 1e6,
+                "per_sample_ns": median / n * 1e9,
+                "loops": loops,
+            }
+            # 실제 동작 빈도에서 한 코어 대비 부하 (%)
+            if per == "read":
+                res["load_pct"] = 100.0 * median * 1000.0 / config.SERIAL_LATENCY_BUDGET_MS
+            elif per == "frame":
+                res["load_pct"] = 100.0 * median * config.FPS
+            results[key] = res
+            load = f"{res['load_pct']:7.2f} %" if "load_pct" in res else ""
+            print(f"{key:44s} {res['per_call_us']:11.1f} us/call {res['per_sample_ns']:10.1f} ns/sample {load}",
+                  file=out, flush=True)
+    return results
+
+
+def _meta():
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine(),
+        "system": platform.platform(),
+        "latency_budget_ms": config.SERIAL_LATENCY_BUDGET_MS,
+        "fps": config.FPS,
+    }
+
+
+# 샘플당 최소 시간 (ns). 반복 중 가장 빠른 값이라 중앙값보다 다른 프로세스·스케줄링 잡음에 덜 흔들림
+def _best_ns(res):
+    return res["min_per_call_us"] * 1e3 / res["samples_per_call"]
+
+
+# 기준 결과와 비교: 공통 키마다 샘플당 최소 시간 비율(현재/기준). threshold 넘게 느려지면 회귀.
+# 반환: (행 목록 [(키, 기준 ns, 현재 ns, 비율, 판정)], 회귀 수)
+def compare(baseline, current, threshold=0.10):
+    rows = []
+    regressions = 0
+    for key, cur in current["results"].items():
+        base = baseline["results"].get(key)
+        if base is None:
+            rows.append((key, None, _best_ns(cur), None, "new"))
+            continue
+        ratio = _best_ns(cur) / _best_ns(base)
+        if ratio > 1.0 + threshold:
+            verdict = "REGRESSION"
+            regressions += 1
+        elif ratio < 1.0 - threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        rows.append((key, _best_ns(base), _best_ns(cur), ratio, verdict))
+    return rows, regressions
+
+
+def print_compare(rows, out=sys.stdout):
+    print(f"{'case':44s} {'base ns':>10s} {'now ns':>10s} {'ratio':>7s}", file=out)
+    for key, base, cur, ratio, verdict in rows:
+        base_s = "-" if base is None else f"{base:10.1f}"
+        ratio_s = "-" if ratio is None else f"{ratio:6.2f}x"
+        print(f"{key:44s} {base_s:>10s} {cur:10.1f} {ratio_s:>7s} {verdict}", file=out)
+
+
+# python benchmarks/bench_hotpaths.py [--out results.json] [--compare baseline.json] [--quick] [--only spectrum amp_]
+# 기준 저장: --out baseline.json, 변경 후: --compare baseline.json (회귀가 있으면 종료 코드 1)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Micro-benchmarks for the non-GUI hot paths")
+    ap.add_argument("--out", default=None, help="write results JSON here")
+    ap.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=0.10, help="relative slowdown counted as a regression")
+    ap.add_argument("--quick", action="store_true", help="shorter timing runs (noisier)")
+    ap.add_argument("--only", nargs="*", default=None, help="run only cases whose key contains one of these")
+    args = ap.parse_args()
+
+    np.random.seed(_SEED)
+    results = run_all(0.05 if args.quick else 0.2, 3 if args.quick else 5, args.only)
+    current = {"meta": _meta(), "results": results}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=1)
+        print(f"Saved: {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows, regressions = compare(baseline, current, args.threshold)
+        print()
+        print_compare(rows)
+        print(f"\n{regressions} regression(s) over {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PyQt6.QtWidgets import QApplication
+
+import config
+import graph_render
+from emg_amp import StreamingPeakToPeak
+from synth import EMGSynth
+
+# 측정 행렬: 채널 수 × 링 길이(max_display) × 뷰
+CHANNELS = (4, 6)
+SIZES = (2500, 10000, 50000, config.MAX_BUF)
+VIEWS = ("line", "fill", "fft", "spec")
+BUDGET_MS = 1000.0 / config.FPS
+
+_APPLY = {"line": "_apply_raw_line", "fill": "_apply_raw_fill", "fft": "_apply_fft", "spec": "_apply_spec"}
+_SEED = 1234
+
+
+# 세션 하나 분량의 결정적 입력. 링 길이가 PLOT_SEC 분량이 되는 레이트(size / PLOT_SEC)로 샘플을 만들고,
+# push(n)마다 워커처럼 링에 쓰고(샘플 시각 포함) on_block으로 스케일러 갱신 → 렌더는 실제 세션과 같은 상태를 봄
+class _Feed:
+
+    def __init__(self, win, n_ch, size, n_frames):
+        self.win = win
+        self.rate = size / config.PLOT_SEC
+        self.step = max(1, int(round(self.rate / config.FPS)))  # 프레임 간격 동안 들어오는 샘플 수
+        n = size + self.step * n_frames
+        self.raw = np.rint(EMGSynth(n_ch, self.rate, seed=_SEED).generate(n))
+        amp_est = StreamingPeakToPeak(n_ch, config.BASE_SAMPLES * win.n_mult, config.AMP_HOP_SAMPLES)
+        self.amp = amp_est.update(self.raw)
+        self.pos = 0
+
+    def push(self, n):
+        a, b = self.pos, self.pos + n
+        self.pos = b
+        times = self.win.start_time_ref + np.arange(a, b) / self.rate
+        self.win.ring.write(self.raw[a:b], None, times)
+        self.win.on_block(self.raw[a:b], None, self.amp[a:b], times)
+
+
+# 대시보드를 n_ch채널·링 길이 size의 실행 중 세션 상태로 (세션 기록 없음)
+def _start_session(win, n_ch, size):
+    if config.N_CH != n_ch:
+        win.ring.reset(n_ch=n_ch)
+        win.on_channel_detected(n_ch)
+    win._begin_session(log=False)
+    win._resize_raw_buffers(size)
+    win.set_running_ui(True)
+
+
+# 한 케이스: 링을 한 바퀴 채운 뒤 프레임마다 새 샘플 → graph_render.render 시간과 이어지는 이벤트 처리(그리기) 시간(ms).
+# offscreen의 그리기는 GPU가 아니라 래스터(안티앨리어싱 포함)라 실제 화면보다 훨씬 느릴 수 있어 따로 집계
+def run_case(app, win, n_ch, size, view, frames=120, warmup=15):
+    _start_session(win, n_ch, size)
+    getattr(win, _APPLY[view])()
+    feed = _Feed(win, n_ch, size, warmup + frames)
+    feed.push(size)
+    app.processEvents()
+    render_ms, paint_ms = [], []
+    for i in range(warmup + frames):
+        feed.push(feed.step)
+        t0 = time.perf_counter()
+        graph_render.render(win)
+        t1 = time.perf_counter()
+        app.processEvents()  # 갱신된 아이템 그리기 (offscreen 백킹 스토어)
+        t2 = time.perf_counter()
+        if i >= warmup:
+            render_ms.append((t1 - t0) * 1000)
+            paint_ms.append((t2 - t1) * 1000)
+    win.set_running_ui(False)
+    return np.array(render_ms), np.array(paint_ms)
+
+
+def _percentiles(x):
+    p50, p95, p99 = np.percentile(x, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(x.max()), "mean": float(x.mean())}
+
+
+# 행렬 전체 실행 → ({키: 결과}, 예산 초과 케이스 수). 판정은 render 시간 p95,
+# include_paint면 render + 그리기 시간 p95
+def run_all(channels=CHANNELS, sizes=SIZES, views=VIEWS, frames=120, warmup=15, budget_ms=BUDGET_MS,
+            window_size=(1600, 800), include_paint=False, out=sys.stdout):
+    import dashboard_ui
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    if app.platformName() == "offscreen":
+        config.USE_OPENGL = False  # offscreen에는 GL이 없음 → 그리기는 래스터 경로로 측정
+    win = dashboard_ui.EMGDashboard()
+    win.timer.stop()       # 프레임은 여기서 직접 구동
+    win.rate_timer.stop()  # 링 길이는 케이스가 정함
+    win.resize(*window_size)
+    win.show()
+    app.processEvents()
+
+    results = {}
+    failures = 0
+    gated = "render+paint" if include_paint else "render"
+    print(f"{'case':34s} {'render p50':>10s} {'p95':>7s} {'p99':>7s} {'max':>7s} | {'paint p50':>9s} {'p95':>7s}  "
+          f"(budget {budget_ms:.1f} ms on {gated} p95)", file=out)
+    for n_ch in channels:
+        for size in sizes:
+            for view in views:
+                render_ms, paint_ms = run_case(app, win, n_ch, size, view, frames, warmup)
+                r, p = _percentiles(render_ms), _percentiles(paint_ms)
+                gate = _percentiles(render_ms + paint_ms) if include_paint else r
+                ok = gate["p95"] <= budget_ms
+                failures += not ok
+                key = f"{view}[ch={n_ch},size={size}]"
+                results[key] = {"view": view, "params": {"ch": n_ch, "size": size}, "render_ms": r, "paint_ms": p,
+                                "gated_p95_ms": gate["p95"], "ok": ok}
+                print(f"{key:34s} {r['p50']:10.2f} {r['p95']:7.2f} {r['p99']:7.2f} {r['max']:7.2f} | "
+                      f"{p['p50']:9.2f} {p['p95']:7.2f}  {'OK' if ok else 'FAIL'}", file=out, flush=True)
+    win.close()
+    return results, failures
+
+
+# python benchmarks/bench_render.py [--channels 4 6] [--sizes 2500 100000] [--views line fft] [--out render.json]
+# 케이스마다 render 시간 p95가 예산(1000 / FPS ms)을 넘으면 FAIL, 하나라도 있으면 종료 코드 1
+# (--include-paint: 그리기 시간까지 합산해 판정 — 래스터 그리기라 GPU 화면보다 비관적)
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Offscreen frame-budget harness for graph_render")
+    ap.add_argument("--channels", type=int, nargs="+", default=list(CHANNELS), choices=(4, 6))
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="max_display values")
+    ap.add_argument("--views", nargs="+", default=list(VIEWS), choices=VIEWS)
+    ap.add_argument("--frames", type=int, default=120)
+    ap.add_argument("--warmup", type=int, default=15)
+    ap.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    ap.add_argument("--window", default="1600x800", help="window size WxH")
+    ap.add_argument("--include-paint", action="store_true", help="gate on render + paint time")
+    ap.add_argument("--out", default=None, help="write results JSON here")
+    args = ap.parse_args()
+
+    sizes = [max(config.MIN_BUF, min(config.MAX_BUF, s)) for s in args.sizes]
+    w, h = (int(v) for v in args.window.lower().split("x"))
+    results, failures = run_all(args.channels, sizes, args.views, args.frames, args.warmup, args.budget_ms, (w, h),
+                                args.include_paint)
+    if args.out:
+        meta = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "system": platform.platform(),
+            "qpa": os.environ.get("QT_QPA_PLATFORM"),
+            "window": [w, h],
+            "budget_ms": args.budget_ms,
+            "include_paint": args.include_paint,
+        }
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"meta": meta, "results": results}, f, indent=1)
+        print(f"Saved: {args.out}")
+    print(f"\n{failures} case(s) over the {args.budget_ms:.1f} ms p95 budget")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,175 @@
+import numpy as np
+
+# 이진 프레임 (little-endian)
+#   [0xA5 0x5A][seq: uint16][CH0..CH(N-1): int16 × N][crc: uint16]
+#   crc = CRC-16/CCITT-FALSE(poly 0x1021, init 0xFFFF), seq~채널 데이터 구간에 대해 계산
+#   4ch = 14 bytes, 6ch = 18 bytes. 채널 수는 CRC가 맞는 프레임 길이로 자동 감지
+SYNC = b"\xa5\x5a"
+SEQ_MOD = 1 << 16
+SUPPORTED_CH = (4, 6)
+
+
+def frame_size(n_ch: int) -> int:
+    return 2 + 2 + 2 * n_ch + 2
+
+
+def _make_crc_table():
+    table = np.zeros(256, dtype=np.uint32)
+    for i in range(256):
+        c = i << 8
+        for _ in range(8):
+            c = ((c << 1) ^ 0x1021) if c & 0x8000 else (c << 1)
+        table[i] = c & 0xFFFF
+    return table
+
+
+_CRC_TABLE = _make_crc_table()
+
+
+# (k, m) uint8 행렬의 행마다 바이트 순서대로 CRC-16 계산 (열마다 루프). 위치별 표를 만들 때만 씀
+def _crc16_bytewise(rows, init):
+    crc = np.full(rows.shape[0], init, dtype=np.uint32)
+    for j in range(rows.shape[1]):
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC_TABLE[((crc >> 8) ^ rows[:, j]) & 0xFF]
+    return crc
+
+
+# CRC는 GF(2) 위에서 선형이라 길이 m 메시지의 CRC = init 기여 ^ (바이트 위치 j마다 T[j·256 + 바이트]의 XOR).
+# 길이별로 (T, init 기여, 위치 오프셋)을 한 번 만들어 둠
+_POS_TABLES = {}
+
+
+def _position_tables(m):
+    t = _POS_TABLES.get(m)
+    if t is None:
+        offsets = np.arange(m, dtype=np.uint16) * 256
+        rows = np.zeros((m * 256, m), dtype=np.uint8)
+        rows[np.arange(m * 256), np.repeat(np.arange(m), 256)] = np.tile(np.arange(256), m)
+        table = _crc16_bytewise(rows, 0).astype(np.uint16)
+        init = np.uint16(_crc16_bytewise(np.zeros((1, m), dtype=np.uint8), 0xFFFF)[0])
+        t = _POS_TABLES[m] = (table, init, offsets)
+    return t
+
+
+# (k, m) uint8 행렬의 행마다 CRC-16 계산. 프레임 행렬 전체를 위치별 표로 한 번에 찾아 행마다 XOR
+def crc16_rows(rows: np.ndarray) -> np.ndarray:
+    table, init, offsets = _position_tables(rows.shape[1])
+    return np.bitwise_xor.reduce(table[rows + offsets], axis=1) ^ init
+
+
+# (n, n_ch) 정수 샘플 → 프레임 바이트열 (합성 신호 생성·테스트용)
+def encode_frames(samples, seq_start: int = 0) -> bytes:
+    samples = np.asarray(samples)
+    n, n_ch = samples.shape
+    frames = np.empty((n, frame_size(n_ch)), dtype=np.uint8)
+    frames[:, 0:2] = np.frombuffer(SYNC, dtype=np.uint8)
+    seq = ((seq_start + np.arange(n)) % SEQ_MOD).astype("<u2")
+    frames[:, 2:4] = seq.view(np.uint8).reshape(n, 2)
+    vals = np.clip(np.rint(samples), -32768, 32767).astype("<i2")
+    frames[:, 4:-2] = vals.view(np.uint8).reshape(n, 2 * n_ch)
+    crc = crc16_rows(frames[:, 2:-2]).astype("<u2")
+    frames[:, -2:] = crc.view(np.uint8).reshape(n, 2)
+    return frames.tobytes()
+
+
+# 바이트 스트림 → (n, n_ch) 샘플. 손상 바이트는 건너뛰고 다음 동기 헤더에서 재동기화,
+# 시퀀스 번호 차이로 누락 프레임 수 집계. 끝의 미완성 프레임은 다음 decode로 이월
+class FrameDecoder:
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._buf = bytearray()
+        self.last_seq = None
+        self.seq = np.empty(0, dtype=np.int64)  # 마지막 decode 결과의 프레임별 시퀀스 번호
+        self.frames_ok = 0
+        self.frames_dropped = 0
+        self.bytes_skipped = 0
+
+    # 동기 헤더 위치에서 CRC가 맞는 프레임 길이로 채널 수 감지. 판단에 바이트가 모자라면 0
+    @staticmethod
+    def _detect_n_ch(arr, pos):
+        if len(arr) - pos < frame_size(max(SUPPORTED_CH)):
+            return 0
+        for n in SUPPORTED_CH:
+            size = frame_size(n)
+            frame = arr[pos : pos + size][None, :]
+            crc = int(frame[0, -2]) | (int(frame[0, -1]) << 8)
+            if int(crc16_rows(frame[:, 2:-2])[0]) == crc:
+                return n
+        return None
+
+    def decode(self, data: bytes, n_ch=None):
+        self._buf.extend(data)
+        # 버퍼는 복사하지 않고 numpy 뷰로 읽음. 뷰가 살아 있으면 bytearray 크기를 바꿀 수 없으므로
+        # 필요한 열만 _scan 안에서 복사해 꺼내고, 뷰가 사라진 뒤 소비한 앞부분을 지움
+        pos, n_ch, seq, samples = self._scan(n_ch)
+        del self._buf[:pos]
+
+        if seq is None:
+            self.seq = np.empty(0, dtype=np.int64)
+            return np.empty((0, n_ch or 0)), n_ch
+
+        prev = seq[0] - 1 if self.last_seq is None else self.last_seq
+        gaps = (np.diff(seq, prepend=prev) - 1) % SEQ_MOD
+        self.frames_dropped += int(gaps.sum())
+        self.frames_ok += len(seq)
+        self.last_seq = int(seq[-1])
+        self.seq = seq
+        return samples, n_ch
+
+    # 버퍼에서 연속으로 CRC가 맞는 프레임 묶음을 찾음 → (소비한 바이트 수, n_ch, 시퀀스, 샘플)
+    def _scan(self, n_ch):
+        arr = np.frombuffer(self._buf, dtype=np.uint8)
+        sync_pos = None  # 동기 헤더 위치는 프레임 경계가 어긋났을 때만 버퍼 전체에서 찾음
+
+        blocks = []
+        pos = 0
+        while True:
+            if n_ch is None or self._buf[pos : pos + 2] != SYNC:
+                if sync_pos is None:
+                    sync_pos = np.flatnonzero((arr[:-1] == 0xA5) & (arr[1:] == 0x5A))
+                k_sync = np.searchsorted(sync_pos, pos)
+                if k_sync >= sync_pos.size:
+                    # 동기 헤더 없음: 마지막 바이트(헤더 앞 절반일 수 있음)만 남김
+                    keep_from = max(pos, len(arr) - 1)
+                    self.bytes_skipped += keep_from - pos
+                    pos = keep_from
+                    break
+                hit = int(sync_pos[k_sync])
+                self.bytes_skipped += hit - pos
+                pos = hit
+
+            if n_ch is None:
+                n_ch = self._detect_n_ch(arr, pos)
+                if n_ch == 0:
+                    n_ch = None
+                    break
+                if n_ch is None:
+                    pos += 1
+                    self.bytes_skipped += 1
+                    continue
+
+            size = frame_size(n_ch)
+            k = (len(arr) - pos) // size
+            if k == 0:
+                break
+            frames = arr[pos : pos + k * size].reshape(k, size)
+            ok = frames[:, :2].view("<u2")[:, 0] == 0x5AA5
+            ok &= crc16_rows(frames[:, 2:-2]) == frames[:, -2:].view("<u2")[:, 0]
+            n_ok = k if ok.all() else int(np.argmin(ok))  # 앞에서부터 연속으로 맞는 프레임 수
+            if n_ok:
+                blocks.append(frames[:n_ok])
+                pos += n_ok * size
+            if n_ok == k:
+                break
+            # 손상 프레임: 1바이트 건너뛰고 다음 동기 헤더부터 다시
+            pos += 1
+            self.bytes_skipped += 1
+
+        if not blocks:
+            return pos, n_ch, None, None
+        frames = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+        seq = frames[:, 2:4].view("<u2")[:, 0].astype(np.int64)
+        return pos, n_ch, seq, frames[:, 4:-2].view("<i2").astype(float)
@@ -2,21 +2,71 @@ import math
 
 N_CH = 4
 FPS = 30
+USE_OPENGL = True  # pyqtgraph GPU 렌더. GL이 없는 환경(QT_QPA_PLATFORM=offscreen 등)에서는 False → 래스터 그리기
 PLOT_SEC = 5.0
 
 MIN_BUF = 100
 MAX_BUF = 100000
-RATE_UPDATE_INTERVAL = 1.0
-BUF_RESIZE_THRESHOLD = 0.15
-# 첫 리사이즈 전 대기 시간(초). 5초 뒤 한 번만 리사이즈
+RATE_UPDATE_INTERVAL = 1.0     # 수신 속도 확인·버퍼 리사이즈 주기(초, GUI 타이머)
+BUF_RESIZE_THRESHOLD = 0.15    # 첫 리사이즈 이후에는 목표 길이가 이 비율 넘게 다를 때만 리사이즈 (히스테리시스)
+# 첫 리사이즈 전 대기 시간(초). 이 시점의 첫 리사이즈는 임계값 없이 적용
 FIRST_RESIZE_AFTER_SEC = 5.0
 # 수신 속도 측정 전 RAW 버퍼 초기 크기 = 이 값 × PLOT_SEC (5초 분량 가정)
 RAW_SAMPLE_RATE_DEFAULT = 500  # Hz
 
 # [시리얼/신호 처리]
-ENABLE_CSV_LOGGING = True
+ENABLE_CSV_LOGGING = True       # 세션 기록 사용 여부 (형식은 LOG_FORMAT)
+# 기록 형식: "binary"(recording.py .emgrec, 청크 단위 정수 배열) 또는 "csv"(logger.py)
+LOG_FORMAT = "binary"
+LOG_CHUNK_ROWS = 4096           # 이진 기록 청크당 행 수
+LOG_COMPRESS = True             # 청크를 행 방향 차분 + zlib으로 압축
+LOG_ZLIB_LEVEL = 6
+LOG_SEGMENT_SEC = 600           # 이진 기록 세그먼트 파일 길이(초), 0이면 나누지 않음 (청크 인덱스는 항상 기록)
+# 기록 스레드(log_writer.BackgroundWriter): 넘겨받은 버퍼 큐. 로거(GUI 스레드) 쪽 submit은 기다리지 않음
+LOG_QUEUE_MAX = 8               # 기록 스레드 큐 목표 상한. 넘으면 GUI 쪽은 기다리지 않고 메모리에 더 쌓음(stalls)
+LOG_QUEUE_SPILL_MAX = 256       # 이만큼 쌓이면(디스크가 멈춤) 새 버퍼는 버림(dropped)
+# fsync 정책: "close"(종료 때만) / "interval"(LOG_FSYNC_INTERVAL_SEC마다) / "always"(버퍼마다)
+LOG_FSYNC = "interval"
+LOG_FSYNC_INTERVAL_SEC = 2.0
+# True면 read() 한 번에 파싱된 샘플을 (n, N_CH) 블록으로 묶어 sig_block 하나로 전송 (샘플당 시그널 X)
+SERIAL_BLOCK_MODE = True
+# 시리얼 데이터 형식: "ascii"(한 줄에 숫자 4/6개) 또는 "binary"(binary_frame.py 고정 길이 프레임)
+SERIAL_PROTOCOL = "ascii"
+# 수신 루프: sleep 폴링 대신 블로킹 read. 한 번에 요청하는 바이트 = max(최소 크기, 대기 바이트, 수신 속도 × 지연 예산)
+# 데이터가 모자라면 SERIAL_READ_TIMEOUT_SEC 뒤에 받은 만큼만 반환 → 최악 수신 지연 = timeout
+SERIAL_LATENCY_BUDGET_MS = 10   # 클수록 read 횟수↓, 배치 크기↑
+SERIAL_READ_TIMEOUT_SEC = SERIAL_LATENCY_BUDGET_MS / 1000
+SERIAL_MIN_READ_BYTES = 1
+SERIAL_STATS_INTERVAL = 1.0     # 수신 통계(sig_stats) 발송 주기(초)
+# 수신 시간축 (timebase.py): 워커가 read마다 단조 시계로 찍은 도착 시각을 샘플 인덱스(이진이면 seq)에 회귀
+TIMEBASE_WINDOW_SEC = 2.0       # 샘플 간격·절편 추정에 쓰는 최근 read 구간(초)
+TIMEBASE_RATE_TOL = 0.02        # 최근 구간 속도가 이 비율 넘게 달라지면 회귀 구간을 새로 시작
+TIMEBASE_RATE_WINDOW_SEC = 2.0  # FFT·Spectrogram fs 추정에 쓰는 최근 샘플 시각 구간(초)
+# 수신 실행 방식: "thread"(QThread, 기본) 또는 "process"(별도 프로세스 + 공유 메모리 링, acq_process.py)
+ACQ_MODE = "thread"
+ACQ_STOP_JOIN_SEC = 1.0         # STOP 후 수신 프로세스 종료 대기(초). 넘으면 terminate 후 한 번 더 대기
+ACQ_SHM_CAPACITY = 1 << 16      # 공유 메모리 링 행 수 (UI가 멈춰도 이만큼은 유실 없이 보관)
+# 녹화 재생 (replay.py ReplayWorker): 기록된 세션(.emgidx/.emgrec/.csv)을 수신 경로와 같은 처리로 다시 흘려보냄
+REPLAY_SPEEDS = [1, 2, 4, 10, 0]  # UI 선택지 (배속, 0 = 최대 속도)
+REPLAY_FAST_BLOCK = 2000          # 최대 속도 재생 시 한 번에 보내는 샘플 수
+REPLAY_MAX_INFLIGHT = 4           # UI가 아직 처리하지 않은 블록 상한 (넘으면 재생 쪽이 대기)
 BASE_SAMPLES = 5
 N_MULT_DEFAULT = 10
+# 진폭 발행 간격(샘플). 0이면 윈도우 길이(BASE_SAMPLES × n_mult)마다 한 번, 1이면 매 샘플
+AMP_HOP_SAMPLES = 0
+# 수신 경로 선필터 (prefilter.py): 블록마다 인과 SOS 필터를 상태 이월하며 적용, 필터된 스트림을 링·시그널로 함께 전달.
+# 기본은 꺼짐(옵트인). 켜고 PREFILTER_FOR_FFT도 켜면 FFT 뷰가 영위상 filtfilt 대신 인과 필터 출력을 씀
+PREFILTER_ENABLED = False
+PREFILTER_RANGES = [(0, 5), (50, 60)]  # 제거 구간 (low_hz, high_hz). low가 1Hz 미만이면 고역통과
+PREFILTER_FS_HZ = 0             # 필터 설계 fs. 0이면 PREFILTER_MEASURE_SEC마다 수신 속도를 측정해 사용
+PREFILTER_MEASURE_SEC = 1.0
+PREFILTER_REDESIGN_TOL = 0.05   # (측정 fs) 이후 측정 속도가 설계 fs와 이 비율 넘게 다르면 필터 재설계
+PREFILTER_DC_HZ = 0.5           # 고역통과로 빠진 DC(레벨)를 다시 더할 때 쓰는 1차 저역통과 차단 주파수
+# 필터된 스트림을 쓸 소비자 (False면 raw)
+PREFILTER_FOR_RAW = False       # RAW Line/Fill·스케일러·Diagonal
+PREFILTER_FOR_FFT = False       # FFT·Spectrogram 뷰 (True면 FFT_APPLY_FILTER의 프레임별 filtfilt 생략)
+PREFILTER_FOR_AMP = False       # 진폭(amp)·PWR
+PREFILTER_FOR_LOG = False       # 기록(CSV·이진) Raw 열
 
 # [RAW 그래프 스케일]
 CH_OFFSET = 100
@@ -26,6 +76,12 @@ RAW_Y_MAX_INIT = 100
 RAW_ZERO_REF = 100
 RAW_ZERO_THRESHOLD = 1.0
 NO_SIGNAL_VARIATION_RAW = 1.0
+# Line 모드 LOD: 보이는 구간을 픽셀 열마다 min/max 두 점으로 줄여 그림 (lod.py). False면 전체 샘플
+LINE_LOD_ENABLED = True
+LINE_LOD_DEFAULT_COLS = 1000    # 플롯 폭을 아직 모를 때(배치 전) 가정할 픽셀 열 수
+# Line 모드 Y 캐시: 스케일 기준이 바뀌어 캐시된 Y가 이 값(Y 단위, 채널 높이 CH_OFFSET=100)보다
+# 더 어긋날 수 있을 때만 그 채널 전체 재스케일. 0이면 기준이 바뀔 때마다
+LINE_RESCALE_TOL = 0.5
 
 # [디자인 설정]
 RAW_LINE_WIDTH = 1.6
@@ -65,8 +121,23 @@ SUM_BAR_COLOR = "#9fb3ff"
 # [FFT 시각화]
 FFT_WINDOW_SEC = 0.8  # FFT에 쓸 구간 길이 (초)
 FFT_SAMPLE_RATE_DEFAULT = 1000  # 초기값: 수신속도 측정 전에만 사용 (Hz)
+FFT_FS_RESOLUTION_HZ = 1.0  # 측정 fs 반올림 단위. 이 단위로 바뀔 때만 필터·윈도우·주파수 축 재계산
 FFT_MAX_HZ = 500
 FFT_APPLY_FILTER = True
 FFT_FILTER_OUT_RANGES = [(0, 5), (50, 60)]  # (low_hz, high_hz) 리스트
 # FFT 전체 진폭 배율 (1.0 = 현재 값 그대로, 0.5 = 절반 크기, 2.0 = 두 배)
-FFT_Y_GAIN = 0.3
\ No newline at end of file
+FFT_Y_GAIN = 0.3
+# [Spectrogram 시각화] 증분 STFT (프레임·hop은 샘플 단위, 필터는 FFT_APPLY_FILTER·FFT_FILTER_OUT_RANGES 공유)
+SPEC_NFFT = 256        # STFT 프레임 길이 (샘플)
+SPEC_HOP = 64          # 프레임 간격 (샘플). 새 샘플 SPEC_HOP개마다 열 하나
+SPEC_COLUMNS = 400     # 이미지 링 열 수 (표시 시간 ≈ SPEC_COLUMNS × SPEC_HOP / fs)
+SPEC_DB_RANGE = 50.0   # 채널별 색 범위: 이미지 최대 dB에서 이만큼 아래까지
+SPEC_BLANK_DB = -200.0  # 아직 데이터 없는 열의 값 (색 범위 최저로 표시)
+SPEC_COLORMAP = "viridis"
+# [렌더 프로파일러] 단계별 렌더 시간·달성 FPS·놓친 틱·수신 속도·backlog (HUD는 F3 또는 설정 행 체크박스)
+PROFILE_HUD = False             # 시작 시 HUD 표시
+PROFILE_LOG = False             # 시작 시 롤링 CSV 로그 (data/*_profile.csv)
+PROFILE_WINDOW_FRAMES = 90      # 통계에 쓰는 최근 프레임 수 (FPS 30이면 3초)
+PROFILE_REPORT_SEC = 0.5        # HUD 갱신·로그 한 줄 간격 (초)
+PROFILE_LOG_MAX_BYTES = 1_000_000  # 이 크기를 넘으면 .1, .2 … 로 밀어내고 새 파일
+PROFILE_LOG_BACKUPS = 3         # 보관할 이전 로그 수
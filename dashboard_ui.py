@@ -4,15 +4,18 @@ import serial.tools.list_ports
 import pyqtgraph as pg
 
 from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton, QComboBox, QCheckBox, QFrame, QSpinBox, QMessageBox,
-    QRadioButton, QButtonGroup, QStackedWidget,
+    QRadioButton, QButtonGroup, QStackedWidget, QFileDialog,
 )
 
 import config
+import timebase
 from emg_scale import EMGScaleManager
 from logger import CSVLogger
+from recording import BinaryLogger
 from config import (
     FPS, PLOT_SEC,
     N_MULT_DEFAULT,
@@ -28,14 +31,18 @@ from config import (
     FFT_MAX_HZ,
 )
 from serial_worker import SerialWorker
+from acq_process import ProcessSerialWorker
+from replay import ReplayWorker
+from ring_buffer import SampleRing
 from graph_render import render as render_impl
+from profiler import RenderProfiler, ProfileLog, format_report
 
 
 class EMGDashboard(QMainWindow):
 
     def __init__(self):
         super().__init__()
-        pg.setConfigOptions(antialias=True, useOpenGL=True)
+        pg.setConfigOptions(antialias=True, useOpenGL=config.USE_OPENGL)
         self.setWindowTitle("EMG Dashboard (Real-time Monitoring)")
         self.resize(1600, 800)
 
@@ -45,7 +52,9 @@ class EMGDashboard(QMainWindow):
 
         # RAW 버퍼: 초기값 = 예상 rate × PLOT_SEC (5초 분량), START 후 실제 수신 속도로 동적 조정
         self.max_display = max(MIN_BUF, min(MAX_BUF, int(round(RAW_SAMPLE_RATE_DEFAULT * PLOT_SEC))))
-        self.raw_np_buf = np.zeros((config.N_CH, self.max_display))
+        # 워커가 직접 쓰는 공유 링 버퍼. raw_np_buf·ptr·is_buf_full은 렌더가 프레임마다 스냅샷으로 갱신
+        self.ring = SampleRing(config.N_CH, self.max_display, with_filtered=config.PREFILTER_ENABLED)
+        self.raw_np_buf = self.ring.data
         self.x_axis = np.linspace(0, PLOT_SEC * 1000, self.max_display)
         self._last_rate_update_time = 0.0
 
@@ -65,23 +74,46 @@ class EMGDashboard(QMainWindow):
         self.last_amp = np.zeros(config.N_CH, dtype=float)
         self.is_running = False
 
-        self.csv_logger = None
-        self.worker = SerialWorker()
-        self.worker.sig_sample.connect(self.on_sample)
-        self.worker.sig_status.connect(self.set_status)
-        self.worker.sig_error.connect(self.on_error)
-        self.worker.sig_channel_detected.connect(self.on_channel_detected)
+        self.data_logger = None
+        self.log_stats = {}  # 세션 로거 기록 스레드 지표 (rate_timer마다 갱신, STOP 때 최종값)
+        # 수신 워커: 같은 시그널을 내는 스레드 / 별도 프로세스 구현 중 선택.
+        # 녹화 재생(ReplayWorker)도 같은 시그널 → self.worker는 이번 세션의 소스
+        self.serial_worker = ProcessSerialWorker() if config.ACQ_MODE == "process" else SerialWorker()
+        self.replay_worker = ReplayWorker()
+        for worker in (self.serial_worker, self.replay_worker):
+            worker.ring = self.ring
+            worker.sig_sample.connect(self.on_sample)
+            worker.sig_block.connect(self.on_block)
+            worker.sig_status.connect(self.set_status)
+            worker.sig_error.connect(self.on_error)
+            worker.sig_channel_detected.connect(self.on_channel_detected)
+            worker.sig_stats.connect(self.on_stats)
+        self.replay_worker.finished.connect(self._on_replay_finished)
+        self.worker = self.serial_worker
 
         self.set_running_ui(False)
 
+        # 렌더 프로파일러: HUD 또는 롤링 로그가 켜져 있을 때만 계측 (F3 = HUD 토글)
+        self.profiler = RenderProfiler()
+        self.profile_log = None
+        self._profile_report_t = 0.0
+        self.cb_prof_hud.setChecked(config.PROFILE_HUD)
+        self.cb_prof_log.setChecked(config.PROFILE_LOG)
+        self.sc_prof_hud = QShortcut(QKeySequence("F3"), self)
+        self.sc_prof_hud.activated.connect(self.cb_prof_hud.toggle)
+
         self.timer = QTimer(self)
         self.timer.setInterval(int(1000 / FPS))
         self.timer.timeout.connect(self.render)
         self.timer.start()
+
+        # 수신 속도 추적·버퍼 리사이즈 (START~STOP 동안만)
+        self.rate_timer = QTimer(self)
+        self.rate_timer.setInterval(int(RATE_UPDATE_INTERVAL * 1000))
+        self.rate_timer.timeout.connect(self._update_buffer_size)
+        self.rate_timer.timeout.connect(self._poll_log_stats)
         self.refresh_ports()
 
-        self.height_buf = np.zeros((config.N_CH, self.max_display))
-        self.height_buf.fill(1.5)
 
     def set_running_ui(self, running: bool):
         self.btn_start.setEnabled(not running)
@@ -89,6 +121,9 @@ class EMGDashboard(QMainWindow):
         self.cb_port.setEnabled(not running)
         self.btn_refresh.setEnabled(not running)
         self.sp_nmult.setEnabled(not running)
+        self.cb_protocol.setEnabled(not running)
+        self.btn_replay.setEnabled(not running)
+        self.cb_speed.setEnabled(not running)
         self.is_running = running
 
     def _apply_raw_line(self):
@@ -99,12 +134,13 @@ class EMGDashboard(QMainWindow):
         if hasattr(self, "stacked_plots"):
             self.stacked_plots.setCurrentIndex(0)
         if hasattr(self, "rb_line") and hasattr(self, "rb_fill") and hasattr(self, "rb_fft"):
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(True)
             self.rb_line.setChecked(True)
             self.rb_fill.setChecked(False)
             self.rb_fft.setChecked(False)
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            self.rb_spec.setChecked(False)
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(False)
         if self.graph_panel_title_label:
             self.graph_panel_title_label.setText("RAW GRAPH (Dynamic Auto-Scaling)")
@@ -117,12 +153,13 @@ class EMGDashboard(QMainWindow):
         if hasattr(self, "stacked_plots"):
             self.stacked_plots.setCurrentIndex(0)
         if hasattr(self, "rb_line") and hasattr(self, "rb_fill") and hasattr(self, "rb_fft"):
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(True)
             self.rb_line.setChecked(False)
             self.rb_fill.setChecked(True)
             self.rb_fft.setChecked(False)
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            self.rb_spec.setChecked(False)
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(False)
         if self.graph_panel_title_label:
             self.graph_panel_title_label.setText("RAW GRAPH (Dynamic Auto-Scaling)")
@@ -135,16 +172,37 @@ class EMGDashboard(QMainWindow):
         if hasattr(self, "stacked_plots"):
             self.stacked_plots.setCurrentIndex(1)
         if hasattr(self, "rb_line") and hasattr(self, "rb_fill") and hasattr(self, "rb_fft"):
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(True)
             self.rb_line.setChecked(False)
             self.rb_fill.setChecked(False)
             self.rb_fft.setChecked(True)
-            for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+            self.rb_spec.setChecked(False)
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
                 rb.blockSignals(False)
         if self.graph_panel_title_label:
             self.graph_panel_title_label.setText("FFT (Frequency)")
 
+    def _apply_spec(self):
+        """Spec 선택 → 채널별 스펙트로그램(시간–주파수)으로 바로 전환"""
+        if getattr(self, "view_mode", None) == "spec":
+            return
+        self.view_mode = "spec"
+        self._spec_layout = None  # 제목·축 배치 다시
+        if hasattr(self, "stacked_plots"):
+            self.stacked_plots.setCurrentIndex(2)
+        if hasattr(self, "rb_line") and hasattr(self, "rb_fill") and hasattr(self, "rb_fft"):
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
+                rb.blockSignals(True)
+            self.rb_line.setChecked(False)
+            self.rb_fill.setChecked(False)
+            self.rb_fft.setChecked(False)
+            self.rb_spec.setChecked(True)
+            for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
+                rb.blockSignals(False)
+        if self.graph_panel_title_label:
+            self.graph_panel_title_label.setText("SPECTROGRAM")
+
     # 센서가 줄 단위로 보낸 개수(4 또는 6)로 채널 수 자동 감지
     def on_channel_detected(self, n: int):
         config.N_CH = n
@@ -156,10 +214,9 @@ class EMGDashboard(QMainWindow):
         n = config.N_CH
 
         # 내부 데이터 버퍼 초기화 
+        # 링 버퍼는 워커가 감지 시점에 이미 n채널로 리셋함
         self.scale_manager = EMGScaleManager(n_channels=n)
-        self.raw_np_buf = np.zeros((n, self.max_display))
-        self.height_buf = np.zeros((n, self.max_display))
-        self.height_buf.fill(1.5)
+        self.raw_np_buf = self.ring.data
         self.last_amp = np.zeros(n, dtype=float)
         self.cursor_colors = ["#ffffff"] * n
         self.ptr = 0
@@ -231,6 +288,12 @@ class EMGDashboard(QMainWindow):
             line = self.fft_plot.plot([], [], pen=pg.mkPen(color=get_ch_color(i), width=RAW_LINE_WIDTH))
             self.fft_lines.append(line)
 
+        # Spectrogram 이미지 재생성 (채널 수에 맞게)
+        for item in self.spec_images:
+            self.spec_plot.removeItem(item)
+        self.spec_images.clear()
+        self._add_spec_images(n)
+
         # PWR Plot 재생성 
         self.pwr_plot.removeItem(self.bar_item)
         
@@ -248,30 +311,10 @@ class EMGDashboard(QMainWindow):
 
     # 수신 속도에 맞춰 RAW 링 버퍼를 new_len으로 조정. 최근 데이터만 복사
     def _resize_raw_buffers(self, new_len: int):
-        n_ch = config.N_CH
-        old_len = self.max_display
-        if self.is_buf_full:
-            seq = [(self.ptr + i) % old_len for i in range(old_len)]
-        else:
-            seq = list(range(self.ptr))
-        take = min(new_len, len(seq))
-        new_raw = np.zeros((n_ch, new_len))
-        new_height = np.ones((n_ch, new_len)) * 1.5
-        if take > 0:
-            indices = seq[-take:]
-            for ch in range(n_ch):
-                new_raw[ch, :take] = self.raw_np_buf[ch, indices]
-                new_height[ch, :take] = self.height_buf[ch, indices]
-        self.raw_np_buf = new_raw
-        self.height_buf = new_height
+        self.ring.resize(new_len)
+        self.ptr, self.is_buf_full, self.raw_np_buf, _, _, _ = self.ring.snapshot()
         self.max_display = new_len
         self.x_axis = np.linspace(0, PLOT_SEC * 1000, new_len)
-        if take >= new_len:
-            self.ptr = 0
-            self.is_buf_full = True
-        else:
-            self.ptr = take
-            self.is_buf_full = False
 
     def card(self, title: str):
         frame = QFrame()
@@ -361,12 +404,54 @@ class EMGDashboard(QMainWindow):
         self.sp_nmult.setValue(self.n_mult)
         row_form.addWidget(self.sp_nmult)
         row_form.addStretch()
+
+        # 시리얼 데이터 형식 (ASCII 줄 / 이진 프레임)
+        row_form.addWidget(QLabel("Format:"))
+        self.cb_protocol = QComboBox()
+        self.cb_protocol.addItem("ASCII", "ascii")
+        self.cb_protocol.addItem("Binary", "binary")
+        self.cb_protocol.setCurrentIndex(max(0, self.cb_protocol.findData(config.SERIAL_PROTOCOL)))
+        row_form.addWidget(self.cb_protocol)
         lay.addLayout(row_form)
 
+        # 녹화 재생: 파일 선택 후 바로 시작 (STOP으로 중지, 끝나면 자동 STOP)
+        row_replay = QHBoxLayout()
+        row_replay.addWidget(QLabel("Replay:"))
+        self.cb_speed = QComboBox()
+        for speed in config.REPLAY_SPEEDS:
+            self.cb_speed.addItem("Max" if speed <= 0 else f"{speed:g}x", speed)
+        row_replay.addWidget(self.cb_speed)
+        self.btn_replay = QPushButton("Open...")
+        self.btn_replay.clicked.connect(self.open_replay)
+        row_replay.addWidget(self.btn_replay, 1)
+        lay.addLayout(row_replay)
+
+        # 렌더 프로파일러: 그래프 위 HUD (F3) / data/*_profile.csv 롤링 로그
+        row_prof = QHBoxLayout()
+        row_prof.addWidget(QLabel("Profiler:"))
+        self.cb_prof_hud = QCheckBox("HUD (F3)")
+        self.cb_prof_hud.toggled.connect(self._set_profile_hud)
+        row_prof.addWidget(self.cb_prof_hud)
+        self.cb_prof_log = QCheckBox("Log")
+        self.cb_prof_log.toggled.connect(self._set_profile_log)
+        row_prof.addWidget(self.cb_prof_log)
+        row_prof.addStretch()
+        lay.addLayout(row_prof)
+
         # 연결 상태 표시 라벨 
         self.lbl_status = QLabel("● DISCONNECTED")
         self.lbl_status.setStyleSheet(f"color:{COLOR_STATUS_DISCONNECTED}; font-weight:800;")
         lay.addWidget(self.lbl_status)
+
+        # 수신 통계 (SERIAL_STATS_INTERVAL마다 워커 sig_stats: read 횟수·크기·대기 비율, 재생이면 위치·배속)
+        self.lbl_read_stats = QLabel("")
+        self.lbl_read_stats.setStyleSheet("color: #8892b0; font-size: 11px;")
+        lay.addWidget(self.lbl_read_stats)
+
+        # 세션 기록 상태 (기록 바이트·큐 깊이, 기록 스레드가 밀리면 경고 색)
+        self.lbl_log_status = QLabel("")
+        self.lbl_log_status.setStyleSheet("color: #8892b0; font-size: 11px;")
+        lay.addWidget(self.lbl_log_status)
         return frame
 
     def build_raw_plot_panel(self):
@@ -386,23 +471,27 @@ class EMGDashboard(QMainWindow):
 
         header_layout.addStretch()  # 오른쪽으로 밀기
 
-        # Line / Fill / FFT 중 하나 선택 시 해당 뷰로 바로 전환
+        # Line / Fill / FFT / Spec 중 하나 선택 시 해당 뷰로 바로 전환
         self.rb_line = QRadioButton("Line")
         self.rb_fill = QRadioButton("Fill")
         self.rb_fft = QRadioButton("FFT")
+        self.rb_spec = QRadioButton("Spec")
         self.rb_line.setChecked(True)
-        for rb in (self.rb_line, self.rb_fill, self.rb_fft):
+        for rb in (self.rb_line, self.rb_fill, self.rb_fft, self.rb_spec):
             rb.setStyleSheet("color: white; font-weight: bold;")
         self.bg_display = QButtonGroup(self)
         self.bg_display.addButton(self.rb_line)
         self.bg_display.addButton(self.rb_fill)
         self.bg_display.addButton(self.rb_fft)
+        self.bg_display.addButton(self.rb_spec)
         self.rb_line.toggled.connect(lambda checked: self._apply_raw_line() if checked else None)
         self.rb_fill.toggled.connect(lambda checked: self._apply_raw_fill() if checked else None)
         self.rb_fft.toggled.connect(lambda checked: self._apply_fft() if checked else None)
+        self.rb_spec.toggled.connect(lambda checked: self._apply_spec() if checked else None)
         header_layout.addWidget(self.rb_line)
         header_layout.addWidget(self.rb_fill)
         header_layout.addWidget(self.rb_fft)
+        header_layout.addWidget(self.rb_spec)
 
         lay.addLayout(header_layout)
         
@@ -479,6 +568,29 @@ class EMGDashboard(QMainWindow):
             line = self.fft_plot.plot([], [], pen=pg.mkPen(color=get_ch_color(i), width=RAW_LINE_WIDTH))
             self.fft_lines.append(line)
         self.stacked_plots.addWidget(self.fft_plot)
+
+        # Spectrogram 플롯 (x = 초, 최신이 0 / 채널별 ImageItem을 FFT처럼 Y 밴드로 분리)
+        self.spec_plot = pg.PlotWidget()
+        self.spec_plot.setBackground(COLOR_BG)
+        self.spec_plot.hideButtons()
+        self.spec_plot.getAxis("left").setStyle(showValues=False)
+        self.spec_plot.getAxis("bottom").enableAutoSIPrefix(False)
+        self.spec_plot.setLabel("bottom", "Time", units="s")
+        self.spec_plot.setYRange(0, config.N_CH * CH_OFFSET, padding=0)
+        self.spec_plot.setMouseEnabled(x=True, y=True)
+        self.spec_images = []
+        self._add_spec_images(config.N_CH)
+        self.stacked_plots.addWidget(self.spec_plot)
+
+        # 프로파일러 HUD: 스택 위에 떠 있는 반투명 라벨 (마우스 입력은 아래 플롯으로 통과)
+        self.lbl_prof_hud = QLabel(self.stacked_plots)
+        self.lbl_prof_hud.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: #d8e0ff; padding: 6px;"
+            "font-family: monospace; font-size: 11px;"
+        )
+        self.lbl_prof_hud.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.lbl_prof_hud.move(8, 8)
+        self.lbl_prof_hud.hide()
         # 초기: Line 선택 상태에 맞춰 Raw 뷰·제목 동기화
         self._apply_raw_line()
 
@@ -486,6 +598,18 @@ class EMGDashboard(QMainWindow):
         return frame
 
 
+    # 채널별 스펙트로그램 ImageItem 추가 + Y 범위 (배치·이미지는 렌더에서 갱신)
+    def _add_spec_images(self, n: int):
+        for _ in range(n):
+            item = pg.ImageItem()
+            self.spec_plot.addItem(item)
+            self.spec_images.append(item)
+        y_max = n * CH_OFFSET
+        self.spec_plot.setYRange(0, y_max, padding=0)
+        self.spec_plot.getViewBox().setLimits(yMin=0, yMax=y_max, minYRange=50, maxYRange=y_max)
+        self._spec_layout = None
+        self._spec_drawn = None
+
     def build_diag_panel(self):
 
         frame, lay = self.card("Diagonal Vector")
@@ -547,11 +671,55 @@ class EMGDashboard(QMainWindow):
 
         return frame
 
-    # QTimer 콜백하면 graph_render.render(self) 호출
+    # QTimer 콜백하면 graph_render.render(self) 호출. 프로파일러가 켜져 있으면 프레임을 계측하고
+    # PROFILE_REPORT_SEC마다 HUD·로그 갱신
     def render(self):
+        prof = self.profiler
+        if not prof.active:
+            render_impl(self)
+            return
+        prof.begin_frame()
         render_impl(self)
-
-    def on_sample(self, raw_vals, amp_vals):
+        prof.end_frame()
+        now = time.perf_counter()
+        if now - self._profile_report_t >= config.PROFILE_REPORT_SEC:
+            self._profile_report_t = now
+            self._publish_profile()
+
+    # 프로파일 요약 → HUD·롤링 로그. backlog = 워커가 링에 쓴 누적 샘플 − GUI가 처리한 샘플 (큐에 쌓인 블록)
+    def _publish_profile(self):
+        backlog = max(0, self.ring.count - self.sample_count) if self.is_running else 0
+        rep = self.profiler.report(self.sample_count, backlog)
+        if self.lbl_prof_hud.isVisible():
+            self.lbl_prof_hud.setText(format_report(rep))
+            self.lbl_prof_hud.adjustSize()
+            self.lbl_prof_hud.raise_()
+        if self.profile_log is not None:
+            self.profile_log.write(rep)
+
+    def _set_profile_hud(self, on):
+        self.lbl_prof_hud.setVisible(on)
+        if on:
+            self.lbl_prof_hud.setText("profiling…")
+            self.lbl_prof_hud.adjustSize()
+            self.lbl_prof_hud.raise_()
+        self._update_profiler_active()
+
+    def _set_profile_log(self, on):
+        if on and self.profile_log is None:
+            self.profile_log = ProfileLog()
+        elif not on and self.profile_log is not None:
+            self.profile_log.close()
+            self.profile_log = None
+        self._update_profiler_active()
+
+    def _update_profiler_active(self):
+        profiler = getattr(self, "profiler", None)
+        if profiler is not None:
+            profiler.set_active(self.cb_prof_hud.isChecked() or self.cb_prof_log.isChecked())
+
+    # 샘플 단위 수신 (SERIAL_BLOCK_MODE=False): t는 워커가 준 샘플 시각(time.perf_counter 초)
+    def on_sample(self, raw_vals, amp_vals, t=None):
         
         if not self.is_running:
             return
@@ -560,37 +728,66 @@ class EMGDashboard(QMainWindow):
         self.last_amp = amp_vals
         self.sample_count += 1
 
-        # 현재 타임스탬프(ms): START 시점 기준
-        curr_ts_ms = (time.time() - self.start_time_ref) * 1000
-
-        # raw 데이터 링버퍼에 저장
-        self.raw_np_buf[:, self.ptr] = raw_vals
+        # 타임스탬프(ms): START 시점 기준. 워커 시각이 없으면 지금 시각
+        curr_ts_ms = ((time.perf_counter() if t is None else t) - self.start_time_ref) * 1000
 
+        # raw 데이터는 워커가 링버퍼에 직접 기록함
         # 동적 오토스케일 계산 (최대, 최소값 갱신)
         for i in range(config.N_CH):
             self.scale_manager.scalers[i].update(raw_vals[i])
-        
-        # 링버퍼 포인터 이동 및 순환
-        self.ptr += 1
-        if self.ptr >= self.max_display:
-            self.ptr = 0
-            self.is_buf_full = True
-
-        # 수신 속도 기반 버퍼 크기: START 후 FIRST_RESIZE_AFTER_SEC(2초) 시점에 한 번만 리사이즈
-        # 첫 리사이즈는 임계값 없이 항상 적용 → 한 화면이 정확히 5초가 되도록
-        elapsed = time.time() - self.start_time_ref
-        if not self._has_resized_once and elapsed >= FIRST_RESIZE_AFTER_SEC and elapsed > 0:
-            self._has_resized_once = True
-            self._last_rate_update_time = time.time()
-            rate = self.sample_count / elapsed
-            new_len = int(round(rate * PLOT_SEC))
-            new_len = max(MIN_BUF, min(MAX_BUF, new_len))
-            if new_len != self.max_display:
-                self._resize_raw_buffers(new_len)
-        
-        # csv 로깅 처리 
-        if self.csv_logger:
-            self.csv_logger.write_row(raw_vals, amp_vals, timestamp=curr_ts_ms)
+
+        # 세션 기록 (CSV 또는 이진, LOG_FORMAT)
+        if self.data_logger:
+            self.data_logger.write_row(raw_vals, amp_vals, timestamp=curr_ts_ms)
+
+    # 블록 수신: raw_block·amp_block (n, N_CH), filt_block (선필터 출력 또는 None),
+    # ts_block (n,) 워커가 수신 시각 회귀로 정한 샘플별 시각 (time.perf_counter 초)
+    # — 선필터를 안 쓰면 on_sample을 n번 부른 것과 같은 결과
+    def on_block(self, raw_block, filt_block, amp_block, ts_block):
+
+        if not self.is_running:
+            return
+        n = len(raw_block)
+        if n == 0 or raw_block.shape[1] != config.N_CH:
+            return
+        self.last_amp = amp_block[-1]
+        self.sample_count += n
+
+        # raw 블록은 워커가 링버퍼에 직접 기록함 → 여기서는 스케일·로깅 같은 블록 단위 처리만
+        # 동적 오토스케일 계산 (블록 단위, 화면에 그리는 스트림 기준)
+        has_filt = filt_block is not None
+        self.scale_manager.update_block(filt_block if (has_filt and config.PREFILTER_FOR_RAW) else raw_block)
+
+        # 세션 기록 (CSV 또는 이진, LOG_FORMAT)
+        if self.data_logger:
+            ts_ms = (ts_block - self.start_time_ref) * 1000
+            log_block = filt_block if (has_filt and config.PREFILTER_FOR_LOG) else raw_block
+            self.data_logger.write_block(log_block, amp_block, ts_ms)
+
+    # 수신 속도 기반 버퍼 크기 (RATE_UPDATE_INTERVAL마다 타이머에서 호출, 샘플 경로 밖).
+    # 링 샘플 시각으로 잰 최근 속도(timebase.windowed_rate) × PLOT_SEC를 목표 길이로 하되,
+    # 직전 측정과 TIMEBASE_RATE_TOL 넘게 다르면 속도가 바뀌는 중이므로 안정될 때까지 대기.
+    # START 후 FIRST_RESIZE_AFTER_SEC 시점의 첫 리사이즈는 임계값 없이 항상 적용 → 한 화면이 정확히 PLOT_SEC.
+    # 이후에는 현재 길이와 BUF_RESIZE_THRESHOLD 넘게 다를 때만 (속도 지터로 인한 반복 리사이즈 방지)
+    def _update_buffer_size(self):
+        if not self.is_running:
+            return
+        now = time.perf_counter()
+        elapsed = now - self.start_time_ref
+        self._last_rate_update_time = now
+        ptr, is_full, _, count, _, times = self.ring.snapshot()
+        rate = timebase.windowed_rate(times, ptr, min(count, self.ring.capacity if is_full else ptr))
+        if rate is None:
+            rate = self.sample_count / elapsed if elapsed > 0 else 0.0
+        prev, self._last_rate = self._last_rate, rate
+        if elapsed < FIRST_RESIZE_AFTER_SEC or not prev or abs(rate / prev - 1.0) > config.TIMEBASE_RATE_TOL:
+            return
+        new_len = max(MIN_BUF, min(MAX_BUF, int(round(rate * PLOT_SEC))))
+        if self._has_resized_once and abs(new_len - self.max_display) <= BUF_RESIZE_THRESHOLD * self.max_display:
+            return
+        self._has_resized_once = True
+        if new_len != self.max_display:
+            self._resize_raw_buffers(new_len)
 
 
     def refresh_ports(self):
@@ -601,46 +798,130 @@ class EMGDashboard(QMainWindow):
         port = self.cb_port.currentText().strip()
         if not port:
             return
-        self.raw_np_buf.fill(0)
-        self.height_buf.fill(1.5)
+        if not self._begin_session(log=True):
+            return
+        self.worker = self.serial_worker
+        self.worker.configure(port, 115200, self.n_mult, protocol=self.cb_protocol.currentData())
+        self.worker.start()
+        self.set_running_ui(True)
+        self.rate_timer.start()
+
+    # 녹화 파일을 골라 재생 세션 시작 (세션 기록은 하지 않음)
+    def open_replay(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Replay recording", "data", "EMG recordings (*.emgidx *.emgrec *.csv)"
+        )
+        if path:
+            self.start_replay(path)
+
+    def start_replay(self, path, speed=None):
+        if self.is_running or not self._begin_session(log=False):
+            return
+        self.worker = self.replay_worker
+        self.worker.configure(path, self.cb_speed.currentData() if speed is None else speed, self.n_mult)
+        self.worker.start()
+        self.set_running_ui(True)
+        self.rate_timer.start()
+
+    # 재생이 끝까지 가면 STOP과 같이 정리 (상태 라벨의 재생 결과는 유지)
+    def _on_replay_finished(self):
+        if self.is_running and self.worker is self.replay_worker:
+            self.stop_serial()
+
+    # START·재생 공통: 링·스케일·시간 기준 초기화, log면 세션 로거 생성. 로거 생성 실패 시 False
+    def _begin_session(self, log):
+        self.ring.reset()
+        self.raw_np_buf = self.ring.data
         self.ptr = 0
         self.is_buf_full = False
         self.sample_count = 0
-        self.start_time_ref = time.time()
+        self.start_time_ref = time.perf_counter()  # 워커 샘플 시각과 같은 단조 시계
         self._last_rate_update_time = self.start_time_ref
-        self._has_resized_once = False  # START당 리사이즈 1회만
+        self._has_resized_once = False  # 첫 리사이즈는 임계값 없이 적용
+        self._last_rate = None
 
         # RAW 뷰를 채널 수에 맞게 0~y_max로 설정 (4ch/6ch 모두 전체 채널 보이도록)
         y_max = config.N_CH * CH_OFFSET
         self.raw_plot.setYRange(0, y_max, padding=0)
         self.raw_plot.getViewBox().setRange(yRange=(0, y_max))
+        self._spec_layout = None  # fs 추정을 새로 하므로 스펙트로그램 축도 다시 배치
 
         # 스케일 정보 초기화
         self.scale_manager.reset()
 
-        self.csv_logger = None
-        if ENABLE_CSV_LOGGING:
+        self.data_logger = None
+        self.log_stats = {}
+        self.lbl_log_status.setText("")
+        self.lbl_read_stats.setText("")
+        if log and ENABLE_CSV_LOGGING:
             try:
-                self.csv_logger = CSVLogger(buffer_size=500)
+                if config.LOG_FORMAT == "binary":
+                    self.data_logger = BinaryLogger(meta={
+                        "protocol": self.cb_protocol.currentData(),
+                        "n_mult": self.sp_nmult.value(),
+                        "acq_mode": config.ACQ_MODE,
+                        "prefiltered": bool(config.PREFILTER_ENABLED and config.PREFILTER_FOR_LOG),
+                    })
+                else:
+                    self.data_logger = CSVLogger(buffer_size=500)
             except Exception as e:
                 QMessageBox.critical(self, "Logger Error", str(e))
-                return
+                return False
 
         self.n_mult = self.sp_nmult.value()
-        self.worker.configure(port, 115200, self.n_mult)
-        self.worker.start()
-        self.set_running_ui(True)
+        return True
 
 
     def stop_serial(self):
+        self.rate_timer.stop()
         if self.worker and self.worker.isRunning():
             self.worker.stop()
-            self.worker.wait(500)
-        if self.csv_logger:
-            self.csv_logger.close()
-            self.csv_logger = None
+            self.worker.wait(self.worker.stop_timeout_ms)  # 프로세스 모드는 수신 프로세스·공유 메모리 정리까지
+        if self.data_logger:
+            self.data_logger.close()  # 기록 스레드가 남은 버퍼를 모두 쓸 때까지 대기
+            self.log_stats = self.data_logger.stats()
+            self._show_log_stats(self.log_stats)
+            self.data_logger = None
         self.set_running_ui(False)
 
+    # 세션 로거 지표(큐 깊이·기록 바이트 등) 갱신 → 설정 패널 기록 상태 라벨
+    def _poll_log_stats(self):
+        if not self.data_logger:
+            return
+        self.log_stats = self.data_logger.stats()
+        self._show_log_stats(self.log_stats)
+
+    # 기록 상태 한 줄. 큐가 상한을 넘었거나(stalls) 버린 버퍼가 있으면 경고 색
+    def _show_log_stats(self, stats):
+        text = (f"LOG {stats['bytes_written'] / 1e6:.1f} MB · "
+                f"queue {stats['queue_depth']}/{config.LOG_QUEUE_MAX} (max {stats['queue_max_depth']})")
+        warn = stats["stalls"] > 0 or stats.get("dropped", 0) > 0 or stats.get("error")
+        if warn:
+            text += f" · over {stats['stalls']} · dropped {stats.get('dropped', 0)}"
+        if stats.get("error"):
+            text += f" · {stats['error']}"
+        self.lbl_log_status.setText(text)
+        self.lbl_log_status.setStyleSheet(
+            f"color:{COLOR_STATUS_DISCONNECTED if warn else '#8892b0'}; font-size: 11px;"
+        )
+
+    # 워커 수신 통계 → 설정 패널 수신 통계 라벨 (시리얼: read/s·bytes/read·idle, 이진 프레임 누락, 공유 링 유실;
+    # 재생: 위치·처리 속도·실제 배속)
+    def on_stats(self, stats):
+        if "reads_per_sec" in stats:
+            text = (f"RX {stats['bytes_per_sec'] / 1e3:.1f} kB/s · {stats['reads_per_sec']:.0f} reads/s · "
+                    f"{stats['avg_bytes_per_read']:.0f} B/read · idle {stats['idle_frac'] * 100:.0f}%")
+            if stats.get("frames_dropped") or stats.get("bytes_skipped"):
+                text += f" · dropped {stats['frames_dropped']} frames ({stats['bytes_skipped']} B)"
+            if stats.get("shm_lost"):
+                text += f" · shm lost {stats['shm_lost']}"
+        elif "position_sec" in stats:
+            text = (f"REPLAY {stats['position_sec']:.1f}/{stats['duration_sec']:.1f}s · "
+                    f"{stats['samples_per_sec']:.0f} samples/s · {stats['speed_actual']:.1f}x")
+        else:
+            return
+        self.lbl_read_stats.setText(text)
+
     def set_status(self, txt):
         self.lbl_status.setText(f"● {txt}")
         self.lbl_status.setStyleSheet(
@@ -653,4 +934,5 @@ class EMGDashboard(QMainWindow):
 
     def closeEvent(self, event):
         self.stop_serial()
+        self._set_profile_log(False)
         event.accept()
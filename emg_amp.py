@@ -0,0 +1,133 @@
+import numpy as np
+
+
+# 채널별 슬라이딩 윈도우 진폭(max − min)을 스트리밍으로 갱신하는 클래스.
+# hop 샘플마다 진폭을 발행(publish)하고, 그 사이 샘플은 마지막 발행 값을 그대로 사용.
+# read 하나의 발행 시점을 한 번에 계산:
+#   hop ≥ W/2 (기본 hop = W): 발행 윈도우가 거의 겹치지 않으므로 직전 W−1 샘플 + 새 샘플에서 발행 윈도우만 잘라 max − min
+#   hop < W/2: 윈도우 길이 W의 블록으로 나눠(van Herk/Gil-Werman) 이전 블록 suffix 극값과 현재 블록 prefix 극값만 유지,
+#              read 안에서 완성되는 블록은 한 번에 reshape해 prefix/suffix 누적 → 새 샘플당 분할 상환 O(1)
+class StreamingPeakToPeak:
+
+    def __init__(self, n_ch, window, hop=None):
+        self.n_ch = int(n_ch)
+        self.window = max(1, int(window))
+        self.hop = max(1, int(hop)) if hop else self.window  # 기본: 윈도우마다 한 번 (기존 동작)
+        self._direct = 2 * self.hop >= self.window
+        self.reset()
+
+    def reset(self):
+        W, n = self.window, self.n_ch
+        # 직접 계산용 최근 샘플 이력 (채널, 시간). 앞 _hist_len개가 유효
+        self._hist = np.empty((n, 2 * W + 64))
+        self._hist_len = 0
+        # 블록용 (채널, 블록 안 위치): 이전 블록 suffix 극값, 현재 블록 원본
+        self._prev_smax = np.full((n, W), -np.inf)
+        self._prev_smin = np.full((n, W), np.inf)
+        self._cur = np.empty((n, W))
+        self._cur_pmax = np.full(n, -np.inf)
+        self._cur_pmin = np.full(n, np.inf)
+        self._fill = 0  # 현재 블록에 채워진 샘플 수
+        self.count = 0
+        self.last_amp = np.zeros(n)
+
+    # (m, n_ch) 샘플 반영 → (m, n_ch) 샘플별 진폭(각 시점의 마지막 발행 값)
+    def update(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        m = len(samples)
+        out = np.empty((m, self.n_ch))
+        if m == 0:
+            return out
+        W, hop = self.window, self.hop
+        # 발행 시점: 누적 샘플 수가 hop의 배수이고 윈도우가 찬 뒤
+        first = -(-max(self.count + 1, W) // hop) * hop - self.count - 1
+        pub = np.arange(first, m, hop)
+        if self._direct:
+            amp = self._publish_direct(samples, pub)
+        else:
+            amp = self._publish_blocks(samples, pub)
+        self.count += m
+
+        if not pub.size:
+            out[:] = self.last_amp
+            return out
+        # 발행 사이 샘플은 직전 발행 값으로 채움
+        out[:first] = self.last_amp
+        out[first:] = np.repeat(amp, hop, axis=0)[: m - first]
+        self.last_amp = amp[-1].copy()
+        return out
+
+    # hop ≥ W/2: 발행 윈도우마다 원본에서 바로 max − min. 이력은 (채널, 시간) 배열로 마지막 축을 따라 줄임
+    def _publish_direct(self, samples, pub):
+        W, m = self.window, len(samples)
+        hist, end = self._hist, self._hist_len
+        if end + m > hist.shape[1]:
+            # 가득 차면 윈도우에 필요한 최근 W−1 샘플만 앞으로 (모자라면 키움)
+            keep = min(end, W - 1)
+            grown = np.empty((self.n_ch, max(hist.shape[1], keep + m)))
+            grown[:, :keep] = hist[:, end - keep : end]
+            hist, end = grown, keep
+            self._hist = hist
+        hist[:, end : end + m] = samples.T
+        self._hist_len = end + m
+        if not pub.size:
+            return None
+        starts = pub + (end - W + 1)
+        if self.hop == W:
+            # 기본 hop: 발행 윈도우가 겹치지 않고 이어져 있으므로 reshape 뷰
+            win = hist[:, starts[0] : starts[0] + pub.size * W].reshape(self.n_ch, pub.size, W)
+        else:
+            win = hist[:, starts[:, None] + np.arange(W)]
+        return (win.max(axis=2) - win.min(axis=2)).T
+
+    # hop < W/2: 윈도우 [e−W+1, e]의 극값 = max(앞 블록 suffix[시작], 끝 블록 prefix[e])
+    def _publish_blocks(self, samples, pub):
+        W, n, r = self.window, self.n_ch, self._fill
+        m = len(samples)
+        # 이전 블록 suffix 인덱스 (현재 블록 시작 기준 pub + r + 1 − W, 앞에 이전 블록 W개를 붙인 배열에서)
+        s_idx = pub + r + 1
+
+        if r + m < W:
+            # 현재 블록이 이번 read 안에 끝나지 않음: prefix만 이어 감
+            self._cur[:, r : r + m] = samples.T
+            pmax = np.maximum(np.maximum.accumulate(samples, axis=0), self._cur_pmax)
+            pmin = np.minimum(np.minimum.accumulate(samples, axis=0), self._cur_pmin)
+            self._cur_pmax, self._cur_pmin = pmax[-1], pmin[-1]
+            self._fill = r + m
+            if not pub.size:
+                return None
+            return (np.maximum(pmax[pub], self._prev_smax[:, s_idx].T)
+                    - np.minimum(pmin[pub], self._prev_smin[:, s_idx].T))
+
+        # 현재 블록 완성: 현재 블록 + 나머지 샘플을 블록 경계로 reshape해 prefix/suffix를 한 번에
+        body = m - (W - r)
+        total = W + body
+        nb = -(-total // W)
+        y = np.zeros((n, nb * W))
+        y[:, :r] = self._cur[:, :r]
+        y[:, r:total] = samples.T
+        b = y.reshape(n, nb, W)
+        pmax = np.maximum.accumulate(b, axis=2).reshape(n, -1)
+        pmin = np.minimum.accumulate(b, axis=2).reshape(n, -1)
+        smax = np.maximum.accumulate(b[:, :, ::-1], axis=2)[:, :, ::-1].reshape(n, -1)
+        smin = np.minimum.accumulate(b[:, :, ::-1], axis=2)[:, :, ::-1].reshape(n, -1)
+
+        amp = None
+        if pub.size:
+            e = pub + r
+            hi = np.maximum(pmax[:, e], np.concatenate([self._prev_smax, smax], axis=1)[:, s_idx])
+            lo = np.minimum(pmin[:, e], np.concatenate([self._prev_smin, smin], axis=1)[:, s_idx])
+            amp = (hi - lo).T
+
+        # 마지막 완성 블록의 suffix → 다음 블록의 "이전 블록", 남은 샘플은 새 현재 블록
+        full = total // W
+        self._prev_smax = smax[:, (full - 1) * W : full * W].copy()
+        self._prev_smin = smin[:, (full - 1) * W : full * W].copy()
+        self._fill = total - full * W
+        if self._fill:
+            self._cur[:, : self._fill] = y[:, full * W : total]
+            self._cur_pmax, self._cur_pmin = pmax[:, total - 1].copy(), pmin[:, total - 1].copy()
+        else:
+            self._cur_pmax = np.full(n, -np.inf)
+            self._cur_pmin = np.full(n, np.inf)
+        return amp
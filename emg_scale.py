@@ -40,40 +40,110 @@ class ChannelScaler:
         target_baseline = (self.current_max + self.current_min) / 2
         self.baseline += (target_baseline - self.baseline) * self.baseline_alpha
 
+    # 한 채널의 raw 값 여러 개(float 리스트)를 순서대로 반영. update를 샘플마다 부른 것과 같은 결과를
+    # 지역 변수 루프로 계산 (메서드 호출·속성 접근이 샘플마다 없음)
+    def update_block(self, raw_values):
+        mx, mn, base, has = self.current_max, self.current_min, self.baseline, self.has_data
+        d, al, thr = self.decay_alpha, self.baseline_alpha, config.RAW_ZERO_THRESHOLD
+        for v in raw_values:
+            if v <= thr:
+                continue
+            has = True
+            if v > mx:
+                mx = v
+            elif v < mn:
+                mn = v
+            else:
+                mx -= (mx - v) * d
+                mn += (v - mn) * d
+            base += ((mx + mn) / 2 - base) * al
+        self.current_max, self.current_min, self.baseline, self.has_data = mx, mn, base, has
 
-class EMGScaleManager:
 
-    def __init__(self, n_channels=config.N_CH):
-        self.scalers = [ChannelScaler() for _ in range(n_channels)]
-        self.gains = [1.0] * n_channels  # 채널별 민감도 가중치 (1.0 기본)
+# EMGScaleManager.update_block이 numpy 스캔을 쓰는 최소 블록 길이. 그보다 짧으면(보통 read 크기) numpy 호출
+# 고정 비용이 채널별 지역 변수 루프보다 커서 루프 사용 (benchmarks/bench_hotpaths.py scale_rows_* 참고)
+_VECTOR_MIN_ROWS = 512
+# numpy 스캔의 시간축 분할 크기 (구간 안 누적곱이 너무 작아져 b/P 정밀도가 떨어지지 않도록)
+_SCAN_BLOCK = 128
+_BIG = 1e300
 
-    def reset(self):
-        for scaler in self.scalers:
-            scaler.reset()
 
-    def _data_range_and_half_height(self):
+# (C, T) → (C, k, _SCAN_BLOCK). 모자란 끝은 fill로 채움
+def _chunked(x, k, fill):
+    C, T = x.shape
+    pad = k * _SCAN_BLOCK - T
+    if pad:
+        x = np.concatenate([x, np.full((C, pad), fill, dtype=x.dtype)], axis=1)
+    return x.reshape(C, k, _SCAN_BLOCK)
+
+
+# 구간마다 x = α·(구간 시작값) + β 로 풀어 둔 점화식의 구간 시작값 (C, k, 1).
+# 구간 끝의 α·β (C, k)로 구간 수만큼만 차례로 이어 붙임
+def _chunk_starts(alpha_end, beta_end, x0):
+    C, k = alpha_end.shape
+    starts = np.empty((C, k))
+    x = x0
+    for j in range(k):
+        starts[:, j] = x
+        x = alpha_end[:, j] * x + beta_end[:, j]
+    return starts[:, :, None]
 
-        valid_mins = [s.current_min for s in self.scalers if s.has_data and s.current_min > 0]
-        valid_maxs = [s.current_max for s in self.scalers if s.has_data and s.current_max > 0]
-        
-        # 데이터가 없으면 기본값 사용 
-        if not valid_mins or not valid_maxs:
+
+# 확장(up/down) 분기를 고정했을 때의 max·min 궤적 (C, T)과, 그 궤적으로 다시 판정한 분기.
+# 두 극값은 수축 계수(범위 안 샘플)가 같아 누적곱·누적합을 공유하고, 확장 시점에서 상수항만 새로 시작
+def _scan_extremes(v, v_lo, valid, up, down, mx0, mn0, d):
+    C, T = v.shape
+    k = -(-T // _SCAN_BLOCK)
+    vc = _chunked(v, k, 0.0)
+    dm = _chunked(valid & ~(up | down), k, False) * d
+    P = np.cumprod(1.0 - dm, axis=2)
+    S = np.cumsum(dm * vc / P, axis=2)
+    R = np.concatenate([np.zeros((C, k, 1)), vc / P - S], axis=2)
+    pos = np.arange(1, _SCAN_BLOCK + 1)
+    ext = []
+    for reset, x0 in ((up, mx0), (down, mn0)):
+        seg = np.maximum.accumulate(_chunked(reset, k, False) * pos, axis=2)  # 구간 안 마지막 확장 위치
+        alpha = P * (seg == 0)
+        beta = P * (np.take_along_axis(R, seg, axis=2) + S)
+        x = alpha * _chunk_starts(alpha[:, :, -1], beta[:, :, -1], x0) + beta
+        ext.append(x.reshape(C, -1)[:, :T])
+    mx, mn = ext
+    up_chk = v > np.hstack([mx0[:, None], mx[:, :-1]])
+    down_chk = (v_lo < np.hstack([mn0[:, None], mn[:, :-1]])) & ~up_chk
+    return mx, mn, up_chk, down_chk
+
+
+# 한 렌더 프레임 동안 모든 그리기 경로(Line/Fill·Diag·PWR)가 공유하는 스케일 상태.
+# EMGScaleManager.snapshot()이 버전별로 한 번만 만들고, 상태가 바뀔 때까지 재사용
+class ScaleSnapshot:
+
+    def __init__(self, version, current_min, current_max, baseline, has_data, gains):
+        self.version = version
+        self.current_min = current_min.copy()
+        self.current_max = current_max.copy()
+        self.baseline = baseline.copy()
+
+        # 전 채널 공통 data_range (데이터가 없으면 기본 범위)
+        valid_mins = current_min[has_data & (current_min > 0)]
+        valid_maxs = current_max[has_data & (current_max > 0)]
+        if valid_mins.size == 0 or valid_maxs.size == 0:
             global_min = config.RAW_Y_MIN_INIT
             global_max = config.RAW_Y_MAX_INIT
         else:
-            global_min = min(valid_mins)
-            global_max = max(valid_maxs)
-        
-        data_range = max(global_max - global_min, 20)
+            global_min = valid_mins.min()
+            global_max = valid_maxs.max()
+        self.data_range = float(max(global_max - global_min, 20))
         safe_margin_factor = 0.85
-        allowed_half_height = (config.CH_OFFSET / 2) * safe_margin_factor
-        return data_range, allowed_half_height
+        self.allowed_half_height = (config.CH_OFFSET / 2) * safe_margin_factor
 
-    # EMG raw 신호를 전 채널 공통 스케일 기준으로 정규화해 화면 Y좌표로 변환하는 함수
-    def get_scaled_array(self, ch_idx, raw_array):
-        scaler = self.scalers[ch_idx]
-        data_range, allowed_half_height = self._data_range_and_half_height()
-        
+        # Fill 막대·진폭 강도용 파생값
+        self.half_range = max(self.data_range / 2.0, 1.0)
+        self.max_bar_pixels = 2.0 * self.allowed_half_height
+        self.dynamic_half_range = np.maximum(self.current_max - self.baseline, 20)
+        self.gains = np.asarray(gains, dtype=float)
+
+    # EMG raw 신호를 전 채널 공통 스케일 기준으로 정규화해 화면 Y좌표로 변환
+    def scale(self, ch_idx, raw_array):
         # 중앙점 좌표 계산 
         base_offset = (config.N_CH - 1 - ch_idx) * config.CH_OFFSET + (config.CH_OFFSET / 2)
 
@@ -85,19 +155,180 @@ class EMGScaleManager:
         )
 
         # 정규화 및 범위 제한 
-        ratios = (effective_raw - scaler.baseline) / (data_range / 2)
+        ratios = (effective_raw - self.baseline[ch_idx]) / (self.data_range / 2)
+        ratios = np.clip(ratios, -1.0, 1.0)
+
+        return base_offset + (ratios * self.allowed_half_height)   # 최종 Y좌표 
+
+    # 여러 채널을 한 번에 변환: raw (len(channels), m) → Y좌표. channels 생략 시 0..n-1 전체.
+    # baseline·data_range(채널별 배열)를 주면 이 스냅샷 대신 그 기준으로 변환 (Line 캐시용)
+    def scale_all(self, raw, channels=None, baseline=None, data_range=None):
+        if channels is None:
+            channels = np.arange(raw.shape[0])
+        if baseline is None:
+            baseline = self.baseline[channels]
+        if data_range is None:
+            data_range = np.full(len(channels), self.data_range)
+        base_offset = (config.N_CH - 1 - channels) * config.CH_OFFSET + (config.CH_OFFSET / 2)
+        effective_raw = np.where(raw <= config.RAW_ZERO_THRESHOLD, config.RAW_ZERO_REF, raw)
+        ratios = (effective_raw - baseline[:, None]) / (data_range[:, None] / 2)
         ratios = np.clip(ratios, -1.0, 1.0)
-        
-        return base_offset + (ratios * allowed_half_height)   # 최종 Y좌표 
-    
-    
+        return base_offset[:, None] + (ratios * self.allowed_half_height)
+
+    # (ref_baseline, ref_range)로 변환해 둔 Y좌표가 지금 기준과 얼마나 다른지 채널별 상한 (Y 단위).
+    # 비율이 −1~1 안(대부분의 샘플)이라고 보고 baseline 이동분 + data_range 변화분으로 계산
+    def drift_from(self, ref_baseline, ref_range):
+        half = self.data_range / 2
+        return self.allowed_half_height * (
+            np.abs(self.baseline - ref_baseline) / half + np.abs(1.0 - ref_range / self.data_range)
+        )
+
     # 진폭(amp)을 동적 스케일링 (0~1)
-    def get_vector_intensity(self, ch_idx, amp_value):
-        scaler = self.scalers[ch_idx]
-        dynamic_half_range = (scaler.current_max - scaler.baseline)   # 현재 진폭이 전체 유효 범위 중에서 몇 %인지 계산 
-        
-        if dynamic_half_range < 20:
-            dynamic_half_range = 20
+    def intensity(self, ch_idx, amp_value):
         boost_gain = 1.3
-        intensity = (amp_value / dynamic_half_range) * self.gains[ch_idx] * boost_gain
-        return np.clip(intensity, 0.0, 1.0)
\ No newline at end of file
+        intensity = (amp_value / self.dynamic_half_range[ch_idx]) * self.gains[ch_idx] * boost_gain
+        return np.clip(intensity, 0.0, 1.0)
+
+    # 전 채널 진폭 배열 → 채널별 강도 배열 (intensity를 채널마다 부른 것과 같음)
+    def intensities(self, amps):
+        n = len(amps)
+        boost_gain = 1.3
+        intensity = (np.asarray(amps, dtype=float) / self.dynamic_half_range[:n]) * self.gains[:n] * boost_gain
+        return np.clip(intensity, 0.0, 1.0)
+
+
+class EMGScaleManager:
+
+    def __init__(self, n_channels=config.N_CH):
+        self.n_channels = n_channels
+        # 채널 상태는 scalers[i](float 속성)에 있음 → 샘플 단위 경로(on_sample)는 ChannelScaler.update 그대로.
+        # 아래 배열은 snapshot()·update_block이 scalers에서 모아 두는 사본
+        self.scalers = [ChannelScaler() for _ in range(n_channels)]
+        self.current_min = np.zeros(n_channels)
+        self.current_max = np.zeros(n_channels)
+        self.baseline = np.zeros(n_channels)
+        self.has_data = np.zeros(n_channels, dtype=bool)
+        self._state = None   # 배열에 마지막으로 모은 scalers 상태
+        self.version = 0     # 상태가 바뀔 때마다 증가
+        self._snap = None
+        self.gains = [1.0] * n_channels  # 채널별 민감도 가중치 (1.0 기본, 바꾸면 invalidate())
+        self.reset()
+
+    # 계수는 모든 채널 공통 (바꾸면 scalers에도 반영)
+    @property
+    def baseline_alpha(self):
+        return self.scalers[0].baseline_alpha if self.scalers else 0.05
+
+    @baseline_alpha.setter
+    def baseline_alpha(self, value):
+        for sc in self.scalers:
+            sc.baseline_alpha = value
+
+    @property
+    def decay_alpha(self):
+        return self.scalers[0].decay_alpha if self.scalers else 0.000001
+
+    @decay_alpha.setter
+    def decay_alpha(self, value):
+        for sc in self.scalers:
+            sc.decay_alpha = value
+
+    def reset(self):
+        for sc in self.scalers:
+            sc.reset()
+        self._sync()
+        self.invalidate()
+
+    # 스케일 상태가 바뀌었음을 표시 → 다음 snapshot()에서 다시 계산
+    def invalidate(self):
+        self.version += 1
+
+    # scalers 상태를 배열로 모음. 지난번과 다르면(샘플 단위 update가 있었으면) 버전 증가
+    def _sync(self):
+        state = [(sc.current_min, sc.current_max, sc.baseline, sc.has_data) for sc in self.scalers]
+        if state == self._state:
+            return
+        self._state = state
+        if state:
+            self.current_min[:], self.current_max[:], self.baseline[:], self.has_data[:] = zip(*state)
+        self.invalidate()
+
+    # 현재 버전의 ScaleSnapshot (상태가 그대로면 이전 것 재사용)
+    def snapshot(self):
+        self._sync()
+        snap = self._snap
+        if snap is None or snap.version != self.version:
+            snap = ScaleSnapshot(self.version, self.current_min, self.current_max,
+                                 self.baseline, self.has_data, self.gains)
+            self._snap = snap
+        return snap
+
+    # (n_samples, n_ch) 블록을 한 번에 반영. ChannelScaler.update를 샘플 순서대로 부른 것과 같은 결과.
+    # 보통 read 크기(수십 샘플)는 채널별 지역 변수 루프, _VECTOR_MIN_ROWS 이상(최대 속도 재생 등)은
+    # 채널 전체를 선형 점화식 스캔으로 (부동소수점 오차 범위)
+    def update_block(self, samples):
+        samples = np.asarray(samples, dtype=float)
+        if len(samples) == 0:
+            return
+        # α가 1에 가까우면 누적곱이 0으로 떨어져 스캔을 풀 수 없으므로 루프
+        if len(samples) < _VECTOR_MIN_ROWS or max(self.decay_alpha, self.baseline_alpha) > 0.5:
+            for sc, col in zip(self.scalers, samples.T.tolist()):
+                sc.update_block(col)
+        else:
+            self._sync()
+            self._update_vectorized(samples)
+        self._sync()
+
+    # update_block의 numpy 경로. 채널별 점화식
+    #   범위 밖: 극값 ← v (확장), 범위 안: max·min ← (1-d)·x + d·v (수축), baseline ← (1-α)·b + α·(max+min)/2
+    # 를 _SCAN_BLOCK 구간마다 누적곱·누적합으로 풀고 구간 시작값만 차례로 이어 붙임.
+    # 분기는 decay를 무시한 누적 최대/최소로 추정하고, 계산한 max·min으로 다시 판정해 어긋난 채널만
+    # 고친 분기로 한 번 더 풀며 그래도 어긋나면 샘플 단위 루프로
+    def _update_vectorized(self, samples):
+        v = np.ascontiguousarray(samples.T)  # (n_ch, n): 누적 연산이 연속 메모리를 따라가도록
+        valid = v > config.RAW_ZERO_THRESHOLD
+        if not valid.any():
+            return
+        d, al = self.decay_alpha, self.baseline_alpha
+        mx0, mn0 = self.current_max.copy(), self.current_min.copy()
+
+        # 무효 샘플(≤ 임계값)은 max(> 임계값)를 넘지 못하므로 max 후보에는 그대로, min 후보에서는 제외
+        v_lo = np.maximum(v, _BIG * ~valid)
+        up = v > np.maximum.accumulate(np.hstack([mx0[:, None], v[:, :-1]]), axis=1)
+        down = (v_lo < np.minimum.accumulate(np.hstack([mn0[:, None], v_lo[:, :-1]]), axis=1)) & ~up
+        mx, mn, up2, down2 = _scan_extremes(v, v_lo, valid, up, down, mx0, mn0, d)
+        unstable = ((up2 != up) | (down2 != down)).any(axis=1)
+        if unstable.any():
+            idx = np.flatnonzero(unstable)
+            mx[idx], mn[idx], up3, down3 = _scan_extremes(
+                v[idx], v_lo[idx], valid[idx], up2[idx], down2[idx], mx0[idx], mn0[idx], d)
+            unstable[idx] = ((up3 != up2[idx]) | (down3 != down2[idx])).any(axis=1)
+
+        C, T = v.shape
+        k = -(-T // _SCAN_BLOCK)
+        w = _chunked(valid, k, False) * al
+        Pb = np.cumprod(1.0 - w, axis=2)
+        beta = Pb * np.cumsum(w * _chunked((mx + mn) / 2, k, 0.0) / Pb, axis=2)
+        base_end = Pb[:, -1, -1] * _chunk_starts(Pb[:, :, -1], beta[:, :, -1], self.baseline)[:, -1, 0] + beta[:, -1, -1]
+
+        for i, sc in enumerate(self.scalers):
+            if unstable[i]:
+                sc.update_block(v[i].tolist())
+            elif valid[i].any():
+                sc.current_max = float(mx[i, -1])
+                sc.current_min = float(mn[i, -1])
+                sc.baseline = float(base_end[i])
+                sc.has_data = True
+
+    def _data_range_and_half_height(self):
+        snap = self.snapshot()
+        return snap.data_range, snap.allowed_half_height
+
+    # EMG raw 신호를 전 채널 공통 스케일 기준으로 정규화해 화면 Y좌표로 변환하는 함수
+    # (렌더에서는 프레임마다 한 번 얻은 snap을 넘겨 재계산 없이 사용)
+    def get_scaled_array(self, ch_idx, raw_array, snap=None):
+        return (snap or self.snapshot()).scale(ch_idx, raw_array)
+
+    # 진폭(amp)을 동적 스케일링 (0~1)
+    def get_vector_intensity(self, ch_idx, amp_value, snap=None):
+        return (snap or self.snapshot()).intensity(ch_idx, amp_value)
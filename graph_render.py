@@ -3,67 +3,100 @@ import numpy as np
 import pyqtgraph as pg
 
 import config
+import lod
+import timebase
+from profiler import RenderProfiler
+from spectrum import SpectrumEngine, SpectrogramEngine
 from config import (
     get_ch_color, get_diag_directions, CH_OFFSET, NO_SIGNAL_VARIATION_RAW,
-    FFT_WINDOW_SEC, FFT_SAMPLE_RATE_DEFAULT, FFT_MAX_HZ,
-    FFT_APPLY_FILTER, FFT_FILTER_OUT_RANGES,
+    FFT_WINDOW_SEC, FFT_SAMPLE_RATE_DEFAULT, FFT_MAX_HZ, FFT_FS_RESOLUTION_HZ,
     PLOT_SEC, BAR_INTERVAL_MS,
     FFT_Y_GAIN,
+    SPEC_NFFT, SPEC_HOP, SPEC_COLUMNS, SPEC_DB_RANGE, SPEC_COLORMAP,
 )
 
-try:
-    from scipy.signal import butter, filtfilt
-    _HAS_SCIPY = True
-except ImportError:
-    _HAS_SCIPY = False
+# 프레임 시작 시 링 버퍼 스냅샷을 한 번 가져와 win.ptr·is_buf_full·raw_np_buf로 고정.
+# 채널 감지 직후(링은 새 채널 수, UI는 아직 이전 채널 수)면 False
+def _take_ring_snapshot(win):
+    ring = getattr(win, "ring", None)
+    if ring is None:
+        return True
+    ptr, is_full, data, count, filtered, times = ring.snapshot()
+    if data.shape[0] != config.N_CH or data.shape[1] != win.max_display:
+        return False
+    # 선필터 평면이 있으면 소비자별 설정(PREFILTER_FOR_RAW/FFT)에 따라 raw 대신 사용.
+    # 링에 필터 안 된 샘플(선필터 fs 측정 중 등)이 남아 있으면 filtered는 None → raw + 프레임별 filtfilt
+    win.ptr, win.is_buf_full = ptr, is_full
+    win.raw_prefiltered = filtered is not None and config.PREFILTER_FOR_RAW
+    win.raw_np_buf = filtered if win.raw_prefiltered else data
+    win.fft_np_buf = filtered if (filtered is not None and config.PREFILTER_FOR_FFT) else data
+    win.fft_prefiltered = filtered is not None and config.PREFILTER_FOR_FFT
+    win.ring_count, win.ring_layout = count, ring.layout_version
+    win.ring_times = times
+    return True
+
+
+_NO_PROFILER = RenderProfiler()  # 꺼진 프로파일러: lap이 바로 반환
+
+
+# 렌더 단계 계측기 (대시보드의 RenderProfiler, 없으면 — 벤치 하니스 등 — 꺼진 인스턴스)
+def _profiler(win):
+    return getattr(win, "profiler", None) or _NO_PROFILER
 
 
 def render(win):
+    prof = _profiler(win)
+    if not _take_ring_snapshot(win):
+        return
+    prof.lap("snapshot")
     view_mode = getattr(win, "view_mode", "raw")
-    if view_mode == "fft":
+    if view_mode in ("fft", "spec"):
         if hasattr(win, "stacked_plots"):
-            win.stacked_plots.setCurrentIndex(1)
-        update_fft_graph(win)
+            win.stacked_plots.setCurrentIndex(1 if view_mode == "fft" else 2)
+        if view_mode == "fft":
+            update_fft_graph(win)
+        else:
+            update_spectrogram(win)
         if not win.is_running or win.sample_count == 0:
             return
-        update_diag_vector(win)
-        update_power_info(win)
+        snap = win.scale_manager.snapshot()
+        update_diag_vector(win, snap)
+        prof.lap("diag")
+        update_power_info(win, snap)
+        prof.lap("power")
         return
     # Raw 모드
     if not win.is_running or win.sample_count == 0:
         return
+    # 스케일 상태는 프레임당 한 번만 가져와 모든 그리기 경로가 공유
+    snap = win.scale_manager.snapshot()
     is_fill_mode = win.rb_fill.isChecked()
     unified_x_ms = win.x_axis[win.ptr % win.max_display]
-    update_raw_graph(win, is_fill_mode, unified_x_ms)
-    update_diag_vector(win)
-    update_power_info(win)
+    update_raw_graph(win, is_fill_mode, unified_x_ms, snap)
+    update_diag_vector(win, snap)
+    prof.lap("diag")
+    update_power_info(win, snap)
+    prof.lap("power")
 
 LINE_HEIGHT_PX = 1.5  # Bar 모드 신호 없을 때 막대 기본 높이
 
-# 필터 차수 (시간 영역 선필터용)
-_FFT_FILTER_ORDER = 2
-
 
-def _apply_time_domain_filter(samples: np.ndarray, fs: float, filter_ranges: list) -> np.ndarray:
-    """시간 영역에서 지정 구간 제거. samples는 복사본으로 넣어도 됨 (in-place 수정)."""
-    if not _HAS_SCIPY or not filter_ranges or len(samples) < 4:
-        return samples
-    x = samples.astype(float)
-    nyq = fs / 2.0
-    for (low_hz, high_hz) in filter_ranges:
-        if high_hz <= 0 or high_hz >= nyq:
-            continue
-        try:
-            if low_hz <= 0 or low_hz < 1.0:
-                # 0~high_hz 제거 → 고역통과 (high_hz 위만 통과)
-                b, a = butter(_FFT_FILTER_ORDER, high_hz, btype="high", fs=fs)
-            else:
-                # low_hz~high_hz 제거 → 밴드스탑
-                b, a = butter(_FFT_FILTER_ORDER, [low_hz, high_hz], btype="bandstop", fs=fs)
-            x = filtfilt(b, a, x)
-        except Exception:
-            continue
-    return x
+# FFT·Spectrogram 주파수 축용 fs. 초기값 vs 실제 수신속도: 측정 가능하면 실제 속도.
+# 링의 샘플 시각으로 최근 TIMEBASE_RATE_WINDOW_SEC 구간 속도를 재므로 속도 변화를 바로 따라감
+# (시각 평면이 없으면 START 이후 평균)
+def _measured_fs(win):
+    if win.sample_count > 0 and hasattr(win, "start_time_ref"):
+        times = getattr(win, "ring_times", None)
+        avail = win.max_display if win.is_buf_full else win.ptr
+        fs = timebase.windowed_rate(times, win.ptr, min(avail, getattr(win, "ring_count", avail)))
+        if fs is None and times is None:
+            elapsed = time.perf_counter() - win.start_time_ref
+            fs = win.sample_count / elapsed if elapsed >= 0.1 else None
+        if fs is not None:
+            # 해상도 단위로 반올림 → 프레임마다 조금씩 변하는 추정값 때문에 필터·윈도우를 다시 만들지 않음
+            return max(FFT_FS_RESOLUTION_HZ, round(fs / FFT_FS_RESOLUTION_HZ) * FFT_FS_RESOLUTION_HZ)
+        return FFT_SAMPLE_RATE_DEFAULT  # 측정 전까지 초기값
+    return FFT_SAMPLE_RATE_DEFAULT  # 미수신 시 초기값
 
 
 def update_fft_graph(win):
@@ -71,15 +104,7 @@ def update_fft_graph(win):
     if not getattr(win, "is_running", True):
         return
 
-    # 초기값 vs 실제 수신속도: 측정 가능하면 실제 속도로 주파수 축 결정
-    if win.sample_count > 0 and hasattr(win, "start_time_ref"):
-        elapsed = time.time() - win.start_time_ref
-        if elapsed >= 0.1:
-            fs = win.sample_count / elapsed  # 실제 수신속도 (Hz)
-        else:
-            fs = FFT_SAMPLE_RATE_DEFAULT  # 측정 전까지 초기값
-    else:
-        fs = FFT_SAMPLE_RATE_DEFAULT  # 미수신 시 초기값
+    fs = _measured_fs(win)
 
     # 나이퀴스트: 표시 상한 = min(측정 fs/2, FFT_MAX_HZ)
     max_freq = min(fs / 2.0, FFT_MAX_HZ)
@@ -103,194 +128,412 @@ def update_fft_graph(win):
     n_fft = 1 << int(np.ceil(np.log2(n_fft)))  # ceil to power of 2
     n_fft = min(n_fft, win.max_display)
 
-    for i in range(config.N_CH):
-        # 수신 전이거나 데이터 부족 시 해당 채널만 빈 라인 (is_running은 위에서 이미 체크됨)
-        if win.ptr < 2:
-            win.fft_lines[i].setData([], [])
-            continue
-        if win.is_buf_full:
-            idx = (win.ptr - n_fft + np.arange(n_fft)) % win.max_display
-            samples = win.raw_np_buf[i, idx].astype(float)
-        else:
-            take = min(win.ptr, n_fft)
-            take = int(2 ** int(np.log2(max(2, take))))
-            samples = win.raw_np_buf[i, win.ptr - take : win.ptr].astype(float)
+    engine = getattr(win, "spectrum_engine", None)
+    if engine is None:
+        engine = win.spectrum_engine = SpectrumEngine()
+    # 단계 계측: 축·fs·창 길이와 샘플 모으기 → fft.prep, 필터 → fft.filter, 윈도우·rfft → fft.fft
+    prof = _profiler(win)
+    prof.lap("fft.prep")
+    result = engine.compute(
+        getattr(win, "fft_np_buf", win.raw_np_buf), win.ptr, win.is_buf_full,
+        getattr(win, "ring_count", win.sample_count), getattr(win, "ring_layout", 0),
+        fs, n_fft, max_freq, prefiltered=getattr(win, "fft_prefiltered", False), profiler=prof,
+    )
+    prof.lap("fft.fft")
+    # 새 샘플이 없으면 같은 결과 → 곡선 그대로
+    if result is not None and result is getattr(win, "_fft_drawn", None):
+        return
+    win._fft_drawn = result
+    if result is None:
+        for line in win.fft_lines:
+            line.setData([], [])
+        prof.lap("fft.setData")
+        return
+    freqs, mag = result
 
-        if len(samples) < 2:
-            win.fft_lines[i].setData([], [])
-            continue
+    # 선형 스케일: 샘플 수로만 나눈 뒤, FFT_Y_GAIN으로 전체 크기만 조정
+    mag_scaled = mag * FFT_Y_GAIN
 
-        # config에서 켜 둔 경우: 주파수 계산 전에 시간 영역 필터 적용 (0~5Hz, 50~60Hz 등)
-        if FFT_APPLY_FILTER:
-            samples = _apply_time_domain_filter(samples.copy(), fs, FFT_FILTER_OUT_RANGES)
-
-        # DC 제거 + Hann 윈도우 후 FFT
-        samples = samples - np.mean(samples)
-        samples = samples * np.hanning(len(samples))
-
-        spectrum = np.fft.rfft(samples)
-        mag = np.abs(spectrum)
-        freqs = np.fft.rfftfreq(len(samples), 1.0 / fs)
-
-        mask = freqs <= max_freq
-        freqs = freqs[mask]
-        mag = mag[mask]
-        # scipy 없이 필터 켠 경우만 주파수 영역에서 구간 0으로 (폴백)
-        if FFT_APPLY_FILTER and not _HAS_SCIPY:
-            for low_hz, high_hz in FFT_FILTER_OUT_RANGES:
-                kill = (freqs >= low_hz) & (freqs <= high_hz)
-                mag[kill] = 0.0
-        if len(mag) == 0:
-            win.fft_lines[i].setData([], [])
-            continue
+    # 채널별 밴드(center = base_offset)를 기준으로 매핑 (클리핑 없이 그대로 표시)
+    band_half = CH_OFFSET * 0.45
+    for i in range(config.N_CH):
+        base_offset = (config.N_CH - 1 - i) * CH_OFFSET + (CH_OFFSET / 2)
+        y_fft = base_offset - band_half + mag_scaled[i] * (2 * band_half)
+        win.fft_lines[i].setData(freqs, y_fft, skipFiniteCheck=True)
+    prof.lap("fft.setData")
 
-        # 선형 스케일: 샘플 수로만 나눈 뒤, FFT_Y_GAIN으로 전체 크기만 조정
-        n_samp = len(samples)
-        mag_scaled = (mag / (n_samp + 1e-12)) * FFT_Y_GAIN
 
-        # 채널별 밴드(center = base_offset)를 기준으로 매핑 (클리핑 없이 그대로 표시)
-        base_offset = (config.N_CH - 1 - i) * CH_OFFSET + (CH_OFFSET / 2)
-        band_half = CH_OFFSET * 0.45
-        y_fft = base_offset - band_half + mag_scaled * (2 * band_half)
-        win.fft_lines[i].setData(freqs, y_fft)
 
+# Spectrogram 뷰: SpectrogramEngine이 새 hop 프레임만 이미지 링에 기록하고, 채널별 ImageItem에
+# (시간 × 주파수) dB 이미지를 표시. 채널 밴드는 FFT 뷰처럼 위에서부터 CH0, 각 밴드 세로축은 0 ~ fs/2.
+# 새 열이 없으면 setImage 생략, 색 범위는 채널별 이미지 최대 dB 기준 SPEC_DB_RANGE
+def update_spectrogram(win):
+    if not getattr(win, "is_running", True):
+        return
+    engine = getattr(win, "spectrogram_engine", None)
+    if engine is None:
+        engine = win.spectrogram_engine = SpectrogramEngine(SPEC_NFFT, SPEC_HOP, SPEC_COLUMNS)
+    fs = _measured_fs(win)
+    engine.update(
+        getattr(win, "fft_np_buf", win.raw_np_buf), win.ptr, win.is_buf_full,
+        getattr(win, "ring_count", win.sample_count), fs,
+        prefiltered=getattr(win, "fft_prefiltered", False),
+    )
+    prof = _profiler(win)
+    prof.lap("spec.stft")
+
+    if engine.version != getattr(win, "_spec_drawn", None) and engine.n_ch == len(win.spec_images):
+        win._spec_drawn = engine.version
+        lut = getattr(win, "_spec_lut", None)
+        if lut is None:
+            lut = win._spec_lut = pg.colormap.get(SPEC_COLORMAP).getLookupTable(nPts=256)
+        for i, item in enumerate(win.spec_images):
+            img = engine.image(i)
+            hi = float(img.max())
+            item.setImage(img, autoLevels=False, levels=(hi - SPEC_DB_RANGE, hi), lut=lut)
+        prof.lap("spec.setData")
+
+    # 축 배치: x = 초(최신 열이 0), 밴드 높이 CH_OFFSET의 90%. setRect는 이미지 크기 기준이라
+    # 첫 이미지 뒤에, 이후엔 fs 추정·채널 수가 바뀔 때만 다시 배치
+    if not win.spec_images or win.spec_images[0].image is None:
+        return
+    span_sec = SPEC_COLUMNS * SPEC_HOP / fs
+    layout_key = (fs, len(win.spec_images))
+    if layout_key == getattr(win, "_spec_layout", None):
+        return
+    win._spec_layout = layout_key
+    for i, item in enumerate(win.spec_images):
+        y0 = (config.N_CH - 1 - i) * CH_OFFSET + CH_OFFSET * 0.05
+        item.setRect(-span_sec, y0, span_sec, CH_OFFSET * 0.9)
+    win.spec_plot.setXRange(-span_sec, 0, padding=0)
+    win.spec_plot.getViewBox().setLimits(xMin=-span_sec, xMax=0)
+    if getattr(win, "graph_panel_title_label", None):
+        win.graph_panel_title_label.setText(
+            f"SPECTROGRAM  fs≈{fs:.0f}Hz · 0–{fs / 2:.0f}Hz per band · {span_sec:.1f}s"
+        )
 
 CHUNK_SIZE = 30  # Bar 높이 계산에 쓸 샘플 수 (30개씩)
 gap_range = 5
 
 
-def update_raw_graph(win, is_fill_mode, unified_x_ms):
+# Fill 모드 막대별 raw 변동폭(max − min) 캐시 (전 채널 × 막대).
+# 막대 b는 링 인덱스 int(b·L/num_bars) − CHUNK_SIZE//2 부터 CHUNK_SIZE개(원형)를 봄.
+# 지난 프레임 이후 기록된 구간(이전 ptr부터 새 샘플 수만큼)과 겹치는 막대만
+# 전 채널 한 번에 다시 계산. 링 reset·resize(layout_version)나 크기 변경, 원본 평면(raw ↔ 선필터) 전환 시 전체 재계산
+class FillBarCache:
+
+    def __init__(self):
+        self.key = None
+        self.ptr = 0
+        self.count = 0
+        self.starts = None
+        self.idx = None
+        self.ptp = None
+
+    def _rebuild(self, n_ch, L, num_bars):
+        centers = (np.arange(num_bars) * L) // num_bars
+        self.starts = (centers - CHUNK_SIZE // 2) % L
+        self.idx = (self.starts[:, None] + np.arange(CHUNK_SIZE)) % L  # (num_bars, CHUNK_SIZE)
+        self.ptp = np.zeros((n_ch, num_bars))
+
+    def _compute(self, data, bars):
+        chunk = data[:, self.idx[bars]]  # (n_ch, k, CHUNK_SIZE)
+        self.ptp[:, bars] = np.nanmax(chunk, axis=2) - np.nanmin(chunk, axis=2)
+
+    # 프레임 스냅샷(data, ptr, count, layout_version) 반영 → (n_ch, num_bars) 변동폭.
+    # prefiltered: data가 선필터 평면인지 (바뀌면 이전 막대는 다른 평면 값이므로 전체 재계산)
+    def update(self, data, ptr, count, layout_version, num_bars, prefiltered=False):
+        n_ch, L = data.shape
+        key = (n_ch, L, num_bars, layout_version, prefiltered)
+        new = count - self.count
+        if key != self.key or new < 0 or new >= L:
+            self.key = key
+            self._rebuild(n_ch, L, num_bars)
+            self._compute(data, np.arange(num_bars))
+        elif new > 0:
+            # 원형 구간 [막대 시작, +CHUNK_SIZE) 와 [이전 ptr, +new) 가 겹치는 막대
+            dirty = (((self.starts - self.ptr) % L < new)
+                     | ((self.ptr - self.starts) % L < CHUNK_SIZE))
+            bars = np.flatnonzero(dirty)
+            if bars.size:
+                self._compute(data, bars)
+        self.ptr, self.count = ptr, count
+        return self.ptp
+
+
+def _update_fill_bars(win, snap, unified_x_ms):
+    # fill 모드: 바 간격을 시간(ms) 기준으로 고정 → max_display가 바뀌어도 간격 일정
+    x_max_ms = PLOT_SEC * 1000
+    num_bars = int(x_max_ms / BAR_INTERVAL_MS)
+    bar_x = np.arange(num_bars, dtype=float) * BAR_INTERVAL_MS
+
+    line_cache = getattr(win, "line_trace_cache", None)
+    if line_cache is not None:
+        line_cache.drawn = False  # Line으로 돌아오면 다시 그리도록
+    cache = getattr(win, "fill_bar_cache", None)
+    if cache is None:
+        cache = win.fill_bar_cache = FillBarCache()
+    count = getattr(win, "ring_count", None)
+    if count is None:
+        cache.key = None  # 링 정보가 없으면 매 프레임 전체 계산
+        count = 0
+    ptp = cache.update(win.raw_np_buf, win.ptr, count, getattr(win, "ring_layout", 0), num_bars,
+                       getattr(win, "raw_prefiltered", False))
+    prof = _profiler(win)
+    prof.lap("raw.bars")
+
+    # 변동폭 → 막대 높이 (Line과 같은 공통 data_range 기준), 변동이 거의 없으면 기본 높이
+    ratio = np.minimum(ptp / snap.half_range, 1.0)
+    heights = np.where(
+        ptp < NO_SIGNAL_VARIATION_RAW,
+        LINE_HEIGHT_PX,
+        np.maximum(ratio * snap.max_bar_pixels, LINE_HEIGHT_PX),
+    )
+
+    if win.is_buf_full:
+        # 버퍼가 찬 경우: 경계(ptr) 기준 앞쪽 gap_range개 바만 비움
+        gap_bar = int(win.ptr * num_bars / win.max_display)
+        heights[:, (gap_bar + np.arange(gap_range)) % num_bars] = 0
+    else:
+        # 미충전: ptr 이후 시간대 바는 비움
+        t_gap = (win.ptr / win.max_display) * x_max_ms
+        heights[:, bar_x >= t_gap] = 0
+    prof.lap("raw.scale")
+
+    # 커서 x: 마지막 샘플 위치(ptr 기준)
+    last_x = win.x_axis[(win.ptr - 1) % win.max_display] if win.sample_count > 0 else unified_x_ms
+    width = min(20, BAR_INTERVAL_MS * 0.6)
     for i in range(config.N_CH):
-
-        # 현재 Raw 스케일 범위 계산 
-        data_range, allowed_half_height = win.scale_manager._data_range_and_half_height()
-        max_bar_pixels = 2.0 * allowed_half_height
-        half_range = max(data_range / 2.0, 1.0)
-
-        # 구간별(CHUNK_SIZE) 진폭 계산 (height_buf는 line 쪽에서 안 쓰이면 fill 전용으로만 씀)
-        for chunk_start in range(0, win.max_display, CHUNK_SIZE):
-            chunk = win.raw_np_buf[i, chunk_start : chunk_start + CHUNK_SIZE]
-
-            if chunk.size > 0:
-                ch_max = np.nanmax(chunk)
-                ch_min = np.nanmin(chunk)
-                if (ch_max - ch_min) < NO_SIGNAL_VARIATION_RAW:
-                    new_h = LINE_HEIGHT_PX
-                else:
-                    bar_height_raw = ch_max - ch_min
-                    ratio = min(bar_height_raw / half_range, 1.0)
-                    new_h = max(ratio * max_bar_pixels, LINE_HEIGHT_PX)
-                win.height_buf[i, chunk_start : chunk_start + CHUNK_SIZE] = new_h
-
+        win.past_lines[i].setVisible(False)
+        win.raw_lines[i].setVisible(False)
         base_offset = (config.N_CH - 1 - i) * CH_OFFSET + (CH_OFFSET / 2)
+        win.bar_items[i].setOpts(
+            x=bar_x,
+            height=heights[i],
+            y0=base_offset - (heights[i] / 2),
+            width=width,
+        )
+        win.bar_items[i].setVisible(True)
+        win.cursor_rects[i].setData(pos=[(last_x, base_offset)])
+    prof.lap("raw.setData")
+
+
+# Line 모드 스케일된 Y 캐시 (전 채널 × 버퍼 길이)와 픽셀 열별 min/max 위치 캐시.
+# 프레임마다 새로 기록된 샘플(이전 ptr부터 ring count 차이만큼)만 스케일하고, 그 샘플이 속한
+# 열만 min/max를 다시 찾음. 스케일 스냅샷이 기준에서 LINE_RESCALE_TOL 이상 벗어난 채널만
+# 전체 재스케일. 링 reset·resize·한 바퀴 이상 기록·원본 평면(raw ↔ 선필터) 전환 시 전체, 줌/팬(view 변경) 시 열 전체 재계산
+class LineTraceCache:
+
+    def __init__(self):
+        self.key = None
+        self.view_key = None
+        self.ptr = 0
+        self.count = 0
+        self.y = None
+        self.ref_baseline = None
+        self.ref_range = None
+        self.vis = (0, 0)
+        self.vis_search = (0, 0)
+        self.starts = None   # 보이는 구간 픽셀 열의 첫 샘플 인덱스
+        self.ends = None
+        self.i_min = None    # (n_ch, n_bins) 열별 min 샘플 인덱스
+        self.i_max = None
+        self.drawn = False   # 지금 화면의 Line이 이 캐시 내용인지 (Fill로 바뀌면 False)
+
+    # 반환: 이번 프레임에 바뀐 것이 있는지 (없으면 setData 생략 가능). prefiltered: data가 선필터 평면인지
+    def update(self, data, ptr, count, layout_version, snap, x_axis, view, prefiltered=False):
+        n_ch, L = data.shape
+        key = (n_ch, L, layout_version, prefiltered)
+        new = count - self.count
+        changed = new != 0
+        dirty_idx = None
+
+        if key != self.key or new < 0 or new >= L:
+            self.key = key
+            self.view_key = None
+            self.y = snap.scale_all(data)
+            self.ref_baseline = snap.baseline.copy()
+            self.ref_range = np.full(n_ch, float(snap.data_range))
+            rescaled = np.ones(n_ch, dtype=bool)
+            changed = True
+        else:
+            # 기준에서 허용 오차 이상 벗어난 채널만 전체 재스케일
+            rescaled = snap.drift_from(self.ref_baseline, self.ref_range) > config.LINE_RESCALE_TOL
+            if rescaled.any():
+                ch = np.flatnonzero(rescaled)
+                self.y[ch] = snap.scale_all(data[ch], ch)
+                self.ref_baseline[ch] = snap.baseline[ch]
+                self.ref_range[ch] = snap.data_range
+                changed = True
+            if new > 0:
+                dirty_idx = (self.ptr + np.arange(new)) % L
+                # 새 샘플도 채널별 기준(ref)으로 변환 → 한 채널의 캐시 전체가 같은 기준
+                self.y[:, dirty_idx] = snap.scale_all(
+                    data[:, dirty_idx], baseline=self.ref_baseline, data_range=self.ref_range
+                )
+        self.ptr, self.count = ptr, count
+
+        if view is not None:
+            changed |= self._update_columns(x_axis, view, rescaled, dirty_idx, new, L)
+        return changed
+
+    def _update_columns(self, x_axis, view, rescaled, dirty_idx, new, L):
+        view_key = (view.x_lo, view.x_hi, view.n_cols)
+        if view_key != self.view_key:
+            self.view_key = view_key
+            self.vis_search = lod.search_visible(x_axis, view.x_lo, view.x_hi)
+            a, b = self.vis = lod.clip_visible(*self.vis_search, 0, len(x_axis))
+            self.starts = lod.column_starts(x_axis, view, a, b)
+            self.ends = np.r_[self.starts[1:], b] if self.starts.size else self.starts
+            self.i_min, self.i_max = self._extrema(np.arange(self.y.shape[0]), self.starts)
+            return True
+        if self.starts.size == 0:
+            return False
+
+        changed = False
+        if rescaled.any():
+            ch = np.flatnonzero(rescaled)
+            self.i_min[ch], self.i_max[ch] = self._extrema(ch, self.starts)
+            changed = True
+        if dirty_idx is not None:
+            # 새 샘플 구간(원형)과 겹치는 열
+            counts = self.ends - self.starts
+            d0 = dirty_idx[0]
+            bins = np.flatnonzero(((self.starts - d0) % L < new) | ((d0 - self.starts) % L < counts))
+            if bins.size:
+                ch = np.flatnonzero(~rescaled)
+                i_min, i_max = self._extrema(ch, self.starts[bins], self.ends[bins])
+                self.i_min[np.ix_(ch, bins)] = i_min
+                self.i_max[np.ix_(ch, bins)] = i_max
+                changed = True
+        return changed
+
+    # 채널 ch의 열 [starts, ends)마다 min/max 위치 (절대 인덱스)
+    def _extrema(self, ch, starts, ends=None):
+        if ends is None:
+            a, b = self.vis
+            i_min, i_max = lod.column_extrema(self.y[ch, a:b], starts - a)
+            return i_min + a, i_max + a
+        lens = ends - starts
+        local = np.r_[0, np.cumsum(lens)[:-1]]
+        idx = np.repeat(starts - local, lens) + np.arange(lens.sum())
+        i_min, i_max = lod.column_extrema(self.y[np.ix_(ch, idx)], local)
+        return idx[i_min], idx[i_max]
+
+    # 버퍼 구간 [lo, hi)의 채널 i Line 좌표. 보이는 부분만, 열 전체가 든 열은 캐시된 min/max,
+    # 구간 경계에 걸친 열(ptr 위치 등)은 그 자리에서 계산
+    def segment(self, i, lo, hi, x_axis, view):
+        if view is None:
+            return x_axis[lo:hi], self.y[i, lo:hi]
+        s, e = lod.clip_visible(*self.vis_search, lo, hi)
+        if e <= s:
+            return np.array([]), np.array([])
+        if e - s <= 2 * view.cols_spanned(x_axis[s], x_axis[e - 1]):
+            return x_axis[s:e], self.y[i, s:e]
+
+        k0 = int(np.searchsorted(self.starts, s, side="left"))   # s 이후에 시작하는 첫 열
+        k1 = int(np.searchsorted(self.ends, e, side="right"))    # e 안에서 끝나는 열까지
+        inner_lo = min(self.starts[k0], e) if k0 < len(self.starts) else e
+        inner_hi = max(self.ends[k1 - 1], inner_lo) if k1 > k0 else inner_lo
+
+        parts = [self._partial(i, s, inner_lo)]
+        if k1 > k0:
+            parts.append(lod.interleave(self.i_min[i, k0:k1], self.i_max[i, k0:k1]))
+        parts.append(self._partial(i, inner_hi, e))
+        pick = np.concatenate(parts)
+        return x_axis[pick], self.y[i, pick]
+
+    def _partial(self, i, p, q):
+        if q <= p:
+            return np.empty(0, dtype=np.int64)
+        seg = self.y[i, p:q]
+        return np.sort([p + int(np.argmin(seg)), p + int(np.argmax(seg))])
+
+
+def update_raw_graph(win, is_fill_mode, unified_x_ms, snap=None):
+    # 현재 Raw 스케일 범위 (프레임 스냅샷)
+    snap = snap or win.scale_manager.snapshot()
+
+    if is_fill_mode:
+        _update_fill_bars(win, snap, unified_x_ms)
+        return
 
-        # fill 모드: 바 간격을 시간(ms) 기준으로 고정 → max_display가 바뀌어도 간격 일정
-        if is_fill_mode:
-            win.past_lines[i].setVisible(False)
-            win.raw_lines[i].setVisible(False)
-
-            x_max_ms = PLOT_SEC * 1000
-            num_bars = int(x_max_ms / BAR_INTERVAL_MS)
-            bar_x = np.arange(num_bars, dtype=float) * BAR_INTERVAL_MS
-            display_heights = np.zeros(num_bars)
-
-            for b in range(num_bars):
-                center_idx = int(b * win.max_display / num_bars)
-                idx = (center_idx - CHUNK_SIZE // 2 + np.arange(CHUNK_SIZE)) % win.max_display
-                if idx.size < CHUNK_SIZE:
-                    continue
-                chunk = win.raw_np_buf[i, idx]
-                ch_max = np.nanmax(chunk)
-                ch_min = np.nanmin(chunk)
-                if (ch_max - ch_min) < NO_SIGNAL_VARIATION_RAW:
-                    h = LINE_HEIGHT_PX
-                else:
-                    bar_height_raw = ch_max - ch_min
-                    ratio = min(bar_height_raw / half_range, 1.0)
-                    h = max(ratio * max_bar_pixels, LINE_HEIGHT_PX)
-                display_heights[b] = h
-                # gap: 링 버퍼 경계 또는 미충전 시 ptr 이후
-                if not win.is_buf_full:
-                    t_bar = b * BAR_INTERVAL_MS
-                    t_gap = (win.ptr / win.max_display) * x_max_ms
-                    if t_bar >= t_gap:
-                        display_heights[b] = 0
-
-            # 버퍼가 찬 경우: 경계(ptr) 기준 앞쪽 5개 바만 비움
-            if win.is_buf_full:
-                gap_bar = int(win.ptr * num_bars / win.max_display)
-                for k in range(gap_range):
-                    display_heights[(gap_bar + k) % num_bars] = 0
-
-            win.bar_items[i].setOpts(
-                x=bar_x,
-                height=display_heights,
-                y0=base_offset - (display_heights / 2),
-                width=min(20, BAR_INTERVAL_MS * 0.6),
-            )
-            win.bar_items[i].setVisible(True)
-
-            # 커서 x: 마지막 샘플 위치(ptr 기준)
-            last_x = win.x_axis[(win.ptr - 1) % win.max_display] if win.sample_count > 0 else unified_x_ms
-            win.cursor_rects[i].setData(pos=[(last_x, base_offset)])
-
+    # LOD: 이번 프레임의 보이는 x 범위·픽셀 열 (줌/팬에 따라 해상도 결정)
+    view = None
+    if config.LINE_LOD_ENABLED:
+        view = lod.PixelView.from_viewbox(win.raw_plot.getViewBox(), config.LINE_LOD_DEFAULT_COLS)
+
+    cache = getattr(win, "line_trace_cache", None)
+    if cache is None:
+        cache = win.line_trace_cache = LineTraceCache()
+    count = getattr(win, "ring_count", None)
+    if count is None:
+        cache.key = None  # 링 정보가 없으면 매 프레임 전체 계산
+        count = 0
+    changed = cache.update(win.raw_np_buf, win.ptr, count, getattr(win, "ring_layout", 0),
+                           snap, win.x_axis, view, getattr(win, "raw_prefiltered", False))
+    # 단계 계측: 스케일·열 min/max 갱신 → raw.scale, 구간 좌표(LOD) → raw.lod, setData·커서 → raw.setData
+    prof = _profiler(win)
+    prof.lap("raw.scale")
+    # 새 샘플·재스케일·줌 변화가 없고 이미 Line으로 그려져 있으면 그대로 둠
+    if not changed and cache.drawn:
+        return
+    cache.drawn = True
 
+    for i in range(config.N_CH):
         # line 모드 
-        else:
-            win.bar_items[i].setVisible(False)
+        win.bar_items[i].setVisible(False)
 
-            # 링 버퍼가 안 찼을 때 
-            if not win.is_buf_full:
-                win.past_lines[i].setData([], [])
-                win.past_lines[i].setVisible(False)
-
-                if win.ptr <= 0:
-                    x, y = np.array([]), np.array([])
+        # 링 버퍼가 안 찼을 때 
+        if not win.is_buf_full:
+            win.past_lines[i].setData([], [])
+            win.past_lines[i].setVisible(False)
 
-                # 0 ~ ptr 구간 좌표
-                else:
-                    x = win.x_axis[: win.ptr]
-                    y = win.scale_manager.get_scaled_array(i, win.raw_np_buf[i, : win.ptr])
+            if win.ptr <= 0:
+                x, y = np.array([]), np.array([])
 
-            # 링 버퍼 한 바퀴 이상: past(ptr~끝) + current(0~ptr)
+            # 0 ~ ptr 구간 좌표
             else:
-                # ptr 이후 구간은 과거 데이터 
-                x_past = win.x_axis[win.ptr :]
-                y_past = win.scale_manager.get_scaled_array(
-                    i, win.raw_np_buf[i, win.ptr :]
-                )
-                win.past_lines[i].setData(x_past, y_past)
-                win.past_lines[i].setVisible(True)
-
-                # 0 ~ ptr 구간은 현재 구간 
-                if win.ptr <= 0:
-                    x, y = np.array([]), np.array([])
-                else:
-                    x = win.x_axis[: win.ptr]
-                    y = win.scale_manager.get_scaled_array(
-                        i, win.raw_np_buf[i, : win.ptr]
-                    )
-            # 현재 구간 라인 표시 
-            win.raw_lines[i].setData(x, y)
-            win.raw_lines[i].setVisible(True)
-
-            
-            # 커서 표시 (x, y 모두 마지막 샘플 = ptr 기준)
-            if win.sample_count > 0:
-                prev_idx = (win.ptr - 1) % win.max_display
-                last_x = win.x_axis[prev_idx]
-                y_cursor = win.scale_manager.get_scaled_array(
-                    i, np.array([win.raw_np_buf[i, prev_idx]])
-                )[0]
-                win.cursor_rects[i].setData(pos=[(last_x, y_cursor)])
+                x, y = cache.segment(i, 0, win.ptr, win.x_axis, view)
+            prof.lap("raw.lod")
+
+        # 링 버퍼 한 바퀴 이상: past(ptr~끝) + current(0~ptr)
+        else:
+            # ptr 이후 구간은 과거 데이터 
+            x_past, y_past = cache.segment(i, win.ptr, win.max_display, win.x_axis, view)
+            prof.lap("raw.lod")
+            win.past_lines[i].setData(x_past, y_past, skipFiniteCheck=True)
+            win.past_lines[i].setVisible(True)
+            prof.lap("raw.setData")
+
+            # 0 ~ ptr 구간은 현재 구간 
+            if win.ptr <= 0:
+                x, y = np.array([]), np.array([])
             else:
-                win.cursor_rects[i].setData(pos=[])
+                x, y = cache.segment(i, 0, win.ptr, win.x_axis, view)
+            prof.lap("raw.lod")
+        # 현재 구간 라인 표시 
+        win.raw_lines[i].setData(x, y, skipFiniteCheck=True)
+        win.raw_lines[i].setVisible(True)
+
+        
+        # 커서 표시 (x, y 모두 마지막 샘플 = ptr 기준)
+        if win.sample_count > 0:
+            prev_idx = (win.ptr - 1) % win.max_display
+            last_x = win.x_axis[prev_idx]
+            y_cursor = cache.y[i, prev_idx]
+            win.cursor_rects[i].setData(pos=[(last_x, y_cursor)])
+        else:
+            win.cursor_rects[i].setData(pos=[])
+        prof.lap("raw.setData")
 
 
-def update_diag_vector(win):
+def update_diag_vector(win, snap=None):
 
+    snap = snap or win.scale_manager.snapshot()
     directions = get_diag_directions()
     DATA_LEN = 100
+    ratios = snap.intensities(win.last_amp[: config.N_CH])
 
     for i in range(config.N_CH):
         if win.ptr >= DATA_LEN:
@@ -311,15 +554,13 @@ def update_diag_vector(win):
         if diag_raw.size < 2:
             continue
 
-        # ratio(강도) 및 파형 정규화 
-        scaler = win.scale_manager.scalers[i]
-
-        # 채널별 진폭을 0~1로 변환 
-        ratio = win.scale_manager.get_vector_intensity(i, win.last_amp[i])
+        # 채널별 진폭을 0~1로 변환 (프레임 스냅샷 기준)
+        ratio = ratios[i]
         
         # 신호 크기(정규화된 파형)
-        denom = max(scaler.current_max - scaler.baseline, 30)
-        wave = (diag_raw - scaler.baseline) / denom
+        baseline = snap.baseline[i]
+        denom = max(snap.current_max[i] - baseline, 30)
+        wave = (diag_raw - baseline) / denom
 
 
         # 벡터 길이 val 계산 
@@ -359,12 +600,10 @@ def update_diag_vector(win):
 
 
 # PWR 그래프 막대 높이 갱신 
-def update_power_info(win):
+def update_power_info(win, snap=None):
 
-    ratios = np.array([
-        win.scale_manager.get_vector_intensity(i, win.last_amp[i])
-        for i in range(config.N_CH)
-    ])
+    snap = snap or win.scale_manager.snapshot()
+    ratios = snap.intensities(win.last_amp[: config.N_CH])
     height_pct = np.clip(ratios * 100.0, 0, 100)
     avg_pct = float(np.clip(np.mean(ratios) * 100.0, 0, 100))
     win.bar_item.setOpts(height=list(height_pct) + [avg_pct])
@@ -0,0 +1,87 @@
+import numpy as np
+
+# Line 모드 LOD(level of detail): 화면 픽셀 열마다 min/max 두 점만 남겨 그릴 점 수를
+# 샘플 수가 아니라 플롯 폭(≈ 2 × 픽셀 수)에 비례하게 만든다. min/max는 실제 샘플 점을
+# 발생 순서대로 고르므로 한 열 안의 스파이크도 사라지지 않음
+
+
+# 현재 ViewBox의 보이는 x 범위와 픽셀 열 폭 (프레임마다 한 번 계산)
+class PixelView:
+
+    def __init__(self, x_lo, x_hi, n_cols):
+        self.x_lo = float(x_lo)
+        self.x_hi = float(x_hi)
+        self.n_cols = max(1, int(n_cols))
+        self.col_width = max(self.x_hi - self.x_lo, 1e-12) / self.n_cols
+
+    # ViewBox의 x 범위·픽셀 폭으로 생성. 아직 배치 전(폭 0)이면 default_cols 사용
+    @classmethod
+    def from_viewbox(cls, vb, default_cols):
+        (x_lo, x_hi), _ = vb.viewRange()
+        width = int(vb.width()) if vb.width() > 0 else default_cols
+        return cls(x_lo, x_hi, width)
+
+    # x[lo:hi]에 픽셀 열이 몇 개 걸치는지
+    def cols_spanned(self, x0, x1):
+        return int((x1 - x0) / self.col_width) + 1
+
+
+# 정렬된 x에서 [x_lo, x_hi]가 보이는 인덱스 구간 (양끝 한 샘플씩 여유 → 선이 화면 끝까지 이어짐)
+def visible_range(x, x_lo, x_hi):
+    return clip_visible(*search_visible(x, x_lo, x_hi), 0, len(x))
+
+
+# x 전체에서 보이는 범위의 이진 탐색 위치 (구간별 clip_visible에 재사용)
+def search_visible(x, x_lo, x_hi):
+    return int(np.searchsorted(x, x_lo, side="left")), int(np.searchsorted(x, x_hi, side="right"))
+
+
+# 탐색 위치 (i_lo, i_hi)를 x[lo:hi] 구간 안의 보이는 인덱스 구간으로 (visible_range(x[lo:hi])와 같음)
+def clip_visible(i_lo, i_hi, lo, hi):
+    a = max(min(max(i_lo, lo), hi) - 1, lo)
+    b = min(max(min(i_hi, hi), lo) + 1, hi)
+    return a, max(a, b)
+
+
+# 정렬된 x의 [a, b) 구간을 픽셀 열(view.x_lo 기준 col_width 간격)로 나눈 각 열의 첫 샘플 인덱스 (절대 인덱스)
+def column_starts(x, view, a, b):
+    if b <= a:
+        return np.empty(0, dtype=np.int64)
+    c0 = int(np.floor((x[a] - view.x_lo) / view.col_width))
+    c1 = int(np.floor((x[b - 1] - view.x_lo) / view.col_width))
+    # 경계 수만큼만 이진 탐색. 나눗셈(c0, c1)과 곱셈(edges)의 반올림이 어긋나도 열이 합쳐지지 않도록
+    # 양쪽에 경계 하나씩 더 둠 (구간 밖 경계는 아래에서 걸러짐)
+    edges = view.x_lo + np.arange(c0, c1 + 2) * view.col_width
+    starts = np.unique(np.r_[a, np.searchsorted(x, edges, side="left")])
+    return starts[(starts >= a) & (starts < b)]
+
+
+# y (n_ch, m)를 열 경계 starts(0 기준)로 나눠 열마다 min·max 샘플을 처음 만나는 위치 → 각 (n_ch, n_bins).
+# 전 채널·전 열을 reduceat 한 번씩으로 계산. 극값을 못 찾은 열(NaN)은 열의 첫 샘플
+def column_extrema(y, starts):
+    m = y.shape[1]
+    counts = np.diff(starts, append=m)
+    pos = np.arange(m)
+    out = []
+    for reduce in (np.minimum, np.maximum):
+        ext = reduce.reduceat(y, starts, axis=1)
+        hit = np.where(y == np.repeat(ext, counts, axis=1), pos, m)
+        first = np.minimum.reduceat(hit, starts, axis=1)
+        out.append(np.where(first < m, first, starts))
+    return out[0], out[1]
+
+
+# 열마다 (min, max) 위치 쌍을 시간 순으로 펼친 인덱스
+def interleave(i_min, i_max):
+    return np.sort(np.stack([i_min, i_max], axis=-1), axis=-1).reshape(*i_min.shape[:-1], -1)
+
+
+# (x, y)를 픽셀 열마다 min·max 샘플 두 개로 줄임. 열 수의 2배보다 점이 적으면 그대로 반환
+def minmax_decimate(x, y, view):
+    n = len(x)
+    if n < 2 or n <= 2 * view.cols_spanned(x[0], x[-1]):
+        return x, y
+    starts = column_starts(x, view, 0, n)
+    i_min, i_max = column_extrema(y[None, :], starts)
+    pick = interleave(i_min[0], i_max[0])
+    return x[pick], y[pick]
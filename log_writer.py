@@ -0,0 +1,116 @@
+import os
+import queue
+import threading
+import time
+
+import config
+
+_STOP = object()  # 큐 종료 표시
+
+
+# 세션 로거의 디스크 기록 전용 스레드. 로거는 채운 버퍼를 통째로 submit()하고 새 버퍼로 바꿔 쓰기만 하고(이중 버퍼),
+# 직렬화·write·flush·fsync는 모두 이 스레드에서 → GUI 스레드(on_sample/on_block·렌더)에 디스크 I/O가 없음.
+# write_fn(file, payload)은 기록한 바이트 수를 반환. submit은 절대 기다리지 않는다: 큐가 LOG_QUEUE_MAX를 넘으면
+# (디스크가 느림) 메모리에 더 쌓고(stalls로 집계), LOG_QUEUE_SPILL_MAX까지 차면 새 버퍼는 버린다(dropped로 집계)
+# → 디스크가 멈춰도 GUI 스레드는 막히지 않고 메모리도 무한히 늘지 않음. 종료용 버퍼는 force로 항상 넣음.
+# fsync 정책(LOG_FSYNC): "close"는 종료 때만, "interval"은 LOG_FSYNC_INTERVAL_SEC마다, "always"는 배치마다.
+# file은 파일 객체 또는 flush()·sync()를 가진 싱크(여러 파일을 쓰는 경우, 예: recording 세그먼트 + 인덱스)
+class BackgroundWriter:
+
+    def __init__(self, file, write_fn, name="log-writer", queue_max=None, fsync=None, spill_max=None):
+        self.file = file
+        self.write_fn = write_fn
+        self.fsync = config.LOG_FSYNC if fsync is None else fsync
+        self.queue_max = config.LOG_QUEUE_MAX if queue_max is None else queue_max
+        self.spill_max = max(self.queue_max, config.LOG_QUEUE_SPILL_MAX if spill_max is None else spill_max)
+        self._queue = queue.Queue()  # 제한은 submit에서 (put이 막히지 않도록)
+        self._lock = threading.Lock()
+        self.bytes_written = 0
+        self.batches = 0
+        self.max_depth = 0
+        self.stalls = 0          # 큐가 LOG_QUEUE_MAX를 넘어 메모리에 더 쌓은 횟수 (기록 스레드가 밀림)
+        self.dropped = 0         # LOG_QUEUE_SPILL_MAX까지 차서 버린 버퍼 수
+        self.write_sec = 0.0     # 기록 스레드가 write·flush·fsync에 쓴 시간 합
+        self.error = None
+        self._last_sync = time.perf_counter()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # 채운 버퍼 전달 (GUI 스레드, 기다리지 않음). 버렸으면 False.
+    # force: 큐 상한과 무관하게 넣음 (종료 직전 마지막 버퍼 — 곧 close가 기록 스레드를 기다림)
+    def submit(self, payload, force=False):
+        if self._closed:
+            return False
+        depth = self._queue.qsize()
+        if depth >= self.spill_max and not force:
+            self.dropped += 1
+            return False
+        if depth >= self.queue_max:
+            self.stalls += 1
+        self._queue.put_nowait(payload)
+        if depth + 1 > self.max_depth:
+            self.max_depth = depth + 1
+        return True
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            if payload is _STOP:
+                break
+            if self.error is not None:
+                continue  # 기록 실패 뒤에는 큐만 비움 (submit이 막히지 않도록)
+            t0 = time.perf_counter()
+            try:
+                n = self.write_fn(self.file, payload)
+                self.file.flush()
+                if self.fsync == "always" or (
+                    self.fsync == "interval" and t0 - self._last_sync >= config.LOG_FSYNC_INTERVAL_SEC
+                ):
+                    _sync(self.file)
+                    self._last_sync = t0
+            except Exception as e:
+                self.error = e
+                print(f"Flush Error: {e}")
+                continue
+            with self._lock:
+                self.bytes_written += n
+                self.batches += 1
+                self.write_sec += time.perf_counter() - t0
+
+    # 기록 지표: 큐 깊이(현재·최대), 누적 바이트·배치 수, 상한 초과·버린 버퍼 수, 기록 시간
+    def stats(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "queue_max_depth": self.max_depth,
+                "bytes_written": self.bytes_written,
+                "batches": self.batches,
+                "stalls": self.stalls,
+                "dropped": self.dropped,
+                "write_ms": self.write_sec * 1000,
+                "error": None if self.error is None else str(self.error),
+            }
+
+    # 남은 버퍼를 모두 기록할 때까지 기다린 뒤 스레드 종료 (파일은 닫지 않음, fsync 정책과 무관하게 한 번 fsync)
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self.error is None and not self.file.closed:
+            try:
+                self.file.flush()
+                _sync(self.file)
+            except OSError as e:
+                print(f"Flush Error: {e}")
+
+
+# 디스크까지 내려쓰기 (싱크가 sync()를 가지면 그것을 사용)
+def _sync(file):
+    sync = getattr(file, "sync", None)
+    if sync is not None:
+        sync()
+    else:
+        os.fsync(file.fileno())
@@ -1,9 +1,13 @@
 import csv
+import io
 import os
 import time
 from datetime import datetime
 
+import numpy as np
+
 import config
+from log_writer import BackgroundWriter
 
 
 class CSVLogger:
@@ -18,9 +22,9 @@ class CSVLogger:
         self.filename = os.path.join(directory, datetime.now().strftime("%Y%m%d_%H%M%S_emg.csv"))
         self.start_ts = time.perf_counter()
 
-        # 파일 핸들 유지 및 작성자(Writer) 설정
+        # 파일 핸들 유지, 실제 기록은 BackgroundWriter 스레드가 담당
         self.file = open(self.filename, 'w', newline='', encoding='utf-8')
-        self.writer = csv.writer(self.file)
+        self._writer = BackgroundWriter(self.file, _write_rows, name="csv-writer")
 
         # 버퍼 시스템 초기화
         self.buffer = []
@@ -33,7 +37,7 @@ class CSVLogger:
             + [f'Raw_CH{i}' for i in range(config.N_CH)]
             + [f'Amp_CH{i}' for i in range(config.N_CH)]
         )
-        self.writer.writerow(header)
+        self.buffer.append(header)
         self._header_written = True
 
     def write_row(self, raw_vals, amp_vals, timestamp=None):
@@ -62,20 +66,51 @@ class CSVLogger:
         except (ValueError, TypeError) as e:
             print(f"Logger Error: {e}")
 
+    # 블록 단위 기록: raw_block·amp_block은 (n, N_CH), timestamps는 ms 단위 (n,)
+    def write_block(self, raw_block, amp_block, timestamps):
+
+        if not self._header_written:
+            self._write_header()
+
+        try:
+            t_ms = np.rint(np.asarray(timestamps, dtype=float)).astype(np.int64)
+            raw_i = np.asarray(raw_block, dtype=float).astype(np.int64)   # int(float(v))와 동일한 절삭
+            amp_i = np.rint(np.asarray(amp_block, dtype=float)).astype(np.int64)
+            rows = np.column_stack([t_ms, raw_i, amp_i])
+
+            self.buffer.extend(rows.tolist())
+            if len(self.buffer) >= self.buffer_size:
+                self.flush()
+        except (ValueError, TypeError) as e:
+            print(f"Logger Error: {e}")
+
+    # 채운 버퍼를 기록 스레드로 넘기고 새 버퍼로 교체 (이중 버퍼, 여기서는 디스크 I/O 없음)
     def flush(self):
 
         if self.buffer:
-            try:
-                # 여러 줄을 한 번에 쓰기 (Disk I/O 횟수 감소)
-                self.writer.writerows(self.buffer) 
-                self.file.flush()   # OS 수준의 버퍼 비우기 요청
-                self.buffer.clear() # 메모리 초기화
-            except Exception as e:
-                print(f"Flush Error: {e}")
+            self._writer.submit(self.buffer)
+            self.buffer = []
 
+    # 기록 스레드 지표 (log_writer.BackgroundWriter.stats)
+    def stats(self):
+        return self._writer.stats()
+
+    # 남은 버퍼까지 기록 스레드가 모두 쓴 뒤 닫음
     def close(self):
 
-        self.flush()
+        if self.buffer:
+            self._writer.submit(self.buffer, force=True)
+            self.buffer = []
+        self._writer.close()
         if not self.file.closed:
             self.file.close()
-            print(f"Saved: {self.filename}")
\ No newline at end of file
+            print(f"Saved: {self.filename}")
+
+
+# (기록 스레드) 행 리스트를 CSV 텍스트로 만들어 한 번에 기록, 기록한 바이트 수 반환
+def _write_rows(file, rows):
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    text = buf.getvalue()
+    file.write(text)
+    return len(text.encode('utf-8'))
\ No newline at end of file
@@ -1,9 +1,11 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 
 from dashboard_ui import EMGDashboard
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # ACQ_MODE = "process"로 패키징 실행할 때 필요
     app = QApplication(sys.argv)
     window = EMGDashboard()
     window.show()
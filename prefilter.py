@@ -0,0 +1,95 @@
+import numpy as np
+
+import config
+from spectrum import design_filters
+
+try:
+    from scipy.signal import lfilter, lfilter_zi, sosfilt, sosfilt_zi
+    _HAS_SCIPY = True
+except ImportError:
+    _HAS_SCIPY = False
+
+
+# 수신 경로 인과(causal) 선필터. PREFILTER_RANGES 구간(0~5Hz 고역통과, 50~60Hz mains 밴드스탑 등)을
+# 2차 구간(SOS) 체인 하나로 블록마다 적용하고 필터 상태(zi)를 다음 블록으로 이월 → 각 샘플은 한 번만 필터링.
+# 고역통과로 빠지는 DC는 느린 1차 저역통과(PREFILTER_DC_HZ)로 따로 추적해 더함 → 출력은 raw와 같은 레벨
+# (스케일러·0 판정 그대로 사용). raw가 RAW_ZERO_THRESHOLD 이하(센서 미인식)인 샘플은 그대로 둠.
+# fs는 PREFILTER_FS_HZ, 0이면 처음 PREFILTER_MEASURE_SEC 동안 측정한 수신 속도이고, 이후에도 같은 간격으로
+# 속도를 재서 설계 fs와 PREFILTER_REDESIGN_TOL 넘게 달라지면(장치 레이트 변경) 다시 설계.
+# 실제로 필터링하지 못한 블록(fs 측정 중, scipy 없음·유효 구간 없음)은 None → 소비자는 raw로 폴백
+class StreamingPrefilter:
+
+    def __init__(self, n_ch, fs=None):
+        self.n_ch = int(n_ch)
+        self.fixed_fs = config.PREFILTER_FS_HZ if fs is None else fs
+        self.reset()
+
+    def reset(self, n_ch=None):
+        if n_ch is not None:
+            self.n_ch = int(n_ch)
+        self.fs = None
+        self._sos = None
+        self._zi = None
+        self._dc_ba = None
+        self._dc_zi = None
+        self._t0 = None
+        self._measured = 0
+        if self.fixed_fs:
+            self._design(self.fixed_fs)
+
+    @property
+    def ready(self):
+        return self.fs is not None
+
+    def _design(self, fs):
+        self.fs = float(fs)
+        sos = design_filters(self.fs, config.PREFILTER_RANGES, output="sos") if _HAS_SCIPY else []
+        self._sos = np.vstack(sos) if sos else None
+        alpha = 1.0 - np.exp(-2.0 * np.pi * config.PREFILTER_DC_HZ / self.fs)
+        self._dc_ba = (np.array([alpha]), np.array([1.0, alpha - 1.0]))
+
+    # 수신 속도 측정: 구간 시작 블록 이후 PREFILTER_MEASURE_SEC 동안 들어온 샘플 수 / 경과 시간.
+    # 구간이 끝난 블록에서만 Hz, 아니면 None
+    def _measure(self, n, now):
+        if self._t0 is None:
+            self._t0, self._measured = now, 0
+            return None
+        self._measured += n
+        if now - self._t0 < config.PREFILTER_MEASURE_SEC or self._measured == 0:
+            return None
+        rate = self._measured / (now - self._t0)
+        self._t0, self._measured = now, 0
+        return rate
+
+    # 첫 블록 값으로 상태를 정상 상태(steady state)로 맞춤 → 시작 과도 응답 없음
+    def _init_state(self, x0):
+        self._zi = sosfilt_zi(self._sos)[:, :, None] * x0[None, None, :]
+        self._dc_zi = lfilter_zi(*self._dc_ba)[:, None] * x0[None, :]
+
+    # 실제 필터링 여부 (False면 process가 None)
+    @property
+    def active(self):
+        return self._sos is not None
+
+    # (n, n_ch) 블록 → 같은 모양의 필터 출력, 필터링하지 못했으면 None. now는 수신 시각(초, fs 측정용)
+    def process(self, samples, now):
+        samples = np.asarray(samples, dtype=float)
+        if len(samples) == 0:
+            return samples
+        rate = None if self.fixed_fs else self._measure(len(samples), now)
+        if self.fs is None:
+            # fs 측정 중 (첫 측정 구간이 끝나면 설계, 이 블록은 아직 필터 안 함)
+            if rate is not None:
+                self._design(rate)
+            return None
+        if rate is not None and abs(rate - self.fs) > config.PREFILTER_REDESIGN_TOL * self.fs:
+            self._design(rate)
+            self._zi = None  # 새 계수로 이 블록부터 상태를 다시 맞춤
+        if self._sos is None:  # scipy 없음 또는 fs에서 유효한 구간 없음
+            return None
+        if self._zi is None:
+            self._init_state(samples[0])
+
+        out, self._zi = sosfilt(self._sos, samples, axis=0, zi=self._zi)
+        dc, self._dc_zi = lfilter(*self._dc_ba, samples, axis=0, zi=self._dc_zi)
+        return np.where(samples <= config.RAW_ZERO_THRESHOLD, samples, out + dc)
@@ -0,0 +1,209 @@
+import os
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+import config
+from log_writer import BackgroundWriter
+
+# 렌더 단계 이름 (HUD·로그 열 순서). graph_render가 lap(이름)으로 기록
+STAGES = (
+    "snapshot",
+    "raw.scale", "raw.bars", "raw.lod", "raw.setData",
+    "fft.prep", "fft.filter", "fft.fft", "fft.setData",
+    "spec.stft", "spec.setData",
+    "diag", "power",
+)
+
+
+# 렌더 프레임 프로파일러. begin_frame → 단계가 끝날 때마다 lap(이름)(직전 lap 이후 시간을 그 단계에 누적) → end_frame.
+# 최근 PROFILE_WINDOW_FRAMES 프레임의 단계별 시간, 렌더 타이머 간격으로 본 달성 FPS·놓친 틱,
+# 수신 샘플 속도·워커 backlog를 report()로 요약. active가 False면 모두 바로 반환 (HUD·로그를 안 쓸 때 비용 없음)
+class RenderProfiler:
+
+    def __init__(self, fps=None, window=None):
+        self.interval = 1.0 / (fps or config.FPS)
+        self.window = int(window or config.PROFILE_WINDOW_FRAMES)
+        self.active = False
+        self.reset()
+
+    def reset(self):
+        self._frames = deque(maxlen=self.window)  # (시작 시각, 전체 초, {단계: 초}, 놓친 틱)
+        self._cur = None
+        self._t_frame = 0.0
+        self._t_lap = 0.0
+        self._cur_missed = 0
+        self._last_begin = None
+        self.missed_total = 0
+        self._ingest = None  # 직전 report의 (시각, 누적 샘플 수)
+        self._rate = 0.0
+
+    # 켜질 때마다 지표를 새로 시작 (꺼져 있던 동안의 간격을 놓친 틱으로 세지 않도록)
+    def set_active(self, on):
+        if on and not self.active:
+            self.reset()
+        self.active = bool(on)
+
+    def begin_frame(self):
+        if not self.active:
+            return
+        now = time.perf_counter()
+        # 직전 프레임 시작부터 타이머 간격 몇 배가 지났는지 → 그 사이 GUI 스레드가 바빠 건너뛴 틱 수
+        missed = 0
+        if self._last_begin is not None:
+            missed = max(0, int(round((now - self._last_begin) / self.interval)) - 1)
+        self._last_begin = now
+        self.missed_total += missed
+        self._cur_missed = missed
+        self._cur = {}
+        self._t_frame = self._t_lap = now
+
+    def lap(self, stage):
+        if not self.active or self._cur is None:
+            return
+        now = time.perf_counter()
+        self._cur[stage] = self._cur.get(stage, 0.0) + (now - self._t_lap)
+        self._t_lap = now
+
+    def end_frame(self):
+        if not self.active or self._cur is None:
+            return
+        self._frames.append((self._t_frame, time.perf_counter() - self._t_frame, self._cur, self._cur_missed))
+        self._cur = None
+
+    # 최근 창 요약. sample_count: START 이후 GUI가 처리한 누적 샘플 수(직전 report와의 차이로 초당 수신 속도),
+    # backlog: 워커가 링에 썼지만 GUI가 아직 처리하지 않은 샘플 수.
+    # 단계 시간은 창 안 모든 프레임 기준 (그 단계를 안 거친 프레임은 0) 평균·p95 ms
+    def report(self, sample_count=0, backlog=0):
+        now = time.perf_counter()
+        if self._ingest is not None and sample_count >= self._ingest[1] and now > self._ingest[0]:
+            self._rate = (sample_count - self._ingest[1]) / (now - self._ingest[0])
+        else:
+            self._rate = 0.0  # 첫 report 또는 START로 샘플 수가 다시 시작됨
+        self._ingest = (now, sample_count)
+
+        frames = list(self._frames)
+        rep = {
+            "fps": 0.0,
+            "frame_ms": 0.0,
+            "frame_p95_ms": 0.0,
+            "missed_ticks": sum(f[3] for f in frames),
+            "missed_total": self.missed_total,
+            "samples_per_sec": self._rate,
+            "backlog": int(backlog),
+            "stages": {},
+        }
+        if not frames:
+            return rep
+        if len(frames) > 1 and frames[-1][0] > frames[0][0]:
+            rep["fps"] = (len(frames) - 1) / (frames[-1][0] - frames[0][0])
+        total = np.array([f[1] for f in frames]) * 1000
+        rep["frame_ms"] = float(total.mean())
+        rep["frame_p95_ms"] = float(np.percentile(total, 95))
+        for stage in STAGES:
+            if not any(stage in f[2] for f in frames):
+                continue
+            ms = np.array([f[2].get(stage, 0.0) for f in frames]) * 1000
+            rep["stages"][stage] = (float(ms.mean()), float(np.percentile(ms, 95)))
+        return rep
+
+
+# report → HUD 여러 줄 문자열
+def format_report(rep):
+    lines = [
+        f"FPS {rep['fps']:5.1f}   missed {rep['missed_ticks']} ({rep['missed_total']} total)",
+        f"frame {rep['frame_ms']:6.2f} ms   p95 {rep['frame_p95_ms']:6.2f}",
+        f"in {rep['samples_per_sec']:8.0f} /s   backlog {rep['backlog']}",
+        f"{'stage':13s} {'mean':>6s} {'p95':>6s}",
+    ]
+    for stage, (mean, p95) in rep["stages"].items():
+        lines.append(f"{stage:13s} {mean:6.2f} {p95:6.2f}")
+    return "\n".join(lines)
+
+
+# 롤링 로그 파일 묶음 (기록 스레드에서만 사용). PROFILE_LOG_MAX_BYTES를 넘으면 base.1, base.2 … 로 밀어내고
+# (최대 PROFILE_LOG_BACKUPS개, 가장 오래된 것은 삭제) 새 파일에 헤더부터 다시 씀
+class _RollingSink:
+
+    def __init__(self, filename, header, max_bytes, backups):
+        self.filename = filename
+        self.header = header
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file = None
+        self._open()
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def _open(self):
+        self.file = open(self.filename, "w", newline="", encoding="utf-8")
+        self.file.write(self.header)
+
+    def _rotate(self):
+        self.file.close()
+        for k in range(self.backups - 1, 0, -1):
+            src = f"{self.filename}.{k}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.filename}.{k + 1}")
+        if self.backups > 0:
+            os.replace(self.filename, f"{self.filename}.1")
+        self._open()
+
+    def write_lines(self, text):
+        self.file.write(text)
+        n = len(text)
+        if self.file.tell() >= self.max_bytes:
+            self._rotate()
+        return n
+
+    def flush(self):
+        self.file.flush()
+
+    def sync(self):
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+
+# 프로파일 요약의 롤링 CSV 로그. report마다 한 줄: 시각, FPS, 놓친 틱, 수신 속도, backlog, 프레임 평균·p95,
+# 단계별 평균·p95 (ms, 그 단계가 창 안에 없으면 빈 칸). 디스크 기록은 BackgroundWriter 스레드
+class ProfileLog:
+
+    def __init__(self, directory="data", max_bytes=None, backups=None):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.filename = os.path.join(directory, datetime.now().strftime("%Y%m%d_%H%M%S_profile.csv"))
+        cols = ["time", "fps", "missed_ticks", "samples_per_sec", "backlog", "frame_ms", "frame_p95_ms"]
+        for stage in STAGES:
+            cols += [f"{stage}_ms", f"{stage}_p95_ms"]
+        self._sink = _RollingSink(
+            self.filename, ",".join(cols) + "\n",
+            config.PROFILE_LOG_MAX_BYTES if max_bytes is None else max_bytes,
+            config.PROFILE_LOG_BACKUPS if backups is None else backups,
+        )
+        self._writer = BackgroundWriter(self._sink, _write_lines, name="profile-writer", fsync="close")
+
+    def write(self, rep):
+        row = [
+            datetime.now().strftime("%H:%M:%S.%f")[:-3],
+            f"{rep['fps']:.2f}", str(rep["missed_ticks"]), f"{rep['samples_per_sec']:.0f}", str(rep["backlog"]),
+            f"{rep['frame_ms']:.3f}", f"{rep['frame_p95_ms']:.3f}",
+        ]
+        for stage in STAGES:
+            mean_p95 = rep["stages"].get(stage)
+            row += [f"{mean_p95[0]:.3f}", f"{mean_p95[1]:.3f}"] if mean_p95 else ["", ""]
+        self._writer.submit(",".join(row) + "\n")
+
+    def close(self):
+        self._writer.close()
+        self._sink.close()
+        print(f"Saved: {self.filename}")
+
+
+def _write_lines(sink, text):
+    return sink.write_lines(text)
@@ -0,0 +1,484 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+import config
+from log_writer import BackgroundWriter
+
+# 세션 녹화 이진 형식 (.emgrec, little-endian)
+#   [MAGIC 8B][header_len: uint32][JSON 헤더 (header_len 바이트, 공백 패딩)]
+#   [청크 헤더 24B][시각 t_us][raw (n, n_ch)][amp (n, n_ch)] ... 반복
+# 헤더는 고정 크기로 잡아 두고 close 때 샘플 수·측정 rate를 채워 다시 씀 (비정상 종료 시 rate는 null).
+# 청크 헤더: magic "CHNK", 행 수, codec(0 원본 / 1 delta+zlib), raw·amp dtype 바이트 수(2 = int16, 4 = int32),
+# 세 배열의 바이트 길이. 값은 CSVLogger와 같은 정수 규칙(raw 절삭, amp 반올림), 시각은 START 기준 µs (int64)
+#
+# 세션 인덱스 (.emgidx): [INDEX_MAGIC 8B] + 청크마다 40B 레코드 INDEX_DTYPE
+#   (세그먼트 번호, 행 수, 첫·마지막 시각 µs, 세션 누적 샘플 위치, 세그먼트 파일 안 바이트 위치)
+# 세그먼트 파일은 인덱스와 같은 이름 + _0000.emgrec (세그먼트 번호 = START 기준 시각 // LOG_SEGMENT_SEC)
+MAGIC = b"EMGREC\x00\x01"
+FORMAT_VERSION = 1
+HEADER_BYTES = 1024
+EXTENSION = ".emgrec"
+INDEX_MAGIC = b"EMGIDX\x00\x01"
+INDEX_EXTENSION = ".emgidx"
+INDEX_DTYPE = np.dtype([
+    ("segment", "<u4"), ("n", "<u4"), ("t_first", "<i8"), ("t_last", "<i8"), ("sample", "<i8"), ("offset", "<u8"),
+])
+_CHUNK = struct.Struct("<4sIBBBxIII")
+_CHUNK_MAGIC = b"CHNK"
+CODEC_RAW, CODEC_DELTA_ZLIB = 0, 1
+_DTYPES = {2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+# 값 범위에 맞는 가장 작은 정수 dtype 코드 (청크마다 결정)
+def _int_code(a):
+    if a.size == 0 or (a.min() >= -32768 and a.max() <= 32767):
+        return 2
+    return 4
+
+
+# 행 방향 차분 (첫 행은 그대로). 정수 overflow는 cumsum에서 같은 방식으로 되돌아감
+def _delta(a):
+    d = a.copy()
+    d[1:] -= a[:-1]
+    return d
+
+
+# 시각·raw·amp 정수 배열 → 청크 바이트열
+def encode_chunk(t_us, raw_i, amp_i, compress=True, level=None):
+    level = config.LOG_ZLIB_LEVEL if level is None else level
+    raw_code, amp_code = _int_code(raw_i), _int_code(amp_i)
+    arrays = [
+        t_us.astype("<i8"),
+        raw_i.astype(_DTYPES[raw_code]),
+        amp_i.astype(_DTYPES[amp_code]),
+    ]
+    if compress:
+        parts = [zlib.compress(_delta(a).tobytes(), level) for a in arrays]
+        codec = CODEC_DELTA_ZLIB
+    else:
+        parts = [a.tobytes() for a in arrays]
+        codec = CODEC_RAW
+    head = _CHUNK.pack(_CHUNK_MAGIC, len(t_us), codec, raw_code, amp_code, *(len(p) for p in parts))
+    return head + b"".join(parts)
+
+
+# 한 배열 구간 복원. 원본이면 buf 위 뷰(복사 없음), 압축이면 풀고 누적합으로 차분 복원
+def _decode_array(buf, offset, length, codec, dtype, shape):
+    if codec == CODEC_RAW:
+        return np.frombuffer(buf, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    d = np.frombuffer(zlib.decompress(buf[offset : offset + length]), dtype=dtype).reshape(shape)
+    return np.cumsum(d, axis=0, dtype=dtype)
+
+
+# 블록을 모아 LOG_CHUNK_ROWS 행마다 청크로 기록하는 로거 (CSVLogger와 같은 인터페이스).
+# 채널 수는 첫 기록에서 결정, 행별 파이썬 리스트·문자열 변환 없이 블록 단위 numpy 변환만.
+# 모인 블록은 BackgroundWriter 스레드로 넘기고 청크 분할·인코딩(zlib)·기록은 그 스레드에서.
+# 기록은 LOG_SEGMENT_SEC 길이 세그먼트 파일(<이름>_0000.emgrec ...)로 나뉘고, 청크마다 인덱스(<이름>.emgidx)에
+# 한 줄씩 추가 → read_range(인덱스, t0, t1)가 필요한 청크만 읽음. filename은 인덱스 경로
+class BinaryLogger:
+
+    def __init__(self, directory="data", chunk_rows=None, compress=None, meta=None, segment_sec=None):
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        self.base = os.path.join(directory, datetime.now().strftime("%Y%m%d_%H%M%S_emg"))
+        self.filename = self.base + INDEX_EXTENSION
+        self.chunk_rows = config.LOG_CHUNK_ROWS if chunk_rows is None else chunk_rows
+        self.compress = config.LOG_COMPRESS if compress is None else compress
+        segment_sec = config.LOG_SEGMENT_SEC if segment_sec is None else segment_sec
+        self.start_ts = time.perf_counter()
+
+        self.n_samples = 0
+        self._blocks = []  # (t_us, raw_i, amp_i) 블록, 합이 chunk_rows가 되면 기록 스레드로
+        self._pending = 0
+        self._carry = []   # (기록 스레드) 청크를 채우지 못하고 남은 행
+        self.sink = _SegmentSink(self.base, segment_sec, self.compress, dict(meta or {}))
+        self._writer = BackgroundWriter(self.sink, self._write_chunks, name="rec-writer")
+
+    # 한 행 기록. timestamp(ms)가 없으면 로거 생성 시점 기준 경과 시간
+    def write_row(self, raw_vals, amp_vals, timestamp=None):
+        if timestamp is None:
+            timestamp = (time.perf_counter() - self.start_ts) * 1000
+        self.write_block([raw_vals], [amp_vals], [timestamp])
+
+    # 블록 단위 기록: raw_block·amp_block은 (n, N_CH), timestamps는 ms 단위 (n,)
+    def write_block(self, raw_block, amp_block, timestamps):
+        try:
+            t_us = np.rint(np.asarray(timestamps, dtype=float) * 1000.0).astype(np.int64)
+            raw_i = np.asarray(raw_block, dtype=float).astype(np.int64)   # CSVLogger와 같은 절삭
+            amp_i = np.rint(np.asarray(amp_block, dtype=float)).astype(np.int64)
+        except (ValueError, TypeError) as e:
+            print(f"Logger Error: {e}")
+            return
+        if len(t_us) == 0:
+            return
+        self.n_samples += len(t_us)
+        self._blocks.append((t_us, raw_i, amp_i))
+        self._pending += len(t_us)
+        if self._pending >= self.chunk_rows:
+            self._submit(final=False)
+
+    # 모인 블록을 기록 스레드로 넘기고 새 목록으로 교체
+    def _submit(self, final):
+        self._writer.submit((self._blocks, final), force=final)
+        self._blocks = []
+        self._pending = 0
+
+    # (기록 스레드) 이월 행 + 블록을 청크로 기록. 청크는 chunk_rows 행이고 세그먼트 경계에서 끊김.
+    # 끝에서 chunk_rows를 못 채운 행은 다음으로 이월 (final이면 짧은 청크로 기록). 기록한 바이트 수 반환
+    def _write_chunks(self, sink, payload):
+        blocks, final = payload
+        blocks = self._carry + blocks
+        if not blocks:
+            return 0
+        t_us, raw_i, amp_i = (np.concatenate(a) for a in zip(*blocks))
+        n, pos, written = len(t_us), 0, 0
+        while pos < n:
+            seg_end = sink.segment_end(t_us, pos)
+            e = min(pos + self.chunk_rows, seg_end)
+            if e == n and e - pos < self.chunk_rows and not final:
+                break  # 세그먼트 경계 전이라 아직 더 채울 수 있음
+            written += sink.write_chunk(t_us[pos:e], raw_i[pos:e], amp_i[pos:e])
+            pos = e
+        rest = (t_us[pos:], raw_i[pos:], amp_i[pos:])
+        self._carry = [rest] if len(rest[0]) else []
+        return written
+
+    # 지금까지 받은 행을 모두 (짧은 청크 포함) 기록 스레드로
+    def flush(self):
+        self._submit(final=True)
+
+    # 기록 스레드 지표 (log_writer.BackgroundWriter.stats) + 세그먼트 수
+    def stats(self):
+        stats = self._writer.stats()
+        stats["segments"] = self.sink.n_segments
+        return stats
+
+    # 남은 행을 기록 스레드가 모두 쓴 뒤 마지막 세그먼트 헤더를 최종 값으로 덮어쓰고 닫음
+    def close(self):
+        if self.sink.closed:
+            return
+        self.flush()
+        self._writer.close()
+        try:
+            self.sink.close()
+        except (OSError, ValueError) as e:
+            print(f"Flush Error: {e}")
+        print(f"Saved: {self.filename}")
+
+
+# (기록 스레드 전용) 세그먼트 파일과 인덱스 파일. 세그먼트 k는 START 기준 [k·S, (k+1)·S) 구간의 샘플
+# (S = segment_sec, 0이면 세그먼트 하나). 각 세그먼트는 그 자체로 완결된 .emgrec (헤더에 세그먼트 번호·샘플 수·rate)
+class _SegmentSink:
+
+    def __init__(self, base, segment_sec, compress, meta):
+        self.base = base
+        self.seg_us = int(segment_sec * 1e6) if segment_sec and segment_sec > 0 else 0
+        self.compress = compress
+        self.meta = meta
+        self.index = open(base + INDEX_EXTENSION, "wb")
+        self.index.write(INDEX_MAGIC)
+        self.file = None
+        self.segment = None
+        self.n_segments = 0
+        self.sample_pos = 0  # 세션 누적 샘플 위치 (인덱스의 sample 열)
+        self.closed = False
+
+    def _segment_of(self, t):
+        return max(0, int(t) // self.seg_us) if self.seg_us else 0
+
+    # t_us[pos]가 속한 세그먼트가 끝나는 위치 (t_us는 단조 증가)
+    def segment_end(self, t_us, pos):
+        if not self.seg_us:
+            return len(t_us)
+        bound = (self._segment_of(t_us[pos]) + 1) * self.seg_us
+        return int(np.searchsorted(t_us, bound, side="left"))
+
+    def _header(self):
+        rate = None
+        if self.seg_n > 1 and self.seg_t_last > self.seg_t_first:
+            rate = (self.seg_n - 1) / ((self.seg_t_last - self.seg_t_first) / 1e6)
+        return {
+            "format": FORMAT_VERSION,
+            "n_ch": self.n_ch,
+            "rate_hz": rate,
+            "n_samples": self.seg_n,
+            "time_unit": "us",
+            "compression": "delta+zlib" if self.compress else "none",
+            "created": self.created,
+            "segment": self.segment,
+            "segment_sec": self.seg_us / 1e6,
+            "sample_start": self.seg_sample_start,
+            "meta": self.meta,
+        }
+
+    # 고정 크기 헤더 (세그먼트 시작 시 한 번, 세그먼트를 닫을 때 최종 값으로 덮어씀)
+    def _write_header(self):
+        body = json.dumps(self._header(), ensure_ascii=False).encode("utf-8")
+        if len(body) > HEADER_BYTES:
+            raise ValueError("recording header too large")
+        self.file.seek(0)
+        self.file.write(MAGIC + struct.pack("<I", HEADER_BYTES) + body.ljust(HEADER_BYTES, b" "))
+
+    def _open_segment(self, segment, n_ch):
+        self._close_segment()
+        self.segment = segment
+        self.n_ch = n_ch
+        self.created = datetime.now().isoformat(timespec="seconds")
+        self.seg_n = 0
+        self.seg_t_first = self.seg_t_last = None
+        self.seg_sample_start = self.sample_pos
+        self.file = open(segment_path(self.base + INDEX_EXTENSION, segment), "wb")
+        self._write_header()
+        self.n_segments += 1
+
+    def _close_segment(self):
+        if self.file is None:
+            return
+        self._write_header()
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+    # 청크 하나를 해당 세그먼트에 기록하고 인덱스에 (세그먼트, 행 수, 시각 범위, 샘플 위치, 바이트 위치) 추가
+    def write_chunk(self, t_us, raw_i, amp_i):
+        segment = self._segment_of(t_us[0])
+        if segment != self.segment:
+            self._open_segment(segment, raw_i.shape[1])
+        n = len(t_us)
+        chunk = encode_chunk(t_us, raw_i, amp_i, self.compress)
+        offset = self.file.seek(0, os.SEEK_END)
+        self.file.write(chunk)
+        self.index.write(np.array(
+            [(segment, n, t_us[0], t_us[-1], self.sample_pos, offset)], dtype=INDEX_DTYPE
+        ).tobytes())
+        if self.seg_t_first is None:
+            self.seg_t_first = int(t_us[0])
+        self.seg_t_last = int(t_us[-1])
+        self.seg_n += n
+        self.sample_pos += n
+        return len(chunk) + INDEX_DTYPE.itemsize
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+        self.index.flush()
+
+    def sync(self):
+        if self.file is not None:
+            os.fsync(self.file.fileno())
+        os.fsync(self.index.fileno())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._close_segment()
+        self.index.flush()
+        os.fsync(self.index.fileno())
+        self.index.close()
+
+
+# 읽어 온 녹화: header(dict), t_us (n,), raw·amp (n, n_ch)
+class Recording:
+
+    def __init__(self, header, t_us, raw, amp):
+        self.header = header
+        self.t_us = t_us
+        self.raw = raw
+        self.amp = amp
+
+    @property
+    def n_ch(self):
+        return self.raw.shape[1]
+
+    @property
+    def times_ms(self):
+        return self.t_us / 1000.0
+
+    # 헤더의 rate (비정상 종료로 비어 있으면 시각에서 계산)
+    @property
+    def rate_hz(self):
+        rate = self.header.get("rate_hz")
+        if rate is None and len(self.t_us) > 1 and self.t_us[-1] > self.t_us[0]:
+            rate = (len(self.t_us) - 1) / ((self.t_us[-1] - self.t_us[0]) / 1e6)
+        return rate
+
+
+# 샘플 없는 Recording (n_ch 채널 모양 유지)
+def _empty_recording(header, n_ch):
+    empty = np.empty((0, n_ch), dtype=np.int32)
+    return Recording(header, np.empty(0, dtype=np.int64), empty, empty.copy())
+
+
+# 파일 buf(bytes·mmap)에서 JSON 헤더와 첫 청크 위치
+def _parse_header(buf):
+    if bytes(buf[:8]) != MAGIC:
+        raise ValueError("not an EMG recording")
+    if len(buf) < 12:
+        raise ValueError("truncated EMG recording header")
+    (header_len,) = struct.unpack_from("<I", buf, 8)
+    if 12 + header_len > len(buf):
+        raise ValueError("truncated EMG recording header")
+    header = json.loads(bytes(buf[12 : 12 + header_len]).decode("utf-8"))
+    return header, 12 + header_len
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if len(head) < 12:
+            raise ValueError(f"{path}: empty or truncated EMG recording")
+        (header_len,) = struct.unpack_from("<I", head, 8)
+        return _parse_header(head + f.read(header_len))[0]
+
+
+# 청크 헤더 다음 pos부터 세 배열 복원
+def _decode_chunk(buf, pos, fields, n_ch):
+    n, codec, raw_code, amp_code, lt, lr, la = fields
+    t_us = _decode_array(buf, pos, lt, codec, np.dtype("<i8"), (n,))
+    raw = _decode_array(buf, pos + lt, lr, codec, _DTYPES[raw_code], (n, n_ch))
+    amp = _decode_array(buf, pos + lt + lr, la, codec, _DTYPES[amp_code], (n, n_ch))
+    return t_us, raw, amp
+
+
+# buf의 청크를 차례로 (t_us, raw, amp)로. 끝이 잘린 청크(기록 중 종료)는 버림
+def _iter_chunks(buf, offset, n_ch):
+    end = len(buf)
+    while offset + _CHUNK.size <= end:
+        magic, *fields = _CHUNK.unpack_from(buf, offset)
+        size = sum(fields[-3:])
+        if magic != _CHUNK_MAGIC or offset + _CHUNK.size + size > end:
+            break
+        yield _decode_chunk(buf, offset + _CHUNK.size, fields, n_ch)
+        offset += _CHUNK.size + size
+
+
+# 청크 단위로 (t_us, raw, amp) 순회 (큰 파일을 나눠 처리할 때). 파일 전체를 올리지 않고 청크마다 읽음
+def iter_chunks(path):
+    with open(path, "rb") as f:
+        head = f.read(12)
+        if len(head) < 12:
+            return
+        (header_len,) = struct.unpack_from("<I", head, 8)
+        header, _ = _parse_header(head + f.read(header_len))
+        n_ch = header["n_ch"] or 0
+        while True:
+            head = f.read(_CHUNK.size)
+            if len(head) < _CHUNK.size:
+                return
+            magic, *fields = _CHUNK.unpack(head)
+            size = sum(fields[-3:])
+            body = f.read(size)
+            if magic != _CHUNK_MAGIC or len(body) < size:
+                return
+            yield _decode_chunk(body, 0, fields, n_ch)
+
+
+# 인덱스의 세그먼트 k 파일 경로
+def segment_path(index_path, segment):
+    return f"{os.path.splitext(index_path)[0]}_{segment:04d}{EXTENSION}"
+
+
+# 세션 인덱스 → INDEX_DTYPE 구조 배열 (청크 순서 = 시각 순서). 끝이 잘린 레코드는 버림
+def read_index(index_path):
+    with open(index_path, "rb") as f:
+        magic = f.read(len(INDEX_MAGIC))
+        if not magic:
+            return np.empty(0, dtype=INDEX_DTYPE)  # 0바이트 (인덱스 머리도 쓰기 전 종료)
+        if magic != INDEX_MAGIC:
+            raise ValueError("not an EMG recording index")
+        body = f.read()
+    n = len(body) // INDEX_DTYPE.itemsize
+    return np.frombuffer(body, dtype=INDEX_DTYPE, count=n)
+
+
+# 세션에서 START 기준 [t0, t1) 초 구간만 읽기 (None이면 처음·끝까지). 인덱스에서 구간과 겹치는 청크를
+# 이진 탐색해 세그먼트마다 그 청크 바이트만 seek·read → 긴 세션도 구간 길이에 비례하는 비용.
+# 반환 Recording의 header는 첫 세그먼트 헤더 (n_samples·rate_hz는 읽은 구간 기준으로 바꿈)
+def read_range(index_path, t0=None, t1=None):
+    index = read_index(index_path)
+    lo_us = -np.inf if t0 is None else t0 * 1e6
+    hi_us = np.inf if t1 is None else t1 * 1e6
+    first = int(np.searchsorted(index["t_last"], lo_us, side="left"))
+    last = int(np.searchsorted(index["t_first"], hi_us, side="left"))
+    picked = index[first:last]
+
+    header, parts = None, []
+    for segment in np.unique(picked["segment"]):
+        rows = picked[picked["segment"] == segment]
+        with open(segment_path(index_path, int(segment)), "rb") as f:
+            seg_header = read_header(f.name)
+            header = header or seg_header
+            for rec in rows:
+                f.seek(int(rec["offset"]))
+                head = f.read(_CHUNK.size)
+                magic, *fields = _CHUNK.unpack(head)
+                body = f.read(sum(fields[-3:]))
+                parts.append(_decode_chunk(body, 0, fields, seg_header["n_ch"]))
+
+    if not parts:
+        # 구간과 겹치는 청크가 없어도 채널 수는 첫 세그먼트 헤더에서
+        if header is None and len(index):
+            header = read_header(segment_path(index_path, int(index["segment"][0])))
+        return _empty_recording(dict(header or {}, n_samples=0, rate_hz=None), header["n_ch"] if header else 0)
+    t_us = np.concatenate([p[0] for p in parts])
+    keep = (t_us >= lo_us) & (t_us < hi_us)
+    raw = np.concatenate([p[1] for p in parts])[keep].astype(np.int32, copy=False)
+    amp = np.concatenate([p[2] for p in parts])[keep].astype(np.int32, copy=False)
+    header = dict(header, n_samples=int(np.count_nonzero(keep)), rate_hz=None)
+    return Recording(header, t_us[keep], raw, amp)
+
+
+# 녹화 전체를 numpy 배열로. 세션 인덱스(.emgidx)면 read_range로 전 세그먼트. 파일을 mmap으로 열어 원본 청크는 np.frombuffer 뷰, 압축 청크는 zlib 해제 후
+# 누적합으로 복원하고 청크들을 한 번에 이어 붙임 (raw·amp는 int32, 시각은 int64 µs).
+# 0바이트 파일(헤더를 쓰기 전 종료·비정상 종료)은 빈 Recording, 헤더가 잘렸으면 ValueError
+def read_recording(path):
+    if path.endswith(INDEX_EXTENSION):
+        return read_range(path)
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _empty_recording({}, 0)  # 빈 파일은 mmap할 수 없음
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            header, offset = _parse_header(buf)
+            n_ch = header["n_ch"] or 0
+            chunks = list(_iter_chunks(buf, offset, n_ch))
+            if not chunks:
+                return _empty_recording(header, n_ch)
+            t_us = np.concatenate([c[0] for c in chunks])
+            raw = np.concatenate([c[1] for c in chunks]).astype(np.int32, copy=False)
+            amp = np.concatenate([c[2] for c in chunks]).astype(np.int32, copy=False)
+            del chunks  # mmap 뷰 해제
+    return Recording(header, t_us, raw, amp)
+
+
+# 녹화(세그먼트 파일 또는 세션 인덱스) → CSVLogger와 같은 열(Time(ms), Raw_CH*, Amp_CH*)의 CSV.
+# csv_path가 없으면 확장자만 .csv로
+def to_csv(path, csv_path=None):
+    rec = read_recording(path)
+    if csv_path is None:
+        csv_path = os.path.splitext(path)[0] + ".csv"
+    header = ",".join(
+        ["Time(ms)"] + [f"Raw_CH{i}" for i in range(rec.n_ch)] + [f"Amp_CH{i}" for i in range(rec.n_ch)]
+    )
+    t_ms = np.rint(rec.t_us / 1000.0).astype(np.int64)
+    rows = np.column_stack([t_ms, rec.raw, rec.amp])
+    np.savetxt(csv_path, rows, fmt="%d", delimiter=",", header=header, comments="")
+    return csv_path
+
+
+# python recording.py <파일.emgidx | 파일.emgrec> [출력.csv] → CSV 변환
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python recording.py <session.emgidx | segment.emgrec> [out.csv]")
+        sys.exit(1)
+    print(f"Saved: {to_csv(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)}")
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+
+import numpy as np
+from PyQt6.QtCore import QThread, pyqtSignal
+
+import config
+from config import BASE_SAMPLES
+from recording import INDEX_EXTENSION, EXTENSION, read_recording
+from serial_worker import AcquisitionPipeline
+
+
+# 기록된 세션 → (샘플 시각 (n,) 초, raw (n, n_ch)). .emgidx(세션 인덱스)·.emgrec(세그먼트)·CSVLogger .csv 지원.
+# 기록된 amp 열은 쓰지 않음 (재생 시 현재 설정으로 다시 계산)
+def load_session(path):
+    if path.endswith((INDEX_EXTENSION, EXTENSION)):
+        rec = read_recording(path)
+        return rec.t_us / 1e6, rec.raw.astype(float)
+    data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+    n_ch = (data.shape[1] - 1) // 2
+    return data[:, 0] / 1000.0, data[:, 1 : 1 + n_ch]
+
+
+# 녹화 재생 소스. SerialWorker와 같은 시그널·configure/start/stop을 제공해 대시보드에서 그대로 교체 가능.
+# raw 샘플을 AcquisitionPipeline.process(선필터·진폭 계산)에 통과시켜 링 버퍼·sig_block/sig_sample로 내보냄.
+# 샘플 시각은 START 시각 + 기록 시각 오프셋(기록 시간축) → 배속과 무관하게 fs 추정·FFT 축·버퍼 길이는 기록 기준.
+# speed: 1 = 실시간, N = N배속, 0 = 최대 속도(REPLAY_FAST_BLOCK개씩 쉬지 않고 → 수신~렌더 전체 처리량 상한 측정).
+# UI가 처리하지 않은 블록이 REPLAY_MAX_INFLIGHT개를 넘으면 재생 쪽이 기다림 (시그널 큐가 끝없이 쌓이지 않게)
+class ReplayWorker(QThread):
+    sig_sample = pyqtSignal(list, object, float)
+    sig_block = pyqtSignal(object, object, object, object)
+    sig_status = pyqtSignal(str)
+    sig_error = pyqtSignal(str)
+    sig_channel_detected = pyqtSignal(int)
+    sig_stats = pyqtSignal(dict)  # 재생 통계 (SERIAL_STATS_INTERVAL마다): 재생 위치·처리 속도·실제 배속
+
+    def __init__(self):
+        super().__init__()
+        self._running = False
+        self.path = None
+        self.speed = 1.0
+        self.n_samples = int(BASE_SAMPLES * config.N_MULT_DEFAULT)
+        self.amp_hop = config.AMP_HOP_SAMPLES
+        self.last_amp = np.zeros(config.N_CH)
+        self.block_mode = config.SERIAL_BLOCK_MODE
+        self.ring = None
+        self.last_stats = {}
+        self.stop_timeout_ms = 500  # 자리 대기(_wait_slot)는 0.05초마다 stop 확인
+        self._inflight = threading.BoundedSemaphore(config.REPLAY_MAX_INFLIGHT)
+        # 이 객체는 GUI 스레드 소속 → 재생 스레드에서 보낸 시그널의 _ack는 GUI 스레드 이벤트 루프에서 실행
+        self.sig_block.connect(self._ack)
+        self.sig_sample.connect(self._ack)
+
+    def configure(self, path: str, speed: float, n_mult: int):
+        self.path = path
+        self.speed = float(speed)
+        self.update_params(n_mult)
+
+    def update_params(self, n_mult, hop=None):
+        self.n_samples = int(BASE_SAMPLES * n_mult)
+        if hop is not None:
+            self.amp_hop = hop
+
+    def stop(self):
+        self._running = False
+
+    def _ack(self, *args):
+        try:
+            self._inflight.release()
+        except ValueError:
+            pass  # 이전 재생에서 남은 시그널
+
+    def run(self):
+        if not self.path:
+            self.sig_error.emit("No recording selected.")
+            return
+        try:
+            t_rec, raw = load_session(self.path)
+        except Exception as e:
+            self.sig_error.emit(f"Failed to open recording: {e}")
+            return
+        n_ch = raw.shape[1]
+        if n_ch not in (4, 6) or len(raw) == 0:
+            self.sig_error.emit(f"Unsupported recording: {n_ch} channels, {len(raw)} samples")
+            return
+
+        acq = AcquisitionPipeline(None, n_samples=self.n_samples, amp_hop=self.amp_hop)
+        acq.set_channels(n_ch)
+        self._inflight = threading.BoundedSemaphore(config.REPLAY_MAX_INFLIGHT)
+        self._running = True
+        label = "MAX" if self.speed <= 0 else f"{self.speed:g}x"
+        self.sig_status.emit(f"REPLAY CONNECTED: {os.path.basename(self.path)} ({label})")
+
+        self.last_amp = np.zeros(n_ch)
+        if self.ring is not None:
+            self.ring.reset(n_ch=n_ch)
+        self.sig_channel_detected.emit(n_ch)
+
+        rel = t_rec - t_rec[0]
+        n = len(rel)
+        t_start = time.perf_counter()
+        times = t_start + rel
+        pos = 0
+        stats_t, stats_pos = t_start, 0
+        try:
+            while self._running and pos < n:
+                if self.speed > 0:
+                    now_rec = (time.perf_counter() - t_start) * self.speed
+                    end = int(np.searchsorted(rel, now_rec, side="right"))
+                    if end <= pos:
+                        wait = (rel[pos] - now_rec) / self.speed
+                        time.sleep(min(max(wait, 0.0), config.SERIAL_LATENCY_BUDGET_MS / 1000.0))
+                        continue
+                else:
+                    end = min(n, pos + config.REPLAY_FAST_BLOCK)
+
+                samples = raw[pos:end]
+                filtered, amp_block = acq.process(samples, times[end - 1])
+                if not self._wait_slot():
+                    break
+                self._ingest(samples, filtered, amp_block, times[pos:end])
+                pos = end
+
+                now = time.perf_counter()
+                if now - stats_t >= config.SERIAL_STATS_INTERVAL:
+                    self.last_stats = self._stats(rel, pos, stats_pos, now - stats_t)
+                    self.sig_stats.emit(self.last_stats)
+                    stats_t, stats_pos = now, pos
+
+            elapsed = max(time.perf_counter() - t_start, 1e-9)
+            if pos >= n:
+                self.last_stats = self._stats(rel, pos, 0, elapsed)
+                self.sig_status.emit(
+                    f"REPLAY FINISHED: {pos / elapsed:.0f} samples/s ({self.last_stats['speed_actual']:.1f}x)"
+                )
+        except Exception as e:
+            if self._running: self.sig_error.emit(f"Replay error: {e}")
+        finally:
+            self._running = False
+            if pos < n:
+                self.sig_status.emit("DISCONNECTED")
+
+    # UI가 처리할 자리가 날 때까지 대기 (stop이면 False)
+    def _wait_slot(self):
+        while self._running:
+            if self._inflight.acquire(timeout=0.05):
+                return True
+        return False
+
+    # 구간 [pos0, pos)를 elapsed초에 재생한 통계
+    def _stats(self, rel, pos, pos0, elapsed):
+        span = rel[pos - 1] - rel[pos0] if pos > pos0 else 0.0
+        return {
+            "position_sec": float(rel[pos - 1]) if pos else 0.0,
+            "duration_sec": float(rel[-1]),
+            "samples_per_sec": (pos - pos0) / elapsed,
+            "speed_actual": float(span) / elapsed,
+        }
+
+    # SerialWorker._ingest와 같은 전송. 샘플 모드면 샘플마다 자리 하나 (첫 샘플은 _wait_slot에서 확보)
+    def _ingest(self, samples, filtered, amp_block, times):
+        self.last_amp = amp_block[-1]
+        if self.ring is not None:
+            self.ring.write(samples, filtered, times)
+        if self.block_mode:
+            self.sig_block.emit(samples, filtered, amp_block, times)
+        else:
+            for i, (raw_vals, amp_vals, t) in enumerate(zip(samples, amp_block, times)):
+                if i and not self._wait_slot():
+                    return
+                self.sig_sample.emit(raw_vals.tolist(), amp_vals, float(t))
@@ -0,0 +1,114 @@
+import threading
+
+import numpy as np
+
+
+# 수신 스레드(쓰기 1) ↔ GUI 렌더(읽기 1)가 공유하는 RAW 링 버퍼.
+# 워커가 블록을 미리 할당된 (n_ch, capacity) 배열에 바로 쓰고 ptr/count를 갱신,
+# 렌더는 프레임마다 snapshot()으로 (ptr, is_full, 배열, count, 필터 배열, 시각 배열)을 한 번에 가져간다.
+# with_filtered면 선필터(prefilter.py) 출력용 같은 모양의 두 번째 평면(filtered)을 함께 유지.
+# 선필터가 아직 설계되지 않은 블록(filtered=None)도 있으므로, snapshot은 링에 남은 샘플이 전부
+# 실제로 필터된 것일 때만 filtered 평면을 주고 아니면 None (소비자는 raw + 프레임별 필터로 폴백)
+# times는 샘플별 수신 시각(timebase.SampleClock, time.perf_counter 초)의 (capacity,) 평면
+# 잠금은 블록 복사·인덱스 갱신 동안만 잡으므로 샘플 수가 아니라 블록·프레임 수에 비례
+class SampleRing:
+
+    def __init__(self, n_ch, capacity, with_filtered=False):
+        self._lock = threading.Lock()
+        self.n_ch = int(n_ch)
+        self.capacity = int(capacity)
+        self.data = np.zeros((self.n_ch, self.capacity))
+        self.filtered = np.zeros((self.n_ch, self.capacity)) if with_filtered else None
+        self.times = np.zeros(self.capacity)
+        self.ptr = 0            # 다음에 쓸 인덱스
+        self.is_full = False    # 한 바퀴 이상 채워졌는지
+        self.count = 0          # START 이후 누적 기록 샘플 수
+        self.filtered_run = 0   # 가장 최근부터 연속으로 실제 필터 출력이 기록된 샘플 수
+        self.layout_version = 0  # reset·resize마다 증가 (렌더 캐시 무효화용)
+
+    # 데이터 비우기. n_ch를 주면 채널 수도 변경 (워커가 채널 감지 시 호출)
+    def reset(self, n_ch=None):
+        with self._lock:
+            if n_ch is not None and n_ch != self.n_ch:
+                self.n_ch = int(n_ch)
+                self.data = np.zeros((self.n_ch, self.capacity))
+                if self.filtered is not None:
+                    self.filtered = np.zeros((self.n_ch, self.capacity))
+            else:
+                self.data.fill(0)
+                if self.filtered is not None:
+                    self.filtered.fill(0)
+            self.times.fill(0)
+            self.ptr = 0
+            self.is_full = False
+            self.count = 0
+            self.filtered_run = 0
+            self.layout_version += 1
+
+    # (n, n_ch) 블록과 샘플별 시각 times (n,) 기록 (워커 스레드). 끝에서 잘리면 앞쪽으로 이어서 씀.
+    # filtered 평면이 있는데 filtered 블록이 없으면(선필터 꺼짐) raw를 그대로 기록. times가 없으면 NaN
+    def write(self, block, filtered=None, times=None):
+        n = len(block)
+        if n == 0:
+            return
+        with self._lock:
+            self._write_plane(self.data, block)
+            if self.filtered is not None:
+                self._write_plane(self.filtered, block if filtered is None else filtered)
+                self.filtered_run = 0 if filtered is None else self.filtered_run + n
+            self._write_plane(self.times[None, :], np.full((n, 1), np.nan) if times is None else np.asarray(times)[:, None])
+            L = self.capacity
+            if self.ptr + n >= L:
+                self.is_full = True
+            self.ptr = (self.ptr + n) % L
+            self.count += n
+
+    def _write_plane(self, plane, block):
+        n, L = len(block), self.capacity
+        src = block[-L:] if n > L else block
+        m = len(src)
+        start = (self.ptr + n - m) % L
+        first = min(m, L - start)
+        plane[:, start : start + first] = src[:first].T
+        if m > first:
+            plane[:, : m - first] = src[first:].T
+
+    # 렌더용 일관된 스냅샷: (ptr, is_full, data, count, filtered, times).
+    # 배열은 복사 없이 그대로 (filtered는 평면이 없거나 링에 필터 안 된 샘플이 남아 있으면 None)
+    def snapshot(self):
+        with self._lock:
+            filtered = self.filtered
+            if filtered is not None and self.filtered_run < (self.capacity if self.is_full else self.ptr):
+                filtered = None
+            return self.ptr, self.is_full, self.data, self.count, filtered, self.times
+
+    # 버퍼 길이를 new_len으로 조정, 최근 데이터만 유지 (GUI 스레드).
+    # 최근 take개는 원형 배열에서 많아야 두 구간 → 평면마다 연속 구간 복사 두 번으로 옮김
+    def resize(self, new_len):
+        new_len = int(new_len)
+        with self._lock:
+            old_len = self.capacity
+            avail = old_len if self.is_full else self.ptr
+            take = min(new_len, avail)
+            start = (self.ptr - take) % old_len
+            first = min(take, old_len - start)
+
+            def remap(plane, shape):
+                out = np.zeros(shape)
+                out[..., :first] = plane[..., start : start + first]
+                out[..., first:take] = plane[..., : take - first]
+                return out
+
+            self.data = remap(self.data, (self.n_ch, new_len))
+            if self.filtered is not None:
+                self.filtered = remap(self.filtered, (self.n_ch, new_len))
+            self.times = remap(self.times, new_len)
+            self.capacity = new_len
+            self.filtered_run = min(self.filtered_run, take)
+            if take >= new_len:
+                self.ptr = 0
+                self.is_full = True
+            else:
+                self.ptr = take
+                self.is_full = False
+            self.layout_version += 1
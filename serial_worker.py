@@ -7,6 +7,10 @@ from PyQt6.QtCore import QThread, pyqtSignal
 
 import config
 from config import BASE_SAMPLES, N_MULT_DEFAULT
+from binary_frame import FrameDecoder
+from emg_amp import StreamingPeakToPeak
+from prefilter import StreamingPrefilter
+from timebase import SampleClock
 
 # 한 줄 문자열에서 숫자 추출. 줄당 4개면 4ch, 6개면 6ch로 자동 감지
 def parse_line(line: str):
@@ -19,6 +23,105 @@ def parse_line(line: str):
     return ([float(v) for v in nums], n)
 
 
+# 벡터 파싱 대상 바이트: 숫자, 구분자(공백·탭·쉼표·세미콜론), 줄 끝(\r, \n)
+_FAST_LINE_BYTES = np.zeros(256, dtype=bool)
+_FAST_LINE_BYTES[list(b"0123456789 \t,;\r\n")] = True
+_POW10 = np.power(10.0, np.arange(309))
+
+
+# 완결된 줄들(마지막이 \n)로 된 바이트 덩어리를 (n, n_ch) 배열로 한 번에 변환.
+# 정수와 구분자로만 된 줄은 numpy로 일괄 처리하고, 그 외 문자가 섞인 줄만 parse_line으로 넘긴다.
+# n_ch가 None이면 첫 유효 줄(4개 또는 6개)로 채널 수를 정한다. 반환: (samples, n_ch)
+def parse_chunk(data: bytes, n_ch=None):
+    arr = np.frombuffer(data, dtype=np.uint8)
+    if arr.size == 0:
+        return np.empty((0, n_ch or 0)), n_ch
+    if arr[-1] != 10:
+        arr = np.append(arr, np.uint8(10))  # 마지막 줄도 닫힌 줄로 취급
+
+    nl = arr == 10
+    n_lines = int(np.count_nonzero(nl))
+    line_id = np.cumsum(nl) - nl  # 바이트별 줄 번호 (\n은 자기 줄에 포함)
+    bad = np.bincount(line_id[~_FAST_LINE_BYTES[arr]], minlength=n_lines) > 0
+
+    # 숫자 토큰: 연속된 숫자 구간. 토큰별 소속 줄과 값을 자리수 가중합으로 계산
+    is_digit = (arr >= 48) & (arr <= 57)
+    starts = is_digit.copy()
+    starts[1:] &= ~is_digit[:-1]
+    ends = is_digit.copy()
+    ends[:-1] &= ~is_digit[1:]
+    tok_line = line_id[starts]
+    counts = np.bincount(tok_line, minlength=n_lines)
+
+    digit_idx = np.flatnonzero(is_digit)
+    tok_of_digit = np.cumsum(starts)[digit_idx] - 1
+    power = np.flatnonzero(ends)[tok_of_digit] - digit_idx
+    values = np.bincount(
+        tok_of_digit,
+        weights=(arr[digit_idx] - 48) * _POW10[np.minimum(power, 308)],
+        minlength=tok_line.size,
+    )
+
+    # 소수점·부호 등 다른 문자가 있는 줄은 기존 규칙(parse_line) 그대로
+    fallback = {}
+    if bad.any():
+        nl_pos = np.flatnonzero(nl)
+        line_start = np.concatenate(([0], nl_pos[:-1] + 1))
+        for li in np.flatnonzero(bad):
+            s = bytes(arr[line_start[li] : nl_pos[li]]).decode(errors="ignore").strip()
+            parsed = parse_line(s)
+            if parsed is None:
+                counts[li] = 0
+                continue
+            fallback[li], counts[li] = parsed
+
+    if n_ch is None:
+        valid = np.flatnonzero((counts == 4) | (counts == 6))
+        if valid.size == 0:
+            return np.empty((0, 0)), None
+        n_ch = int(counts[valid[0]])
+
+    keep = counts == n_ch
+    keep_lines = np.flatnonzero(keep)
+    out = np.empty((keep_lines.size, n_ch))
+    fast_keep = keep & ~bad
+    rows = np.searchsorted(keep_lines, np.flatnonzero(fast_keep))
+    out[rows] = values[fast_keep[tok_line]].reshape(-1, n_ch)
+    for li, vals in fallback.items():
+        if len(vals) == n_ch:
+            out[np.searchsorted(keep_lines, li)] = vals
+    return out, n_ch
+
+
+# ASCII 줄 프로토콜 디코더. read()로 받은 바이트를 이어 붙여 완결된 줄만 parse_chunk로 변환,
+# 끝의 미완성 줄은 다음 decode로 이월 (FrameDecoder와 같은 인터페이스)
+class LineDecoder:
+
+    def __init__(self):
+        self._buf = bytearray()
+
+    def reset(self):
+        self._buf = bytearray()
+
+    def decode(self, data: bytes, n_ch=None):
+        self._buf.extend(data)
+        end = self._buf.rfind(b"\n")
+        if end < 0:
+            return np.empty((0, n_ch or 0)), n_ch
+        chunk = bytes(self._buf[: end + 1])
+        del self._buf[: end + 1]
+        return parse_chunk(chunk, n_ch)
+
+
+# 프로토콜 이름("ascii" / "binary") → 디코더 객체
+def make_decoder(protocol: str):
+    if protocol == "binary":
+        return FrameDecoder()
+    if protocol == "ascii":
+        return LineDecoder()
+    raise ValueError(f"Unknown serial protocol: {protocol}")
+
+
 # 진폭 계산 (채널 수는 sample_buf 행 길이에서 유추)
 def compute_amp_from_samples(sample_buf: deque):
     if not sample_buf or len(sample_buf) == 0:
@@ -27,39 +130,186 @@ def compute_amp_from_samples(sample_buf: deque):
     return np.max(pkt, axis=0) - np.min(pkt, axis=0)
 
 
-# 시리얼 수신, 파싱, 진폭 계산 전용 QThread. sig_sample(raw, amp)로 UI에 전송
+# 수신 루프 통계: 초당 read 횟수, read당 평균 바이트, read 대기(유휴) 시간 비율, 바이트 수신 속도
+class ReadStats:
+
+    def __init__(self):
+        self.byte_rate = 0.0  # bytes/s, 구간마다 갱신 (read 크기 결정에 사용)
+        self.reset()
+
+    def reset(self):
+        self._t0 = time.perf_counter()
+        self.reads = 0
+        self.bytes = 0
+        self.idle_sec = 0.0
+
+    def add(self, n_bytes: int, wait_sec: float):
+        self.reads += 1
+        self.bytes += n_bytes
+        self.idle_sec += wait_sec
+
+    def elapsed(self):
+        return time.perf_counter() - self._t0
+
+    # 현재 구간 통계를 dict로 돌려주고 새 구간 시작
+    def snapshot(self):
+        elapsed = max(self.elapsed(), 1e-9)
+        self.byte_rate = self.bytes / elapsed
+        stats = {
+            "reads_per_sec": self.reads / elapsed,
+            "avg_bytes_per_read": self.bytes / self.reads if self.reads else 0.0,
+            "idle_frac": min(self.idle_sec / elapsed, 1.0),
+            "bytes_per_sec": self.byte_rate,
+        }
+        self.reset()
+        return stats
+
+
+# Qt 없는 수신 파이프라인: 포트 열기, 블로킹 read, 디코딩, 채널 감지, 진폭 계산.
+# 스레드 워커(SerialWorker)와 별도 프로세스 수신(acq_process.py)이 같은 코드를 사용
+class AcquisitionPipeline:
+
+    def __init__(self, port, baud=115200, protocol="ascii", n_samples=None, amp_hop=0):
+        self.port = port
+        self.baud = baud
+        self.decoder = make_decoder(protocol)
+        self.n_samples = n_samples or int(BASE_SAMPLES * N_MULT_DEFAULT)
+        self.amp_hop = amp_hop
+        self.session_n_ch = None  # START 시점에 None, 첫 유효 줄에서 4 또는 6으로 설정
+        self.amp_est = StreamingPeakToPeak(config.N_CH, self.n_samples, self.amp_hop)
+        self.prefilter = StreamingPrefilter(config.N_CH) if config.PREFILTER_ENABLED else None
+        self.clock = SampleClock()
+
+        self.latency_budget = config.SERIAL_LATENCY_BUDGET_MS / 1000.0
+        self.read_timeout = config.SERIAL_READ_TIMEOUT_SEC
+        self.min_read = config.SERIAL_MIN_READ_BYTES
+        self.read_stats = ReadStats()
+        self.ser = None
+
+    # 포트 열기 (실패 시 예외). 반환: 포트 이름
+    def open(self):
+        self.ser = serial.Serial(self.port, self.baud, timeout=self.read_timeout)
+        self.ser.flushInput()
+        self.session_n_ch = None  # START 시점 리셋 → 첫 줄에서 4/6 자동 감지
+        self.decoder.reset()
+        self.clock.reset(time.perf_counter())
+        self.read_stats = ReadStats()
+        return self.ser.name
+
+    def is_open(self):
+        return self.ser is not None and self.ser.is_open
+
+    def close(self):
+        try:
+            if self.ser and self.ser.is_open:
+                self.ser.close()
+        except: pass
+        self.ser = None
+
+    # 한 번에 요청할 바이트 수: 지연 예산 동안 들어올 것으로 예상되는 양 (이미 쌓인 양보다 작지 않게)
+    def _read_size(self):
+        expected = int(self.read_stats.byte_rate * self.latency_budget)
+        return max(self.min_read, self.ser.in_waiting, expected)
+
+    # read 한 번 → (samples (n, n_ch), filtered (n, n_ch) 또는 None(선필터 꺼짐·아직 설계 전), amp_block (n, n_ch),
+    #               times (n,) 샘플별 단조 시계 시각(초, timebase.SampleClock), 새로 감지한 채널 수 또는 None)
+    def step(self):
+        # 블로킹 read: 요청 크기만큼 모이거나 timeout이 지나면 반환 (데이터 없으면 스레드는 대기)
+        t_wait = time.perf_counter()
+        data = self.ser.read(self._read_size())
+        t_read = time.perf_counter()  # 도착 시각: UI 전달 시점이 아니라 read가 돌아온 시점
+        self.read_stats.add(len(data), t_read - t_wait)
+
+        detected = None
+        if not data:
+            empty = np.empty((0, 0))
+            return empty, None if self.prefilter is None else empty, empty, np.empty(0), detected
+
+        # 완결된 줄/프레임만 한 번에 변환, 끝의 미완성 부분은 디코더가 다음 read로 이월
+        samples, n = self.decoder.decode(data, self.session_n_ch)
+        seq = getattr(self.decoder, "seq", None)  # 이진 프레임: 프레임별 장치 시퀀스 번호
+        if self.session_n_ch is None and n is not None:
+            # 첫 유효 줄/프레임: 채널 수 감지만 하고 이 샘플은 버림
+            self.set_channels(n)
+            detected = n
+            samples = samples[1:]
+            seq = None if seq is None else seq[1:]
+
+        times = self.clock.stamp(len(samples), t_read, seq)
+        filtered, amp_block = self.process(samples, t_read)
+        return samples, filtered, amp_block, times, detected
+
+    # 세션 채널 수 확정: 진폭 계산기·선필터를 n채널로 (replay.py는 녹화 채널 수로 직접 호출)
+    def set_channels(self, n):
+        self.session_n_ch = n
+        self.amp_est = StreamingPeakToPeak(n, self.n_samples, self.amp_hop)
+        if self.prefilter is not None:
+            self.prefilter.reset(n_ch=n)
+
+    # 디코딩된 (n, n_ch) 샘플 → (filtered 또는 None, amp_block): 선필터·진폭 계산 단계.
+    # t_read는 선필터 fs 측정용 시각(초)
+    def process(self, samples, t_read):
+        filtered = None
+        if self.prefilter is not None:
+            filtered = self.prefilter.process(samples, t_read)
+        if len(samples) == 0:
+            return filtered, samples
+        amp_src = filtered if (filtered is not None and config.PREFILTER_FOR_AMP) else samples
+        return filtered, self.amp_est.update(amp_src)
+
+    def stats_due(self):
+        return self.read_stats.elapsed() >= config.SERIAL_STATS_INTERVAL
+
+    # 현재 구간 수신 통계 (이진 프레임이면 누락·건너뛴 바이트 포함)
+    def take_stats(self):
+        stats = self.read_stats.snapshot()
+        dec = self.decoder
+        if hasattr(dec, "frames_dropped"):
+            stats["frames_dropped"] = dec.frames_dropped
+            stats["bytes_skipped"] = dec.bytes_skipped
+        return stats
+
+
+# 시리얼 수신, 파싱, 진폭 계산 전용 QThread. ring이 있으면 raw 샘플은 링 버퍼에 직접 기록.
+# 블록 모드면 read() 한 번에 파싱된 샘플을 sig_block 하나로, 아니면 sig_sample(raw, amp)로 한 줄씩 UI에 전송
 class SerialWorker(QThread):
-    sig_sample = pyqtSignal(list, object)  # (raw_vals, amp_vals)
+    sig_sample = pyqtSignal(list, object, float)  # (raw_vals, amp_vals, 샘플 시각)
+    # (raw (n, n_ch), filtered (n, n_ch) 또는 None, amp (n, n_ch), ts (n,) 샘플별 time.perf_counter() 초)
+    sig_block = pyqtSignal(object, object, object, object)
     sig_status = pyqtSignal(str)
     sig_error = pyqtSignal(str)
     sig_channel_detected = pyqtSignal(int)  # 줄 단위로 감지한 채널 수 (4 또는 6)
+    sig_stats = pyqtSignal(dict)  # 수신 루프 통계 (SERIAL_STATS_INTERVAL마다)
 
     def __init__(self):
         super().__init__()
         self._running = False
-        self._session_n_ch = None  # START 시점에 None, 첫 유효 줄에서 4 또는 6으로 설정
-
         self._port = None
         self._baud = 115200
-        self._ser = None
-        self._buf = bytearray()
+        self._acq = None
+        self.protocol = config.SERIAL_PROTOCOL
 
         self.n_samples = int(BASE_SAMPLES * config.N_MULT_DEFAULT)
-        self.sample_buf = deque(maxlen=self.n_samples)
-        self.calc_counter = 0
+        self.amp_hop = config.AMP_HOP_SAMPLES
         self.last_amp = np.zeros(config.N_CH)
+        self.block_mode = config.SERIAL_BLOCK_MODE
+        self.ring = None  # 공유 링 버퍼(SampleRing). 있으면 샘플을 직접 기록
+        self.last_stats = {}
+        self.stop_timeout_ms = 500  # stop 후 run이 끝날 때까지 GUI가 기다릴 시간 (read는 지연 예산마다 반환)
 
     # 설정 
-    def configure(self, port: str, baud: int, n_mult: int):
+    def configure(self, port: str, baud: int, n_mult: int, protocol=None):
         self._port = port
         self._baud = baud
+        if protocol is not None:
+            self.protocol = protocol
         self.update_params(n_mult)
 
-    # 진폭 계산 윈도우 크기 변경 
-    def update_params(self, n_mult):
+    # 진폭 계산 윈도우 크기·발행 간격 변경 (hop=None이면 기존 값 유지, 0이면 윈도우마다). 다음 START부터 적용
+    def update_params(self, n_mult, hop=None):
         self.n_samples = int(BASE_SAMPLES * n_mult)
-        self.sample_buf = deque(maxlen=self.n_samples)
-        self.calc_counter = 0
+        if hop is not None:
+            self.amp_hop = hop
 
     # 스레드 종료 요청 
     def stop(self):
@@ -72,76 +322,57 @@ class SerialWorker(QThread):
             self.sig_error.emit("No port selected.")
             return
 
+        acq = AcquisitionPipeline(self._port, self._baud, self.protocol, self.n_samples, self.amp_hop)
         try:
-            self._ser = serial.Serial(self._port, self._baud, timeout=0.1)
-            self._ser.flushInput()
+            name = acq.open()
         except Exception as e:
             self.sig_error.emit(f"Failed to open serial: {e}")
             return
+        self._acq = acq
 
         self._running = True
-        self._session_n_ch = None  # START 시점 리셋 → 첫 줄에서 4/6 자동 감지
-        self.sig_status.emit(f"CONNECTED: {self._ser.name}")
+        self.sig_status.emit(f"CONNECTED: {name}")
 
         try:
             while self._running:
-                if self._ser is None or not self._ser.is_open: break
-
-                if self._ser.in_waiting > 0:
-                    data = self._ser.read(self._ser.in_waiting)
-                    self._buf.extend(data)
-
-                    while b"\n" in self._buf:
-                        line, rest = self._buf.split(b"\n", 1)
-                        self._buf = bytearray(rest)
-
-                        try:
-                            s = line.decode(errors="ignore").strip()
-                            if not s: continue
-
-                            parsed = parse_line(s)
-                            if parsed is None: continue
-
-                            raw_vals, n = parsed
+                if not acq.is_open(): break
 
-                            if self._session_n_ch is None:
-                                # 첫 유효 줄: 채널 수 감지 후 시그널만 보내고 이 줄은 버림
-                                self._session_n_ch = n
-                                self.sample_buf = deque(maxlen=self.n_samples)
-                                self.last_amp = np.zeros(n)
-                                self.calc_counter = 0
-                                self.sig_channel_detected.emit(n)
-                                continue
+                samples, filtered, amp_block, times, detected = acq.step()
+                if detected is not None:
+                    # 채널 수 감지: 링 버퍼를 먼저 n채널로 바꾼 뒤 UI에 알림
+                    self.last_amp = np.zeros(detected)
+                    if self.ring is not None:
+                        self.ring.reset(n_ch=detected)
+                    self.sig_channel_detected.emit(detected)
 
-                            if n != self._session_n_ch:
-                                continue
+                if acq.stats_due():
+                    self.last_stats = acq.take_stats()
+                    self.sig_stats.emit(self.last_stats)
 
-                            self.sample_buf.append(raw_vals)
-                            self.calc_counter += 1
-                            if self.calc_counter >= self.n_samples:
-                                if len(self.sample_buf) >= self.n_samples:
-                                    amp = compute_amp_from_samples(self.sample_buf)
-                                    if amp is not None:
-                                        self.last_amp = amp
-                                self.calc_counter = 0
-
-                            self.sig_sample.emit(raw_vals, self.last_amp)
-
-                        except Exception:
-                            continue
-
-                time.sleep(0.001) 
+                if len(samples) > 0:
+                    self._ingest(samples, filtered, amp_block, times)
 
         except Exception as e:
             if self._running: self.sig_error.emit(f"Loop error: {e}")
         finally:
             self.cleanup()
 
+    # 파싱된 (n, n_ch) 샘플(·선필터 출력)과 진폭, 샘플별 시각을 링 버퍼·UI로 전송
+    def _ingest(self, samples, filtered, amp_block, times):
+        self.last_amp = amp_block[-1]
+        if self.ring is not None:
+            self.ring.write(samples, filtered, times)
+
+        if self.block_mode:
+            # 블록 모드: 이번 read()에서 나온 샘플을 한 번에 전송
+            self.sig_block.emit(samples, filtered, amp_block, times)
+        else:
+            for raw_vals, amp_vals, t in zip(samples, amp_block, times):
+                self.sig_sample.emit(raw_vals.tolist(), amp_vals, float(t))
+
     def cleanup(self):
         """포트 닫기, DISCONNECTED 시그널."""
-        try:
-            if self._ser and self._ser.is_open:
-                self._ser.close()
-        except: pass
-        self._ser = None
+        if self._acq is not None:
+            self._acq.close()
+        self._acq = None
         self.sig_status.emit("DISCONNECTED")
\ No newline at end of file
@@ -0,0 +1,204 @@
+import numpy as np
+
+import config
+
+try:
+    from scipy.signal import butter, filtfilt
+    _HAS_SCIPY = True
+except ImportError:
+    _HAS_SCIPY = False
+
+# 필터 차수 (시간 영역 선필터용)
+_FFT_FILTER_ORDER = 2
+
+
+# FFT_FILTER_OUT_RANGES 구간 제거용 Butterworth 계수 리스트 (fs마다 한 번 설계).
+# output="ba"면 [(b, a), ...], "sos"면 [sos 배열, ...] (수신 경로 선필터용)
+def design_filters(fs: float, filter_ranges: list, output: str = "ba") -> list:
+    if not _HAS_SCIPY or not filter_ranges:
+        return []
+    nyq = fs / 2.0
+    coeffs = []
+    for (low_hz, high_hz) in filter_ranges:
+        if high_hz <= 0 or high_hz >= nyq:
+            continue
+        try:
+            if low_hz <= 0 or low_hz < 1.0:
+                # 0~high_hz 제거 → 고역통과 (high_hz 위만 통과)
+                coeffs.append(butter(_FFT_FILTER_ORDER, high_hz, btype="high", fs=fs, output=output))
+            else:
+                # low_hz~high_hz 제거 → 밴드스탑
+                coeffs.append(butter(_FFT_FILTER_ORDER, [low_hz, high_hz], btype="bandstop", fs=fs, output=output))
+        except Exception:
+            continue
+    return coeffs
+
+
+# (n_ch, n) 샘플에 계수들을 차례로 zero-phase(filtfilt) 적용. 길이가 짧아 안 되는 필터는 건너뜀
+def apply_filters(x: np.ndarray, coeffs: list) -> np.ndarray:
+    if not coeffs or x.shape[-1] < 4:
+        return x
+    for b, a in coeffs:
+        try:
+            x = filtfilt(b, a, x, axis=-1)
+        except Exception:
+            continue
+    return x
+
+
+# FFT 뷰용 스펙트럼 계산기. (fs, n_fft)별 필터 계수·Hann 윈도우·주파수 축·표시 마스크를 캐시하고,
+# 전 채널을 (n_ch, n_fft) 한 번의 rfft(axis=1)로 계산. 링에 새 샘플이 없으면 이전 결과 재사용
+class SpectrumEngine:
+
+    def __init__(self):
+        self._const_key = None
+        self._coeffs = []
+        self._window = None
+        self._freqs = None
+        self._mask = None
+        self._kill = None
+        self._result_key = None
+        self._result = None
+
+    def _prepare(self, fs, n, max_freq, prefiltered):
+        key = (fs, n, max_freq, prefiltered)
+        if key == self._const_key:
+            return
+        self._const_key = key
+        use_filter = config.FFT_APPLY_FILTER and not prefiltered
+        self._coeffs = design_filters(fs, config.FFT_FILTER_OUT_RANGES) if use_filter else []
+        self._window = np.hanning(n)
+        freqs = np.fft.rfftfreq(n, 1.0 / fs)
+        self._mask = freqs <= max_freq
+        self._freqs = freqs[self._mask]
+        # scipy 없이 필터 켠 경우만 주파수 영역에서 구간 0으로 (폴백)
+        self._kill = None
+        if use_filter and not _HAS_SCIPY:
+            kill = np.zeros(len(self._freqs), dtype=bool)
+            for low_hz, high_hz in config.FFT_FILTER_OUT_RANGES:
+                kill |= (self._freqs >= low_hz) & (self._freqs <= high_hz)
+            self._kill = kill
+
+    # 링 스냅샷 → (freqs, mag) : mag는 (n_ch, len(freqs)) 샘플 수로 나눈 선형 진폭.
+    # 데이터 부족이면 None. (count, layout_version, fs, n_fft)가 같으면 이전 결과 그대로.
+    # prefiltered: data가 이미 수신 경로 선필터를 거친 평면이면 프레임별 filtfilt 생략.
+    # profiler(RenderProfiler)를 주면 샘플 모으기(fft.prep)·필터(fft.filter) 구간을 lap으로 기록
+    def compute(self, data, ptr, is_full, count, layout_version, fs, n_fft, max_freq, prefiltered=False,
+                profiler=None):
+        key = (count, layout_version, data.shape, ptr, fs, n_fft, max_freq, prefiltered)
+        if key == self._result_key:
+            return self._result
+        self._result_key = key
+        self._result = None
+
+        if ptr < 2:
+            return None
+        L = data.shape[1]
+        if is_full:
+            idx = (ptr - n_fft + np.arange(n_fft)) % L
+            samples = data[:, idx].astype(float)
+        else:
+            take = min(ptr, n_fft)
+            take = int(2 ** int(np.log2(max(2, take))))
+            samples = data[:, ptr - take : ptr].astype(float)
+        n = samples.shape[1]
+        if n < 2:
+            return None
+
+        self._prepare(fs, n, max_freq, prefiltered)
+        if profiler is not None:
+            profiler.lap("fft.prep")
+        samples = apply_filters(samples, self._coeffs)
+        if profiler is not None:
+            profiler.lap("fft.filter")
+
+        # DC 제거 + Hann 윈도우 후 전 채널 한 번에 FFT
+        samples = samples - samples.mean(axis=1, keepdims=True)
+        mag = np.abs(np.fft.rfft(samples * self._window, axis=1))[:, self._mask]
+        if self._kill is not None:
+            mag[:, self._kill] = 0.0
+        if mag.shape[1] == 0:
+            return None
+
+        self._result = (self._freqs, mag / (n + 1e-12))
+        return self._result
+
+
+# Spectrogram 뷰용 증분 STFT. 링의 누적 샘플 수(count)로 프레임 위치를 정해 hop마다 새로 끝난 프레임만
+# (n_ch, 새 프레임 수, n_fft) 한 번의 rfft로 계산하고, 고정 크기 이미지 링(채널 × 열 × 주파수 빈)에 열로 기록.
+# 이미지 링은 같은 열을 두 번(c, c + n_cols) 써 두어 image()가 복사 없이 오래된→최신 순 연속 뷰를 줌.
+# 링 히스토리보다 오래 밀린 프레임(뷰를 떠나 있던 동안)은 빈 열로 채워 시간 축을 유지
+class SpectrogramEngine:
+
+    def __init__(self, n_fft, hop, n_cols):
+        self.n_fft = int(n_fft)
+        self.hop = max(1, int(hop))
+        self.n_cols = int(n_cols)
+        self._window = np.hanning(self.n_fft)
+        self._coeffs_key = None
+        self._coeffs = []
+        self.n_bins = self.n_fft // 2 + 1  # 0 ~ fs/2
+        self.reset(0)
+
+    # 이미지 비우기 (채널 감지·START 후 링 reset 시)
+    def reset(self, n_ch):
+        self.n_ch = int(n_ch)
+        self.img = np.full((self.n_ch, 2 * self.n_cols, self.n_bins), config.SPEC_BLANK_DB, dtype=np.float32)
+        self.col = 0           # 다음에 쓸 열
+        self.next_end = None   # 다음 프레임이 끝나는 누적 샘플 위치 (첫 update에서 정함)
+        self.last_count = 0
+        self.version = 0       # 열이 기록될 때마다 증가 (그리기 생략 판단용)
+
+    # 채널별 (n_cols, n_bins) dB 이미지, 열은 오래된 → 최신 순 (복사 없는 뷰)
+    def image(self, ch):
+        return self.img[ch, self.col : self.col + self.n_cols]
+
+    def _write_columns(self, cols):
+        m = cols.shape[1]
+        if m >= self.n_cols:
+            cols, m = cols[:, -self.n_cols :], self.n_cols
+        idx = (self.col + np.arange(m)) % self.n_cols
+        self.img[:, idx] = cols
+        self.img[:, idx + self.n_cols] = cols
+        self.col = (self.col + m) % self.n_cols
+        self.version += 1
+
+    # 링 스냅샷에서 지난 호출 이후 끝난 STFT 프레임만 계산해 기록. 기록한 열 수 반환.
+    # fs는 필터 설계에만 쓰임(프레임·hop은 샘플 단위). prefiltered면 프레임별 filtfilt 생략
+    def update(self, data, ptr, is_full, count, fs, prefiltered=False):
+        n_ch, L = data.shape
+        if n_ch != self.n_ch or count < self.last_count:
+            self.reset(n_ch)  # 채널 수 변경 또는 링 reset(count 감소)
+        self.last_count = count
+        if self.next_end is None:
+            self.next_end = max(self.n_fft, count - (count % self.hop))
+        if count < self.next_end:
+            return 0
+
+        n_frames = (count - self.next_end) // self.hop + 1
+        ends = self.next_end + self.hop * np.arange(n_frames)
+        self.next_end = int(ends[-1]) + self.hop
+
+        # 링에 남아 있는 프레임만 계산, 그보다 오래된 프레임 자리는 빈 열
+        avail = min(count, L if is_full else ptr)
+        ok = count - (ends - self.n_fft) <= avail
+        n_blank = int(n_frames - np.count_nonzero(ok))
+        ends = ends[ok][-self.n_cols :]
+        if n_blank:
+            self._write_columns(np.full((n_ch, min(n_blank, self.n_cols), self.n_bins), config.SPEC_BLANK_DB, dtype=np.float32))
+        if len(ends) == 0:
+            return min(n_blank, self.n_cols)
+
+        # (n_frames, n_fft) 링 인덱스 → (n_ch, n_frames, n_fft) 프레임 묶음
+        idx = (ptr - (count - (ends[:, None] - self.n_fft + np.arange(self.n_fft)))) % L
+        frames = data[:, idx].astype(float)
+        key = (fs, prefiltered)
+        if key != self._coeffs_key:
+            self._coeffs_key = key
+            use_filter = config.FFT_APPLY_FILTER and not prefiltered
+            self._coeffs = design_filters(fs, config.FFT_FILTER_OUT_RANGES) if use_filter else []
+        frames = apply_filters(frames, self._coeffs)
+        frames = frames - frames.mean(axis=-1, keepdims=True)
+        mag = np.abs(np.fft.rfft(frames * self._window, axis=-1)) / self.n_fft
+        self._write_columns((20.0 * np.log10(mag + 1e-12)).astype(np.float32))
+        return min(n_blank + len(ends), self.n_cols)
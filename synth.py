@@ -0,0 +1,280 @@
+import argparse
+import errno
+import os
+import sys
+import time
+
+import numpy as np
+
+from binary_frame import encode_frames
+
+try:
+    from scipy.signal import butter, sosfilt
+    _HAS_SCIPY = True
+except ImportError:
+    _HAS_SCIPY = False
+
+# 합성 신호 모양 (값은 raw 단위, 10비트 ADC 기준)
+_BASELINE = 512.0
+_NOISE_AMP = 3.0                # 상시 배경 잡음 표준편차
+_BURST_AMP = (60.0, 220.0)      # 수축 구간 EMG 표준편차 범위
+_BURST_BAND_HZ = (20.0, 450.0)  # EMG 대역 (fs/2를 넘으면 0.45·fs로 자름)
+_BURST_ON_SEC = (0.3, 1.5)
+_BURST_OFF_SEC = (0.4, 2.0)
+_MAINS_HZ = 60.0
+_MAINS_AMP = 6.0
+_WANDER_HZ = 0.25               # 기저선 흔들림 (호흡·움직임)
+_WANDER_AMP = 25.0
+_DROPOUT_PER_SEC = 0.05         # 채널당 초당 전극 떨어짐 확률 (구간 동안 0 = 신호 없음)
+_DROPOUT_SEC = (0.05, 0.5)
+_TICK_SEC = 0.005               # 루프백 기록 주기
+_CLEAN_LEAD = 256               # 스트림 앞부분 깨짐 주입 제외 샘플 수 (채널 수 감지가 첫 유효 줄을 쓰므로)
+
+
+# EMG 비슷한 합성 신호 생성기. 채널마다 수축 구간(대역 제한 잡음 × 반 사인 포락선)과 휴지 구간이 번갈아 오고,
+# 배경 잡음·mains hum·기저선 흔들림·전극 떨어짐(0) 구간을 더한다. 필터 상태·구간 상태를 블록 간 이월하므로
+# generate(n)을 여러 번 불러도 한 번에 만든 것과 같은 연속 신호. set_rate로 도중에 fs 변경 가능
+class EMGSynth:
+
+    def __init__(self, n_ch, fs, seed=None):
+        self.n_ch = int(n_ch)
+        self.rng = np.random.default_rng(seed)
+        self.t = 0.0
+        self.mains_phase = self.rng.uniform(0, 2 * np.pi, self.n_ch)
+        self.wander_phase = self.rng.uniform(0, 2 * np.pi, self.n_ch)
+        # 채널별 구간 상태: 수축 여부·구간 길이·진행 위치·진폭, 떨어짐 남은 샘플
+        self.burst_on = np.zeros(self.n_ch, dtype=bool)
+        self.seg_len = np.zeros(self.n_ch, dtype=np.int64)
+        self.seg_pos = np.zeros(self.n_ch, dtype=np.int64)
+        self.burst_amp = np.zeros(self.n_ch)
+        self.drop_left = np.zeros(self.n_ch, dtype=np.int64)
+        self.fs = None
+        self._design_fs = None
+        self._sos = None
+        self._zi = None
+        self.set_rate(fs)
+
+    # 샘플 레이트 변경 (구간 상태는 유지). 대역 필터는 설계 fs와 1% 넘게 다를 때만 다시 설계 (램프 중 매 틱 설계 방지)
+    def set_rate(self, fs):
+        self.fs = float(fs)
+        if self._design_fs is not None and abs(self.fs / self._design_fs - 1.0) < 0.01:
+            return
+        self._design_fs = self.fs
+        self._sos = None
+        if _HAS_SCIPY:
+            high = min(_BURST_BAND_HZ[1], 0.45 * self.fs)
+            if high > _BURST_BAND_HZ[0]:
+                self._sos = butter(4, [_BURST_BAND_HZ[0], high], btype="band", fs=self.fs, output="sos")
+                # 통과 대역 비율만큼 줄어드는 분산을 되돌려 출력 분산 ≈ 1
+                self._gain = 1.0 / np.sqrt((high - _BURST_BAND_HZ[0]) / (self.fs / 2.0))
+                if self._zi is None or self._zi.shape[0] != len(self._sos):
+                    self._zi = np.zeros((len(self._sos), 2, self.n_ch))
+
+    # 대역 제한 잡음 (n, n_ch), 분산 1 근처. scipy가 없으면 백색 잡음
+    def _band_noise(self, n):
+        w = self.rng.standard_normal((n, self.n_ch))
+        if self._sos is None:
+            return w
+        out, self._zi = sosfilt(self._sos, w, axis=0, zi=self._zi)
+        return out * self._gain
+
+    # 채널 ch의 수축 포락선 (n,): 구간이 끝나면 새 구간 길이·진폭을 뽑음
+    def _envelope(self, ch, n):
+        env = np.zeros(n)
+        i = 0
+        while i < n:
+            if self.seg_pos[ch] >= self.seg_len[ch]:
+                self.burst_on[ch] = not self.burst_on[ch]
+                lo, hi = _BURST_ON_SEC if self.burst_on[ch] else _BURST_OFF_SEC
+                self.seg_len[ch] = max(1, int(self.rng.uniform(lo, hi) * self.fs))
+                self.seg_pos[ch] = 0
+                self.burst_amp[ch] = self.rng.uniform(*_BURST_AMP)
+            take = min(n - i, self.seg_len[ch] - self.seg_pos[ch])
+            if self.burst_on[ch]:
+                u = (self.seg_pos[ch] + np.arange(take)) / self.seg_len[ch]
+                env[i : i + take] = self.burst_amp[ch] * np.sin(np.pi * u)
+            self.seg_pos[ch] += take
+            i += take
+        return env
+
+    # 채널 ch의 전극 떨어짐 마스크 (n,) True = 신호 없음
+    def _dropouts(self, ch, n):
+        mask = np.zeros(n, dtype=bool)
+        i = 0
+        while i < n:
+            if self.drop_left[ch] > 0:
+                take = min(n - i, self.drop_left[ch])
+                mask[i : i + take] = True
+                self.drop_left[ch] -= take
+                i += take
+                continue
+            # 다음 떨어짐까지 샘플 수 (기하 분포)
+            p = _DROPOUT_PER_SEC / self.fs
+            gap = int(self.rng.geometric(p)) if p > 0 else n
+            if gap >= n - i:
+                break
+            i += gap
+            self.drop_left[ch] = max(1, int(self.rng.uniform(*_DROPOUT_SEC) * self.fs))
+        return mask
+
+    # 다음 n개 샘플 (n, n_ch) 실수 raw 값
+    def generate(self, n):
+        n = int(n)
+        t = self.t + np.arange(n)[:, None] / self.fs
+        self.t += n / self.fs
+        env = np.column_stack([self._envelope(ch, n) for ch in range(self.n_ch)]) if n else np.zeros((0, self.n_ch))
+        x = (
+            _BASELINE
+            + _WANDER_AMP * np.sin(2 * np.pi * _WANDER_HZ * t + self.wander_phase)
+            + _MAINS_AMP * np.sin(2 * np.pi * _MAINS_HZ * t + self.mains_phase)
+            + _NOISE_AMP * self.rng.standard_normal((n, self.n_ch))
+            + env * self._band_noise(n)
+        )
+        x = np.clip(x, 0.0, 1023.0)
+        for ch in range(self.n_ch):
+            x[self._dropouts(ch, n), ch] = 0.0
+        return x
+
+
+# (n, n_ch) 샘플 → parse_line 형식 ASCII 줄 ("123 456 789 12\n"). bad_rate 비율의 줄은 잘리거나(숫자 부족),
+# 숫자가 하나 더 붙거나, 깨진 바이트로 바뀜 → 파서는 버려야 함
+def encode_ascii(samples, bad_rate=0.0, rng=None):
+    lines = [" ".join(map(str, row)) for row in np.rint(samples).astype(np.int64).tolist()]
+    if bad_rate > 0 and lines:
+        rng = rng or np.random.default_rng()
+        for i in np.flatnonzero(rng.random(len(lines)) < bad_rate):
+            kind = rng.integers(3)
+            if kind == 0:
+                lines[i] = lines[i][: len(lines[i]) // 2].rstrip()
+            elif kind == 1:
+                lines[i] += " 0"
+            else:
+                lines[i] = "\x00\xff#ERR" + lines[i][:3]
+    return ("\n".join(lines) + "\n").encode("latin-1") if lines else b""
+
+
+# (n, n_ch) 샘플 → 이진 프레임. bad_rate 비율의 프레임은 바이트 하나를 뒤집어(CRC 불일치) 디코더가 버리게 함
+def encode_binary(samples, seq_start=0, bad_rate=0.0, rng=None):
+    data = encode_frames(samples, seq_start)
+    if bad_rate > 0 and len(samples):
+        rng = rng or np.random.default_rng()
+        size = len(data) // len(samples)
+        buf = np.frombuffer(data, dtype=np.uint8).copy()
+        bad = np.flatnonzero(rng.random(len(samples)) < bad_rate)
+        buf[bad * size + rng.integers(2, size, len(bad))] ^= 0x5A
+        data = buf.tobytes()
+    return data
+
+
+# 시간에 따른 목표 샘플 레이트. steps가 있으면 [(rate, sec), ...]를 차례로 (마지막 값 유지),
+# 아니면 rate에서 ramp_to까지 ramp_sec 동안 선형 증가
+def rate_profile(rate, ramp_to=None, ramp_sec=0.0, steps=None):
+    if steps:
+        bounds = np.cumsum([sec for _, sec in steps])
+        rates = [r for r, _ in steps]
+        return lambda el: rates[min(int(np.searchsorted(bounds, el, side="right")), len(rates) - 1)]
+    if ramp_to is None or ramp_sec <= 0:
+        return lambda el: rate
+    return lambda el: rate + (ramp_to - rate) * min(el / ramp_sec, 1.0)
+
+
+# pty 쌍 열기 → (master fd, slave 장치 경로). slave는 raw 모드, master 쓰기는 논블로킹
+# (SerialWorker/pyserial이 slave 경로를 실제 포트처럼 연다)
+def open_loopback():
+    import tty
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    os.set_blocking(master, False)
+    return master, slave, os.ttyname(slave)
+
+
+# 루프백 송신 루프: 목표 레이트로 샘플을 만들어 pty master에 기록. 읽는 쪽이 못 따라와 pty 버퍼가 차면
+# 실제 장치 UART처럼 그 블록을 버리고 overrun으로 집계 (이진이면 seq도 건너뜀 → 디코더 누락 집계).
+# 초마다 목표·실제 레이트, 바이트 속도, overrun 샘플 수를 출력 → 단계별 포화 지점 확인용
+def run_loopback(master, synth, protocol, profile, duration=None, bad_rate=0.0, out=sys.stdout):
+    rng = np.random.default_rng()
+    t0 = last = report_t = time.perf_counter()
+    due = 0.0
+    seq = sent = overrun = 0
+    pending = b""
+    rep_sent = rep_bytes = rep_over = 0
+    while duration is None or last - t0 < duration:
+        time.sleep(_TICK_SEC)
+        now = time.perf_counter()
+        rate = profile(now - t0)
+        synth.set_rate(rate)
+        due += rate * (now - last)
+        last = now
+        n = int(due) - (sent + overrun)
+        if n > 0:
+            block = synth.generate(n)
+            bad = bad_rate if seq >= _CLEAN_LEAD else 0.0
+            data = encode_binary(block, seq, bad, rng) if protocol == "binary" else encode_ascii(block, bad, rng)
+            seq += n
+            if pending:
+                overrun += n  # 이전 블록도 다 못 보냄 → 이번 블록은 장치 버퍼 넘침
+                rep_over += n
+            else:
+                pending = data
+                sent += n
+                rep_sent += n
+        if pending:
+            try:
+                k = os.write(master, pending)
+                pending = pending[k:]
+                rep_bytes += k
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                if e.errno != errno.EIO:  # EIO: 읽는 쪽이 아직 안 열림
+                    raise
+        if now - report_t >= 1.0:
+            el = now - report_t
+            print(f"target {rate:8.0f} Hz | sent {rep_sent / el:8.0f} Hz | {rep_bytes / el / 1024:7.1f} KiB/s "
+                  f"| overrun {rep_over}", file=out, flush=True)
+            report_t, rep_sent, rep_bytes, rep_over = now, 0, 0, 0
+    return sent, overrun
+
+
+def _parse_steps(text):
+    steps = []
+    for part in text.split(","):
+        rate, sec = part.split(":")
+        steps.append((float(rate), float(sec)))
+    return steps
+
+
+# python synth.py --channels 6 --rate 10000 [--protocol binary] [--ramp-to 20000 --ramp-sec 60]
+#                 [--steps 1000:10,5000:10,10000:10] [--bad-rate 0.001] [--link /tmp/emg0] [--duration 60]
+# → 출력된 pty 경로(또는 --link)를 대시보드 포트 목록에 직접 입력해 START
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Synthetic EMG source on a pseudo-terminal")
+    ap.add_argument("--channels", type=int, default=6, choices=(4, 6))
+    ap.add_argument("--rate", type=float, default=1000.0, help="samples/s per channel")
+    ap.add_argument("--protocol", choices=("ascii", "binary"), default="ascii")
+    ap.add_argument("--ramp-to", type=float, default=None, help="ramp the rate linearly to this value")
+    ap.add_argument("--ramp-sec", type=float, default=0.0)
+    ap.add_argument("--steps", type=_parse_steps, default=None, help="rate:sec,rate:sec,... (overrides ramp)")
+    ap.add_argument("--bad-rate", type=float, default=0.0, help="fraction of malformed lines/frames")
+    ap.add_argument("--duration", type=float, default=None)
+    ap.add_argument("--seed", type=int, default=None)
+    ap.add_argument("--link", default=None, help="create a symlink to the pty at this path")
+    args = ap.parse_args()
+
+    master, slave, name = open_loopback()
+    if args.link:
+        if os.path.lexists(args.link):
+            os.remove(args.link)
+        os.symlink(name, args.link)
+    print(f"pty: {args.link or name} ({args.channels} ch, {args.protocol})", flush=True)
+    synth = EMGSynth(args.channels, args.rate, args.seed)
+    try:
+        run_loopback(master, synth, args.protocol, rate_profile(args.rate, args.ramp_to, args.ramp_sec, args.steps),
+                     args.duration, args.bad_rate)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.link and os.path.islink(args.link):
+            os.remove(args.link)
+        os.close(master)
+        os.close(slave)
@@ -0,0 +1,121 @@
+import threading
+
+import numpy as np
+import pytest
+
+from acq_process import SharedSampleRing, _HDR_COUNT, _HDR_WSTART, _RAW, _AMP
+
+
+# 절대 위치 a..b−1 행: raw 전 채널·amp·시각이 모두 행 번호 → 찢긴 행은 값이 섞여 드러남
+def _block(a, b, n_ch=4):
+    v = np.arange(a, b, dtype=float)
+    samples = np.repeat(v[:, None], n_ch, axis=1)
+    return samples, None, samples.copy(), v
+
+
+@pytest.fixture
+def ring():
+    r = SharedSampleRing.create(64)
+    r.set_n_ch(4)
+    yield r
+    r.close(unlink=True)
+
+
+def _assert_consistent(raw, amp, ts):
+    assert np.all(raw == raw[:, :1])
+    assert np.array_equal(raw[:, 0], amp[:, 0])
+    assert np.array_equal(raw[:, 0], ts)
+    assert np.all(np.diff(ts) == 1)
+
+
+def test_read_new_returns_published_rows(ring):
+    ring.write(*_block(0, 10))
+    raw, filtered, amp, ts = ring.read_new()
+    assert filtered is None
+    assert np.array_equal(ts, np.arange(10))
+    _assert_consistent(raw, amp, ts)
+    assert ring.read_new() is None
+    assert ring.lost == 0
+
+
+def test_reader_lapped_while_idle_counts_lost(ring):
+    for a in range(0, 150, 50):
+        ring.write(*_block(a, a + 50))  # 읽기 전에 한 바퀴 넘게 앞섬
+    raw, _, amp, ts = ring.read_new()
+    assert np.array_equal(ts, np.arange(150 - 64, 150))
+    _assert_consistent(raw, amp, ts)
+    assert ring.lost == 150 - 64
+
+
+# 복사 직후, 쓰는 쪽이 발행 전 배치로 읽은 행의 앞부분을 덮어쓰고 있는 상태 (count는 그대로)
+def test_unpublished_batch_rows_are_dropped(ring, monkeypatch):
+    ring.write(*_block(0, 64))  # 가득 참, 읽는 쪽은 0부터
+    real_rows = ring.rows
+
+    class _Racing:
+        # 읽는 쪽의 fancy index 복사가 끝난 순간 쓰는 쪽이 다음 배치 10행을 덮어쓰기 시작
+        def __getitem__(self, idx):
+            copied = real_rows[idx]
+            ring.header[_HDR_WSTART] = 64 + 10
+            real_rows[np.arange(64, 74) % 64, _RAW:_RAW + 4] = -1.0
+            return copied
+
+    monkeypatch.setattr(ring, "rows", _Racing())
+    raw, _, amp, ts = ring.read_new()
+    assert int(ring.header[_HDR_COUNT]) == 64  # 아직 발행 안 됨
+    assert np.array_equal(ts, np.arange(10, 64))
+    assert ring.lost == 10
+    assert ring.read_pos == 64
+
+
+# 빠른 쓰는 쪽이 느린 읽는 쪽을 계속 따라잡는 상황: 돌려받은 행은 모두 온전해야 하고,
+# 받은 행 + lost = 기록한 행
+def test_writer_lapping_slow_reader_never_returns_torn_rows():
+    ring = SharedSampleRing.create(32)
+    ring.set_n_ch(4)
+    total = 40000
+    done = threading.Event()
+
+    def writer():
+        pos = 0
+        rng = np.random.default_rng(0)
+        while pos < total:
+            n = int(rng.integers(1, 24))
+            n = min(n, total - pos)
+            ring.write(*_block(pos, pos + n))
+            pos += n
+        done.set()
+
+    got = 0
+    last = -1
+    t = threading.Thread(target=writer)
+    t.start()
+    try:
+        while True:
+            finished = done.is_set()
+            out = ring.read_new()
+            if out is not None:
+                raw, _, amp, ts = out
+                _assert_consistent(raw, amp, ts)
+                assert ts[0] > last
+                last = ts[-1]
+                got += len(ts)
+            elif finished:
+                break
+    finally:
+        t.join()
+        ring.close(unlink=True)
+    assert last == total - 1
+    assert got + ring.lost == total
+
+
+# 선필터 설계 전 블록(filtered=None)이 섞인 배치는 filtered 없이 전달
+def test_filtered_rows_only_when_every_row_is_filtered(ring):
+    for a, b, filt in ((0, 10, False), (10, 20, True)):
+        samples, _, amp, ts = _block(a, b)
+        ring.write(samples, samples + 0.5 if filt else None, amp, ts)
+    assert ring.read_new()[1] is None
+    samples, _, amp, ts = _block(20, 30)
+    ring.write(samples, samples + 0.5, amp, ts)
+    raw, filtered, _, _ = ring.read_new()
+    np.testing.assert_array_equal(filtered, raw + 0.5)
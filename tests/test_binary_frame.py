@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from binary_frame import FrameDecoder, SEQ_MOD, _crc16_bytewise, crc16_rows, encode_frames, frame_size
+
+
+def _samples(n, n_ch, seed=0):
+    return np.random.default_rng(seed).integers(-2000, 2000, size=(n, n_ch))
+
+
+# 위치별 표 CRC = 바이트 순서 CRC, 표준 검사값 "123456789" → 0x29B1
+@pytest.mark.parametrize("m", [9, 10, 14])
+def test_crc16_rows_matches_bytewise(m):
+    rows = np.random.default_rng(m).integers(0, 256, size=(500, m)).astype(np.uint8)
+    np.testing.assert_array_equal(crc16_rows(rows), _crc16_bytewise(rows, 0xFFFF))
+    assert int(crc16_rows(np.frombuffer(b"123456789", dtype=np.uint8)[None, :])[0]) == 0x29B1
+
+
+@pytest.mark.parametrize("n_ch", [4, 6])
+def test_round_trip_detects_channel_count(n_ch):
+    x = _samples(200, n_ch)
+    data = encode_frames(x)
+    assert len(data) == 200 * frame_size(n_ch)
+    dec = FrameDecoder()
+    out, n = dec.decode(data)
+    assert n == n_ch
+    np.testing.assert_array_equal(out, x)
+    assert dec.frames_ok == 200 and dec.frames_dropped == 0 and dec.bytes_skipped == 0
+
+
+# read 경계가 프레임 중간이어도 이어 붙여 같은 결과
+def test_partial_frames_carry_over():
+    x = _samples(300, 4, seed=1)
+    data = encode_frames(x)
+    dec = FrameDecoder()
+    rows, n_ch = [], None
+    for a in range(0, len(data), 19):
+        out, n_ch = dec.decode(data[a:a + 19], n_ch)
+        rows.append(out)
+    np.testing.assert_array_equal(np.concatenate(rows), x)
+    assert dec.frames_dropped == 0
+
+
+# 채널 수 감지에는 6ch 프레임 길이만큼 필요 → 그 전에는 아무것도 내보내지 않고 기다림
+def test_detection_waits_for_enough_bytes():
+    data = encode_frames(_samples(1, 4))
+    dec = FrameDecoder()
+    out, n = dec.decode(data)
+    assert n is None and len(out) == 0
+    out, n = dec.decode(encode_frames(_samples(1, 4, seed=9), seq_start=1))
+    assert n == 4 and len(out) == 2
+
+
+def test_resync_after_leading_garbage():
+    x = _samples(50, 4, seed=2)
+    junk = b"\x00\xa5\x13\x5a\xff\xa5\x5a\x01\x02"  # 가짜 동기 헤더 포함
+    dec = FrameDecoder()
+    out, n = dec.decode(junk + encode_frames(x))
+    assert n == 4
+    np.testing.assert_array_equal(out, x)
+    assert dec.bytes_skipped == len(junk)
+
+
+# CRC가 깨진 프레임은 버리고 다음 프레임에서 재동기화, 시퀀스 차이로 누락 집계
+def test_resync_after_crc_error():
+    x = _samples(100, 6, seed=3)
+    data = bytearray(encode_frames(x))
+    size = frame_size(6)
+    data[40 * size + 6] ^= 0xFF  # 프레임 40의 채널 값 손상
+    dec = FrameDecoder()
+    out, n = dec.decode(bytes(data), 6)
+    np.testing.assert_array_equal(out, np.delete(x, 40, axis=0))
+    assert dec.frames_ok == 99
+    assert dec.frames_dropped == 1
+    assert dec.bytes_skipped == size
+
+
+def test_dropped_frames_across_calls_and_seq_wrap():
+    x = _samples(20, 4, seed=4)
+    dec = FrameDecoder()
+    dec.decode(encode_frames(x[:10], seq_start=SEQ_MOD - 5), 4)
+    out, _ = dec.decode(encode_frames(x[13:], seq_start=(SEQ_MOD - 5 + 13) % SEQ_MOD), 4)
+    np.testing.assert_array_equal(out, x[13:])
+    assert dec.frames_dropped == 3
+    assert dec.seq[0] == 8
+
+
+def test_values_clip_to_int16():
+    out, _ = FrameDecoder().decode(encode_frames(np.array([[40000, -40000, 1.4, -1.6]])), 4)
+    np.testing.assert_array_equal(out, [[32767, -32768, 1, -2]])
@@ -0,0 +1,50 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from emg_amp import StreamingPeakToPeak
+from serial_worker import compute_amp_from_samples
+
+
+# 기준 구현: 최근 window 샘플 deque에 compute_amp_from_samples, hop마다 발행
+def _reference(x, window, hop):
+    buf = deque(maxlen=window)
+    last = np.zeros(x.shape[1])
+    out = np.empty_like(x, dtype=float)
+    for i, row in enumerate(x):
+        buf.append(row)
+        c = i + 1
+        if c % hop == 0 and c >= window:
+            last = compute_amp_from_samples(buf)
+        out[i] = last
+    return out
+
+
+@pytest.mark.parametrize("window,hop,block", [
+    (50, None, 7),
+    (50, 10, 7),
+    (64, 1, 64),
+    (30, 45, 100),
+    (1, 1, 5),
+    (10, 10, 500),
+    (16, 7, 33),
+    (20, 3, 1),
+    (16, 2, 50),
+    (100, 3, 250),
+])
+def test_matches_window_recompute(window, hop, block):
+    x = np.random.default_rng(window).integers(0, 1024, size=(1000, 4)).astype(float)
+    est = StreamingPeakToPeak(4, window, hop)
+    got = np.concatenate([est.update(x[a:a + block]) for a in range(0, len(x), block)])
+    np.testing.assert_array_equal(got, _reference(x, window, hop or window))
+    np.testing.assert_array_equal(est.last_amp, got[-1])
+
+
+def test_reset_forgets_history():
+    est = StreamingPeakToPeak(2, 10, 5)
+    est.update(np.full((30, 2), 1000.0))
+    est.reset()
+    out = est.update(np.tile([[1.0, 2.0], [3.0, 7.0]], (5, 1)))
+    np.testing.assert_array_equal(out[:9], 0)
+    np.testing.assert_array_equal(out[9], [2.0, 5.0])
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from emg_scale import ChannelScaler, EMGScaleManager
+
+
+# 0(임계값 이하) 샘플, 범위 확장·수축이 섞인 신호
+def _signal(n, n_ch, seed):
+    rng = np.random.default_rng(seed)
+    x = 512 + np.cumsum(rng.normal(0, 20, size=(n, n_ch)), axis=0)
+    x[rng.random((n, n_ch)) < 0.05] = 0
+    return x
+
+
+@pytest.mark.parametrize("decay", [0.000001, 0.01])
+@pytest.mark.parametrize("block", [1, 37, 500, 700, 2000])
+def test_update_block_matches_per_sample_scaler(decay, block):
+    x = _signal(2000, 4, seed=block)
+    mgr = EMGScaleManager(4)
+    mgr.decay_alpha = decay
+    refs = [ChannelScaler() for _ in range(4)]
+    for r in refs:
+        r.decay_alpha = decay
+    for a in range(0, len(x), block):
+        mgr.update_block(x[a:a + block])
+    for i, r in enumerate(refs):
+        for v in x[:, i]:
+            r.update(float(v))
+        assert mgr.has_data[i] == r.has_data
+        np.testing.assert_allclose(
+            [mgr.current_min[i], mgr.current_max[i], mgr.baseline[i]],
+            [r.current_min, r.current_max, r.baseline], rtol=1e-9,
+        )
+
+
+def test_update_block_bumps_version_only_on_valid_samples():
+    mgr = EMGScaleManager(2)
+    version = mgr.version
+    mgr.update_block(np.zeros((10, 2)))
+    assert mgr.version == version and not mgr.has_data.any()
+    mgr.update_block(np.full((10, 2), 300.0))
+    assert mgr.version > version
+    assert mgr.current_max[0] == 300.0
+
+
+# 지역 변수 루프는 update를 샘플마다 부른 것과 비트 단위로 같음
+def test_channel_update_block_matches_update_exactly():
+    x = _signal(3000, 1, seed=7)[:, 0]
+    a, b = ChannelScaler(), ChannelScaler()
+    a.decay_alpha = b.decay_alpha = 0.01
+    a.update_block(x.tolist())
+    for v in x:
+        b.update(float(v))
+    assert (a.current_min, a.current_max, a.baseline, a.has_data) == \
+        (b.current_min, b.current_max, b.baseline, b.has_data)
+
+
+# 샘플 단위 경로(scalers[i].update)의 변화도 다음 snapshot에 반영
+def test_snapshot_picks_up_per_sample_updates():
+    mgr = EMGScaleManager(2)
+    snap = mgr.snapshot()
+    assert mgr.snapshot() is snap
+    mgr.scalers[1].update(500.0)
+    new = mgr.snapshot()
+    assert new is not snap and new.version > snap.version
+    assert mgr.current_max[1] == 500.0 and mgr.has_data[1]
+    mgr.update_block(np.full((300, 2), 700.0))
+    assert mgr.scalers[0].current_max == 700.0
+    assert mgr.snapshot().current_max[0] == 700.0
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+import config
+import lod
+from emg_scale import EMGScaleManager
+from graph_render import CHUNK_SIZE, FillBarCache, LineTraceCache
+from ring_buffer import SampleRing
+
+
+# 링에 블록을 쓰면서 매 프레임 스냅샷을 넘겨주는 시나리오: 한 바퀴 넘게 기록, resize(줄임·늘림),
+# reset(채널 수 변경), 한 프레임에 한 바퀴 이상 기록, 원본 평면 전환(raw ↔ filtered)
+def _frames(seed=0):
+    rng = np.random.default_rng(seed)
+    ring = SampleRing(4, 500, with_filtered=True)
+    steps = (
+        [("write", k) for k in rng.integers(0, 60, 40)]
+        + [("resize", 320)] + [("write", k) for k in rng.integers(1, 90, 20)]
+        + [("resize", 700)] + [("write", k) for k in rng.integers(1, 90, 20)]
+        + [("reset", 6)] + [("write", k) for k in rng.integers(1, 90, 20)]
+        + [("write", 1500)] + [("write", k) for k in rng.integers(1, 40, 10)]
+    )
+    prefiltered = False
+    for i, (op, arg) in enumerate(steps):
+        if op == "write":
+            block = rng.integers(0, 1024, size=(arg, ring.n_ch)).astype(float)
+            ring.write(block, block * 0.5 - 7.0)
+        elif op == "resize":
+            ring.resize(arg)
+        else:
+            ring.reset(arg)
+        if i % 15 == 7:
+            prefiltered = not prefiltered
+        ptr, is_full, data, count, filtered, _ = ring.snapshot()
+        yield (filtered if prefiltered else data), ptr, count, ring.layout_version, prefiltered
+
+
+# 기준: 막대마다 원형 구간 CHUNK_SIZE개의 max − min을 처음부터
+def _bars(data, num_bars):
+    L = data.shape[1]
+    out = np.empty((data.shape[0], num_bars))
+    for b in range(num_bars):
+        idx = ((b * L) // num_bars - CHUNK_SIZE // 2 + np.arange(CHUNK_SIZE)) % L
+        out[:, b] = data[:, idx].max(axis=1) - data[:, idx].min(axis=1)
+    return out
+
+
+def test_fill_bar_cache_matches_full_recompute():
+    cache = FillBarCache()
+    for data, ptr, count, layout, prefiltered in _frames():
+        ptp = cache.update(data, ptr, count, layout, 166, prefiltered)
+        np.testing.assert_array_equal(ptp, _bars(data, 166))
+
+
+# 평면만 바뀌고 count·layout_version이 그대로여도 전체 재계산
+def test_fill_bar_cache_source_plane_switch():
+    ring = SampleRing(4, 300, with_filtered=True)
+    block = np.random.default_rng(1).integers(0, 1024, size=(200, 4)).astype(float)
+    ring.write(block, block * 0.1)
+    ptr, _, data, count, filtered, _ = ring.snapshot()
+    cache = FillBarCache()
+    cache.update(data, ptr, count, ring.layout_version, 50, False)
+    ptp = cache.update(filtered, ptr, count, ring.layout_version, 50, True)
+    np.testing.assert_array_equal(ptp, _bars(filtered, 50))
+
+
+def _x_axis(L):
+    return np.linspace(0, config.PLOT_SEC * 1000, L, endpoint=False)
+
+
+def _scale_snapshot(n_ch):
+    mgr = EMGScaleManager(n_ch)
+    mgr.update_block(np.random.default_rng(2).integers(200, 900, size=(500, n_ch)).astype(float))
+    return mgr.snapshot()
+
+
+# 스케일이 그대로면 증분 캐시의 Y·열 min/max·구간 좌표가 새 캐시로 처음부터 만든 것과 같아야 함
+@pytest.mark.parametrize("view_cols", [None, 120, 450])
+def test_line_trace_cache_matches_full_recompute(view_cols):
+    cache = LineTraceCache()
+    snaps = {}
+    for k, (data, ptr, count, layout, prefiltered) in enumerate(_frames(seed=3)):
+        n_ch, L = data.shape
+        snap = snaps.setdefault(n_ch, _scale_snapshot(n_ch))
+        x = _x_axis(L)
+        view = None
+        if view_cols:
+            lo = 0.0 if k % 20 < 10 else 1000.0  # 줌/팬도 섞음
+            view = lod.PixelView(lo, config.PLOT_SEC * 1000, view_cols)
+        cache.update(data, ptr, count, layout, snap, x, view, prefiltered)
+        ref = LineTraceCache()
+        ref.update(data, ptr, count, layout, snap, x, view, prefiltered)
+        np.testing.assert_array_equal(cache.y, ref.y)
+        if view is not None:
+            np.testing.assert_array_equal(cache.i_min, ref.i_min)
+            np.testing.assert_array_equal(cache.i_max, ref.i_max)
+        for i in range(n_ch):
+            for lo, hi in ((0, ptr), (ptr, L)):
+                got = cache.segment(i, lo, hi, x, view)
+                want = ref.segment(i, lo, hi, x, view)
+                np.testing.assert_array_equal(got[0], want[0])
+                np.testing.assert_array_equal(got[1], want[1])
+
+
+# 스케일이 계속 바뀌어도 캐시된 Y는 지금 스냅샷으로 새로 변환한 값과 LINE_RESCALE_TOL 이내
+def test_line_trace_cache_stays_within_rescale_tolerance():
+    rng = np.random.default_rng(4)
+    ring = SampleRing(4, 800)
+    mgr = EMGScaleManager(4)
+    cache = LineTraceCache()
+    x = _x_axis(800)
+    level = 400.0
+    for k in range(150):
+        level += rng.normal(0, 4)
+        block = level + rng.normal(0, 30, size=(int(rng.integers(5, 40)), 4))
+        mgr.update_block(block)
+        ring.write(block)
+        ptr, _, data, count, _, _ = ring.snapshot()
+        snap = mgr.snapshot()
+        cache.update(data, ptr, count, ring.layout_version, snap, x, None)
+        assert np.abs(cache.y - snap.scale_all(data)).max() <= config.LINE_RESCALE_TOL + 1e-9
+
+
+def test_line_trace_cache_source_plane_switch():
+    ring = SampleRing(4, 300, with_filtered=True)
+    block = np.random.default_rng(5).integers(200, 900, size=(200, 4)).astype(float)
+    ring.write(block, block * 0.5)
+    ptr, _, data, count, filtered, _ = ring.snapshot()
+    snap = _scale_snapshot(4)
+    cache = LineTraceCache()
+    cache.update(data, ptr, count, ring.layout_version, snap, _x_axis(300), None, False)
+    assert cache.update(filtered, ptr, count, ring.layout_version, snap, _x_axis(300), None, True)
+    np.testing.assert_array_equal(cache.y, snap.scale_all(filtered))
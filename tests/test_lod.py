@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from lod import PixelView, clip_visible, minmax_decimate, search_visible, visible_range
+
+
+# 기준 구현: 샘플마다 열 경계(x_lo + k·col_width)로 열 번호를 정해 열별 첫 min·max 위치를 파이썬 루프로
+def _reference(x, y, view):
+    edges = view.x_lo + np.arange(1, view.n_cols + 2) * view.col_width
+    col = np.searchsorted(edges, x, side="right")
+    pick = []
+    for c in np.unique(col):
+        idx = np.flatnonzero(col == c)
+        pick += sorted([idx[np.argmin(y[idx])], idx[np.argmax(y[idx])]])
+    return np.array(pick)
+
+
+@pytest.mark.parametrize("n,n_cols", [(10000, 300), (5000, 1000), (3001, 7)])
+def test_minmax_decimate_matches_per_column_loop(n, n_cols):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 10, n))
+    y = rng.integers(0, 50, n).astype(float)  # 같은 값 반복 → 첫 위치 규칙 확인
+    view = PixelView(x[0], x[-1], n_cols)
+    xd, yd = minmax_decimate(x, y, view)
+    pick = _reference(x, y, view)
+    np.testing.assert_array_equal(xd, x[pick])
+    np.testing.assert_array_equal(yd, y[pick])
+    assert len(xd) <= 2 * (n_cols + 1)
+
+
+def test_spike_survives_decimation():
+    x = np.linspace(0, 1, 100000)
+    y = np.zeros_like(x)
+    y[31337] = 5.0
+    y[77777] = -3.0
+    _, yd = minmax_decimate(x, y, PixelView(0, 1, 200))
+    assert yd.max() == 5.0 and yd.min() == -3.0
+
+
+def test_few_points_pass_through():
+    x = np.arange(100.0)
+    y = np.sin(x)
+    xd, yd = minmax_decimate(x, y, PixelView(0, 100, 80))
+    assert xd is x and yd is y
+
+
+def test_visible_range_includes_one_sample_margin():
+    x = np.arange(100.0)
+    assert visible_range(x, 10.5, 20.5) == (10, 22)
+    assert visible_range(x, -5, 200) == (0, 100)
+    assert visible_range(x, 500, 600) == (99, 100)  # 범위 밖이어도 끝 샘플 하나
+
+
+@pytest.mark.parametrize("lo,hi", [(0, 100), (20, 60), (55, 90), (0, 5), (95, 100)])
+def test_clip_visible_matches_visible_range_of_slice(lo, hi):
+    x = np.arange(100.0)
+    i_lo, i_hi = search_visible(x, 30.2, 70.8)
+    a, b = clip_visible(i_lo, i_hi, lo, hi)
+    sa, sb = visible_range(x[lo:hi], 30.2, 70.8)
+    assert (a - lo, b - lo) == (sa, sb)
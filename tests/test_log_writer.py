@@ -0,0 +1,60 @@
+import threading
+import time
+
+from log_writer import BackgroundWriter
+
+
+# 기록이 gate가 열릴 때까지 멈춰 있는 싱크 (느린·멈춘 디스크)
+class _StuckSink:
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.items = []
+        self.closed = False
+
+    def write(self, payload):
+        self.gate.wait()
+        self.items.append(payload)
+        return 1
+
+    def flush(self):
+        pass
+
+    def sync(self):
+        pass
+
+
+def _write(sink, payload):
+    return sink.write(payload)
+
+
+def test_submit_never_blocks_and_counts_spill_and_drops():
+    sink = _StuckSink()
+    w = BackgroundWriter(sink, _write, queue_max=2, spill_max=5, fsync="close")
+    t0 = time.perf_counter()
+    accepted = [w.submit(i) for i in range(20)]
+    assert time.perf_counter() - t0 < 0.5
+    # 기록 스레드가 첫 버퍼를 꺼내 멈춰 있을 수 있으므로 5~6개가 받아짐
+    n_ok = sum(accepted)
+    assert 5 <= n_ok <= 6
+    assert w.dropped == 20 - n_ok
+    assert w.stalls >= 3
+    assert w.submit("last", force=True)
+    sink.gate.set()
+    w.close()
+    assert sink.items == [i for i, ok in enumerate(accepted) if ok] + ["last"]
+    stats = w.stats()
+    assert stats["dropped"] == 20 - n_ok
+    assert stats["batches"] == n_ok + 1
+
+
+def test_keeps_everything_when_disk_keeps_up():
+    sink = _StuckSink()
+    sink.gate.set()
+    w = BackgroundWriter(sink, _write, queue_max=2, spill_max=16, fsync="close")
+    for i in range(50):
+        assert w.submit(i)
+        time.sleep(0.001)
+    w.close()
+    assert sink.items == list(range(50))
+    assert w.dropped == 0
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from serial_worker import LineDecoder, parse_chunk, parse_line
+
+
+# 기준 구현: 줄마다 parse_line, 첫 유효 줄로 채널 수 결정 후 같은 채널 수 줄만
+def _per_line(data, n_ch=None):
+    rows = []
+    for line in data.decode(errors="ignore").split("\n"):
+        parsed = parse_line(line.strip())
+        if parsed is None:
+            continue
+        vals, n = parsed
+        if n_ch is None:
+            n_ch = n
+        if n == n_ch:
+            rows.append(vals)
+    return np.array(rows).reshape(-1, n_ch or 0), n_ch
+
+
+def _lines(n, n_ch, seed=0):
+    rng = np.random.default_rng(seed)
+    vals = rng.integers(0, 1024, size=(n, n_ch))
+    return vals, "".join(",".join(map(str, r)) + "\r\n" for r in vals).encode()
+
+
+@pytest.mark.parametrize("n_ch", [4, 6])
+def test_plain_lines_match_per_line_parser(n_ch):
+    vals, data = _lines(500, n_ch)
+    out, n = parse_chunk(data)
+    assert n == n_ch
+    np.testing.assert_array_equal(out, vals)
+    ref, _ = _per_line(data)
+    np.testing.assert_array_equal(out, ref)
+
+
+# 소수점·부호·잡음 문자·잘못된 개수가 섞인 줄은 parse_line과 같은 결과여야 함
+def test_mixed_lines_match_per_line_parser():
+    data = (
+        b"garbage\n"
+        b"1 2 3\n"
+        b"10\t20\t30\t40\n"
+        b"1.5,2.25,-3,4\n"
+        b"ch: 5;6;7;8\n"
+        b"1 2 3 4 5 6\n"
+        b"\n"
+        b"0007,0,100,999"
+    )
+    out, n = parse_chunk(data)
+    ref, n_ref = _per_line(data)
+    assert n == n_ref == 4
+    np.testing.assert_array_equal(out, ref)
+
+
+def test_given_channel_count_drops_other_lines():
+    data = b"1 2 3 4\n1 2 3 4 5 6\n7 8 9 10 11 12\n"
+    out, n = parse_chunk(data, n_ch=6)
+    assert n == 6
+    np.testing.assert_array_equal(out, [[1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12]])
+
+
+def test_no_valid_line():
+    out, n = parse_chunk(b"hello\n1 2\n")
+    assert n is None and out.shape == (0, 0)
+
+
+# read 경계가 줄 중간이어도 이어 붙여 같은 결과
+def test_line_decoder_carries_partial_lines():
+    vals, data = _lines(300, 4, seed=1)
+    dec = LineDecoder()
+    rows, n_ch = [], None
+    for a in range(0, len(data), 37):
+        out, n_ch = dec.decode(data[a:a + 37], n_ch)
+        rows.append(out)
+    np.testing.assert_array_equal(np.concatenate(rows), vals)
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("scipy")
+
+import config
+from prefilter import StreamingPrefilter
+from ring_buffer import SampleRing
+
+FS = 1000.0
+
+
+def _tone(n, hz, fs=FS, level=500.0, amp=50.0):
+    t = np.arange(n) / fs
+    return (level + amp * np.sin(2 * np.pi * hz * t))[:, None].repeat(2, axis=1)
+
+
+# 블록 나눠 흘리기: (block, 수신 시각)
+def _blocks(x, block, fs=FS, t0=0.0):
+    for a in range(0, len(x), block):
+        yield x[a:a + block], t0 + (a + block) / fs
+
+
+def test_no_output_until_fs_is_measured():
+    pf = StreamingPrefilter(2, fs=0)
+    outs = [pf.process(b, t) for b, t in _blocks(_tone(1500, 55), 50)]
+    first_design = next(i for i, o in enumerate(outs) if o is not None)
+    assert all(o is None for o in outs[:first_design])
+    # 측정 구간(PREFILTER_MEASURE_SEC) 전에는 설계되지 않음
+    assert first_design * 50 / FS >= config.PREFILTER_MEASURE_SEC
+    assert pf.fs == pytest.approx(FS, rel=0.05)
+
+
+def test_fixed_fs_filters_from_first_block_and_removes_mains():
+    pf = StreamingPrefilter(2, fs=FS)
+    assert pf.active
+    out = np.vstack([pf.process(b, t) for b, t in _blocks(_tone(4000, 55), 64)])
+    tail = out[2000:, 0]
+    # 55Hz 성분은 밴드스탑으로 크게 줄고, DC 레벨은 유지
+    assert np.ptp(tail) < 0.1 * 100
+    assert tail.mean() == pytest.approx(500, abs=5)
+
+
+def test_blockwise_equals_one_shot():
+    x = _tone(3000, 80) + _tone(3000, 55, amp=20) - 500
+    a = StreamingPrefilter(2, fs=FS).process(x, 3.0)
+    pf = StreamingPrefilter(2, fs=FS)
+    b = np.vstack([pf.process(blk, t) for blk, t in _blocks(x, 37)])
+    np.testing.assert_allclose(a, b, atol=1e-9)
+
+
+# 링: 필터 안 된 블록이 남아 있는 동안은 snapshot이 filtered 평면을 주지 않음
+def test_ring_hides_filtered_plane_until_all_samples_are_filtered():
+    ring = SampleRing(2, 100, with_filtered=True)
+    raw = np.ones((60, 2))
+    ring.write(raw, None)
+    assert ring.snapshot()[4] is None
+    ring.write(raw, raw * 2)  # 60 + 60 > 100 → 아직 필터 안 된 20개가 남음
+    assert ring.snapshot()[4] is None
+    ring.write(raw[:40], raw[:40] * 2)
+    assert ring.snapshot()[4] is not None
+    ring.write(raw[:1], None)
+    assert ring.snapshot()[4] is None
+
+
+# 측정 fs로 설계한 뒤 장치 레이트가 바뀌면 다음 측정 구간 끝에서 다시 설계
+def test_redesigns_when_measured_rate_drifts():
+    pf = StreamingPrefilter(2, fs=0)
+    for blk, t in _blocks(_tone(3000, 30), 50):
+        pf.process(blk, t)
+    assert pf.fs == pytest.approx(FS, rel=0.05)
+    fs2 = 2 * FS
+    t_end = 3000 / FS
+    outs = [pf.process(blk, t) for blk, t in _blocks(_tone(6000, 30, fs=fs2), 100, fs=fs2, t0=t_end)]
+    assert pf.fs == pytest.approx(fs2, rel=0.05)
+    assert all(o is not None for o in outs)  # 재설계 중에도 필터 출력은 끊기지 않음
+
+
+def test_small_rate_jitter_keeps_design():
+    pf = StreamingPrefilter(2, fs=0)
+    for blk, t in _blocks(_tone(3000, 30), 50):
+        pf.process(blk, t)
+    fs0 = pf.fs
+    for blk, t in _blocks(_tone(3000, 30), 50, fs=FS * 1.02, t0=3.0):
+        pf.process(blk, t)
+    assert pf.fs == fs0
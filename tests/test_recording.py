@@ -0,0 +1,119 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pytest
+
+from recording import BinaryLogger, read_header, read_index, read_range, read_recording, segment_path
+
+
+def _session(n=5000, n_ch=4, seed=0):
+    rng = np.random.default_rng(seed)
+    t_ms = np.arange(n) * 0.5  # 2 kHz
+    raw = rng.integers(0, 1024, size=(n, n_ch)).astype(float)
+    amp = rng.integers(0, 300, size=(n, n_ch)).astype(float)
+    return t_ms, raw, amp
+
+
+# 블록 단위로 기록하고 닫은 로거 ("Saved:" 출력은 숨김)
+def _record(tmp_path, t_ms, raw, amp, block=333, **kw):
+    logger = BinaryLogger(directory=str(tmp_path), **kw)
+    for a in range(0, len(t_ms), block):
+        logger.write_block(raw[a:a + block], amp[a:a + block], t_ms[a:a + block])
+    with contextlib.redirect_stdout(io.StringIO()):
+        logger.close()
+    return logger.filename
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_round_trip(tmp_path, compress):
+    t_ms, raw, amp = _session()
+    idx = _record(tmp_path, t_ms, raw, amp, chunk_rows=1024, compress=compress)
+    for path in (idx, segment_path(idx, 0)):
+        rec = read_recording(path)
+        np.testing.assert_array_equal(rec.t_us, np.rint(t_ms * 1000).astype(np.int64))
+        np.testing.assert_array_equal(rec.raw, raw.astype(np.int64))
+        np.testing.assert_array_equal(rec.amp, amp.astype(np.int64))
+    assert read_header(segment_path(idx, 0))["n_ch"] == 4
+
+
+def test_zero_length_segment_reads_as_empty(tmp_path):
+    path = tmp_path / "crashed_0000.emgrec"
+    path.write_bytes(b"")
+    rec = read_recording(str(path))
+    assert len(rec.t_us) == 0
+    assert rec.raw.shape == (0, 0)
+
+
+def test_session_stopped_before_first_chunk(tmp_path):
+    logger = BinaryLogger(directory=str(tmp_path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        logger.close()
+    rec = read_recording(logger.filename)
+    assert len(rec.t_us) == 0
+
+
+def test_zero_length_index_reads_as_empty(tmp_path):
+    path = tmp_path / "crashed.emgidx"
+    path.write_bytes(b"")
+    assert len(read_recording(str(path)).t_us) == 0
+
+
+def test_truncated_header_is_a_clear_error(tmp_path):
+    t_ms, raw, amp = _session(n=100)
+    seg = segment_path(_record(tmp_path, t_ms, raw, amp), 0)
+    with open(seg, "rb") as f:
+        head = f.read(20)
+    bad = tmp_path / "bad_0000.emgrec"
+    bad.write_bytes(head)
+    with pytest.raises(ValueError, match="truncated"):
+        read_recording(str(bad))
+    with pytest.raises(ValueError, match="truncated"):
+        read_header(str(bad))
+
+
+# 마지막 청크를 쓰는 도중 종료 → 온전한 청크만 읽힘
+def test_truncated_last_chunk_is_dropped(tmp_path):
+    t_ms, raw, amp = _session(n=3000)
+    seg = segment_path(_record(tmp_path, t_ms, raw, amp, chunk_rows=1000, compress=False), 0)
+    size = os.path.getsize(seg)
+    with open(seg, "r+b") as f:
+        f.truncate(size - 10)
+    rec = read_recording(seg)
+    assert len(rec.t_us) == 2000
+    np.testing.assert_array_equal(rec.raw, raw[:2000].astype(np.int64))
+
+
+# 세그먼트 여러 개로 나뉜 세션: 구간 읽기 = 전체에서 시각으로 자른 것
+@pytest.mark.parametrize("t0,t1", [(None, None), (0.0, 1.0), (1.2345, 3.9), (2.0, 2.0005), (0.9999, 1.0001),
+                                   (4.5, None), (None, 0.3), (10.0, 20.0)])
+def test_read_range_matches_time_slice(tmp_path, t0, t1):
+    t_ms, raw, amp = _session(n=10000)  # 5 s
+    idx = _record(tmp_path, t_ms, raw, amp, chunk_rows=700, segment_sec=1.0)
+    t_us = np.rint(t_ms * 1000).astype(np.int64)
+    keep = np.ones(len(t_us), dtype=bool)
+    if t0 is not None:
+        keep &= t_us >= t0 * 1e6
+    if t1 is not None:
+        keep &= t_us < t1 * 1e6
+    rec = read_range(idx, t0, t1)
+    assert rec.header["n_samples"] == int(keep.sum())
+    np.testing.assert_array_equal(rec.t_us, t_us[keep])
+    np.testing.assert_array_equal(rec.raw, raw[keep].astype(np.int64))
+    np.testing.assert_array_equal(rec.amp, amp[keep].astype(np.int64))
+
+
+def test_index_chunks_are_ordered_and_cut_at_segments(tmp_path):
+    t_ms, raw, amp = _session(n=10000)
+    idx = _record(tmp_path, t_ms, raw, amp, chunk_rows=700, segment_sec=1.0)
+    index = read_index(idx)
+    assert index["n"].sum() == 10000
+    np.testing.assert_array_equal(index["sample"], np.r_[0, np.cumsum(index["n"])[:-1]])
+    assert np.all(index["t_first"][1:] > index["t_last"][:-1])
+    assert np.array_equal(np.unique(index["segment"]), np.arange(5))
+    assert np.all(index["t_first"] // 1_000_000 == index["segment"])
+    assert np.all(index["t_last"] // 1_000_000 == index["segment"])
+    # 세그먼트 파일 각각도 완결된 녹화
+    parts = [read_recording(segment_path(idx, k)) for k in range(5)]
+    np.testing.assert_array_equal(np.concatenate([p.raw for p in parts]), raw.astype(np.int64))
@@ -0,0 +1,62 @@
+import numpy as np
+
+from ring_buffer import SampleRing
+
+
+# 스냅샷을 시간 순서의 (n, n_ch) 배열로 (렌더와 같은 방식)
+def _ordered(ptr, is_full, data):
+    if is_full:
+        return np.concatenate([data[:, ptr:], data[:, :ptr]], axis=1).T
+    return data[:, :ptr].T
+
+
+def _rows(a, b, n_ch=4):
+    return np.repeat(np.arange(a, b, dtype=float)[:, None], n_ch, axis=1)
+
+
+def test_write_wraps_and_keeps_latest():
+    ring = SampleRing(4, 100)
+    for a in range(0, 250, 30):
+        b = min(a + 30, 250)
+        ring.write(_rows(a, b), times=np.arange(a, b) * 1e-3)
+    ptr, is_full, data, count, filtered, times = ring.snapshot()
+    assert count == 250 and is_full and filtered is None
+    np.testing.assert_array_equal(_ordered(ptr, is_full, data), _rows(150, 250))
+    np.testing.assert_allclose(_ordered(ptr, is_full, times[None, :])[:, 0], np.arange(150, 250) * 1e-3)
+
+
+def test_block_larger_than_capacity():
+    ring = SampleRing(4, 64)
+    ring.write(_rows(0, 10))
+    ring.write(_rows(10, 210))
+    ptr, is_full, data, count, _, times = ring.snapshot()
+    assert count == 210
+    np.testing.assert_array_equal(_ordered(ptr, is_full, data), _rows(146, 210))
+    assert np.isnan(times).all()
+
+
+def test_resize_keeps_most_recent():
+    ring = SampleRing(4, 100)
+    ring.write(_rows(0, 130))
+    ring.resize(40)
+    ptr, is_full, data, count, _, _ = ring.snapshot()
+    assert (ptr, is_full) == (0, True)
+    np.testing.assert_array_equal(_ordered(ptr, is_full, data), _rows(90, 130))
+
+    ring.resize(200)
+    ptr, is_full, data, _, _, _ = ring.snapshot()
+    assert (ptr, is_full) == (40, False)
+    ring.write(_rows(130, 140))
+    ptr, is_full, data, _, _, _ = ring.snapshot()
+    np.testing.assert_array_equal(_ordered(ptr, is_full, data), _rows(90, 140))
+
+
+def test_reset_changes_channel_count():
+    ring = SampleRing(4, 50, with_filtered=True)
+    ring.write(_rows(0, 20))
+    version = ring.layout_version
+    ring.reset(6)
+    ptr, is_full, data, count, _, _ = ring.snapshot()
+    assert data.shape == (6, 50) and ring.filtered.shape == (6, 50)
+    assert (ptr, is_full, count) == (0, False, 0)
+    assert ring.layout_version > version
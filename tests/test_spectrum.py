@@ -0,0 +1,107 @@
+import numpy as np
+
+import config
+from ring_buffer import SampleRing
+from spectrum import SpectrogramEngine, apply_filters, design_filters
+
+N_FFT, HOP, N_COLS, FS = 64, 16, 40, 1000.0
+
+
+# 기준 모델: 링과 별개로 전체 샘플 기록(history)을 두고, update마다 새로 끝난 프레임을
+# history에서 잘라 처음부터 STFT. 링에 이미 없는 프레임은 빈 열
+class _Reference:
+
+    def __init__(self, n_ch):
+        self.history = np.empty((0, n_ch))
+        self.cols = []
+        self.next_end = None
+        coeffs = design_filters(FS, config.FFT_FILTER_OUT_RANGES) if config.FFT_APPLY_FILTER else []
+        self.coeffs = coeffs
+
+    def update(self, avail):
+        count = len(self.history)
+        if self.next_end is None:
+            self.next_end = max(N_FFT, count - count % HOP)
+        while self.next_end <= count:
+            e = self.next_end
+            if count - (e - N_FFT) > avail:
+                self.cols.append(None)
+            else:
+                frame = apply_filters(self.history[e - N_FFT : e].T[:, None, :], self.coeffs)[:, 0]
+                frame = frame - frame.mean(axis=-1, keepdims=True)
+                mag = np.abs(np.fft.rfft(frame * np.hanning(N_FFT), axis=-1)) / N_FFT
+                self.cols.append(20.0 * np.log10(mag + 1e-12))
+            self.next_end += HOP
+
+    def image(self, ch):
+        out = np.full((N_COLS, N_FFT // 2 + 1), config.SPEC_BLANK_DB)
+        recent = self.cols[-N_COLS:]
+        for k, col in enumerate(recent):
+            if col is not None:
+                out[N_COLS - len(recent) + k] = col[ch]
+        return out
+
+
+def _check(engine, ref, n_ch):
+    for ch in range(n_ch):
+        np.testing.assert_allclose(engine.image(ch), ref.image(ch), rtol=1e-4, atol=1e-3)
+
+
+# 링 한 바퀴 넘게 기록, resize, 뷰를 떠나 있던 동안(update 없음) 링보다 오래 밀린 프레임,
+# reset(채널 수 변경) 후 다시 시작까지 매 update마다 기준과 같은 이미지
+def test_spectrogram_engine_matches_reference():
+    rng = np.random.default_rng(0)
+    ring = SampleRing(4, 600)
+    engine = SpectrogramEngine(N_FFT, HOP, N_COLS)
+    ref = _Reference(4)
+    t = 0
+
+    def write(n):
+        nonlocal t
+        k = t + np.arange(n)
+        block = (300 + 80 * np.sin(2 * np.pi * 120 * k / FS)[:, None]
+                 + rng.normal(0, 10, size=(n, ring.n_ch)))
+        t += n
+        ring.write(block)
+        ref.history = np.concatenate([ref.history, block])
+
+    def update():
+        ptr, is_full, data, count, _, _ = ring.snapshot()
+        engine.update(data, ptr, is_full, count, FS)
+        ref.update(ring.capacity if is_full else ptr)
+        _check(engine, ref, ring.n_ch)
+
+    for n in rng.integers(1, 120, 60):
+        write(int(n))
+        update()
+    ring.resize(300)
+    for n in rng.integers(1, 80, 20):
+        write(int(n))
+        update()
+    for n in rng.integers(50, 120, 10):  # 뷰를 떠나 있음: 기록만
+        write(int(n))
+    update()
+    assert any(col is None for col in ref.cols[-N_COLS:])  # 링보다 오래된 프레임 → 빈 열
+    for n in rng.integers(1, 80, 20):
+        write(int(n))
+        update()
+
+    ring.reset(6)
+    ref = _Reference(6)
+    t = 0
+    for n in rng.integers(1, 120, 30):
+        write(int(n))
+        update()
+
+
+def test_spectrogram_engine_skips_update_without_new_frame():
+    ring = SampleRing(4, 600)
+    engine = SpectrogramEngine(N_FFT, HOP, N_COLS)
+    ring.write(np.random.default_rng(1).normal(300, 10, size=(N_FFT, 4)))
+    ptr, is_full, data, count, _, _ = ring.snapshot()
+    assert engine.update(data, ptr, is_full, count, FS) == 1
+    version = engine.version
+    ring.write(np.ones((HOP - 1, 4)))
+    ptr, is_full, data, count, _, _ = ring.snapshot()
+    assert engine.update(data, ptr, is_full, count, FS) == 0
+    assert engine.version == version
@@ -0,0 +1,61 @@
+import numpy as np
+
+from timebase import SampleClock, windowed_rate
+
+
+# fs로 샘플이 나오는 장치를 block개씩 read, 도착 시각 = 마지막 샘플 시각 + 양수 지터
+def _run(clock, fs, n_reads, block, t0=10.0, jitter=0.004, seed=0, seq_drop=None):
+    rng = np.random.default_rng(seed)
+    true, got = [], []
+    for r in range(n_reads):
+        k = r * block + np.arange(block)
+        t_true = t0 + k / fs
+        seq = None
+        if seq_drop is not None:
+            keep = ~np.isin(k, seq_drop)
+            k, t_true = k[keep], t_true[keep]
+            seq = k % 65536
+        t_read = t_true[-1] + rng.exponential(jitter) + 0.0005
+        got.append(clock.stamp(len(k), t_read, seq))
+        true.append(t_true)
+    return np.concatenate(true), np.concatenate(got)
+
+
+def test_recovers_rate_and_removes_read_jitter():
+    clock = SampleClock(window_sec=2.0)
+    true, got = _run(clock, 2000.0, 400, 20)
+    assert abs(clock.rate - 2000.0) < 2.0
+    late = slice(len(true) // 2, None)
+    err = got[late] - true[late]
+    assert np.abs(err).max() < 1.5e-3  # read 지연(평균 ~4.5 ms, 꼬리 수십 ms)보다 훨씬 작은 오차
+    assert np.all(np.diff(got) >= 0)
+
+
+def test_dropped_frames_leave_gaps():
+    clock = SampleClock(window_sec=2.0)
+    drop = np.arange(4000, 4010)
+    true, got = _run(clock, 1000.0, 300, 20, seq_drop=drop)
+    i = np.searchsorted(true, 10.0 + 4010 / 1000.0)
+    assert abs((got[i] - got[i - 1]) - 11 / 1000.0) < 2e-4
+
+
+def test_follows_rate_change_without_going_backwards():
+    clock = SampleClock(window_sec=2.0)
+    _run(clock, 1000.0, 200, 20)
+    t_end = 10.0 + 4000 / 1000.0
+    _, got = _run(clock, 2000.0, 400, 20, t0=t_end)
+    assert abs(clock.rate - 2000.0) < 4.0
+    assert np.all(np.diff(got) >= 0)
+
+
+def test_windowed_rate_on_wrapped_ring():
+    L, fs = 1000, 500.0
+    t = np.arange(2500) / fs
+    times = np.zeros(L)
+    idx = np.arange(2500) % L
+    times[idx] = t
+    ptr = 2500 % L
+    rate = windowed_rate(times, ptr, L, window_sec=1.0)
+    assert abs(rate - fs) < 1e-6
+    assert windowed_rate(times, ptr, 10, window_sec=1.0) is None  # 0.1 s 미만
+    assert windowed_rate(None, 0, 0) is None
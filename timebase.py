@@ -0,0 +1,101 @@
+from collections import deque
+
+import numpy as np
+
+import config
+from binary_frame import SEQ_MOD
+
+_SHORT_FRACTION = 0.25  # 속도 변화 감지용 짧은 구간 = window_sec × 이 비율
+
+
+# 수신 시간축. 워커가 read마다 단조 시계(time.perf_counter)로 찍은 도착 시각과 샘플 인덱스
+# (이진 프레임이면 장치 seq, 아니면 누적 샘플 수)를 최근 TIMEBASE_WINDOW_SEC 동안 모아
+# t = b + k·인덱스 로 맞춘다. 기울기 k(샘플 간격)는 최소제곱, 절편 b는 도착 지연이 항상 양수라는 점을 써서
+# 아래쪽 포락선(min(t − k·i))으로 잡음 → UI·스케줄링 지터 없이 장치 클럭을 따라가는 샘플별 시각.
+# 최근 짧은 구간의 기울기가 전체와 TIMEBASE_RATE_TOL 넘게 다르면 속도가 바뀐 것으로 보고 오래된 read를 버림
+class SampleClock:
+
+    def __init__(self, window_sec=None):
+        self.window_sec = config.TIMEBASE_WINDOW_SEC if window_sec is None else window_sec
+        self.reset()
+
+    # 세션 시작 시 호출. t0는 포트를 비운 시각 → 그 전 시각은 주지 않음 (첫 read는 기울기를 모름)
+    def reset(self, t0=None):
+        self._anchors = deque()  # (read의 마지막 샘플 인덱스, 도착 시각)
+        self._idx_last = -1      # 마지막으로 시각을 준 샘플 인덱스
+        self._seq_last = None
+        self._last_t = t0
+        self.period = 1.0 / config.RAW_SAMPLE_RATE_DEFAULT  # 앵커가 모이기 전 가정 간격
+
+    @property
+    def rate(self):
+        return 1.0 / self.period
+
+    # read 한 번에서 나온 n개 샘플의 시각 (n,). t_read는 read가 돌아온 단조 시계 시각(초),
+    # seq는 프레임별 장치 시퀀스 번호 (있으면 누락 프레임만큼 인덱스를 건너뜀)
+    def stamp(self, n, t_read, seq=None):
+        if n == 0:
+            return np.empty(0)
+        if seq is not None and len(seq) == n:
+            prev = seq[0] - 1 if self._seq_last is None else self._seq_last
+            idx = self._idx_last + np.cumsum(np.diff(seq, prepend=prev) % SEQ_MOD)
+            self._seq_last = int(seq[-1])
+        else:
+            idx = self._idx_last + 1 + np.arange(n)
+        self._idx_last = int(idx[-1])
+
+        anchors = self._anchors
+        anchors.append((self._idx_last, t_read))
+        while anchors and t_read - anchors[0][1] > self.window_sec:
+            anchors.popleft()
+        ai = np.array([a[0] for a in anchors], dtype=float)
+        at = np.array([a[1] for a in anchors])
+        slope = _fit_slope(ai, at)
+        short = at >= t_read - self.window_sec * _SHORT_FRACTION
+        if slope is not None and t_read - at[0] > 2 * self.window_sec * _SHORT_FRACTION:
+            recent = _fit_slope(ai[short], at[short])
+            if recent is not None and abs(recent / slope - 1.0) > config.TIMEBASE_RATE_TOL:
+                for _ in range(len(ai) - int(np.count_nonzero(short))):
+                    anchors.popleft()
+                ai, at, slope = ai[short], at[short], recent
+        if slope is not None:
+            self.period = slope
+        offset = float(np.min(at - self.period * ai))
+
+        times = offset + self.period * idx
+        if self._last_t is not None:
+            times = np.maximum(times, self._last_t)  # 기울기가 바뀌어도 시간은 뒤로 가지 않음
+        self._last_t = float(times[-1])
+        return times
+
+
+# 인덱스 ai·시각 at의 최소제곱 기울기(샘플 간격). 앵커가 모자라거나 인덱스 폭이 좁으면 None
+def _fit_slope(ai, at):
+    if len(ai) < 3 or ai[-1] - ai[0] < 2:
+        return None
+    di = ai - ai.mean()
+    slope = float(np.dot(di, at - at.mean()) / np.dot(di, di))
+    return slope if slope > 0 else None
+
+
+# 링의 샘플 시각 평면에서 최근 window_sec 동안의 수신 속도(Hz). 샘플이 모자라거나
+# 구간이 min_span_sec보다 짧으면 None. times는 (L,) 원형 배열, ptr은 다음 쓸 위치, avail은 유효 샘플 수
+def windowed_rate(times, ptr, avail, window_sec=None, min_span_sec=0.1):
+    window_sec = config.TIMEBASE_RATE_WINDOW_SEC if window_sec is None else window_sec
+    if times is None or avail < 2:
+        return None
+    L = len(times)
+    first = ptr - avail
+    t_new = times[(ptr - 1) % L]
+    # 원형 배열을 오래된→최신 순으로 보고 window 시작 위치를 이진 탐색
+    lo, hi, target = 0, avail - 1, t_new - window_sec
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if times[(first + mid) % L] < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    span = t_new - times[(first + lo) % L]
+    if not span >= min_span_sec:
+        return None
+    return (avail - 1 - lo) / span